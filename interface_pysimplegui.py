@@ -9,8 +9,6 @@ Interface
 import collections
 import queue
 import threading
-import pickle
-import os
 import sys
 import time
 from math import ceil
@@ -19,6 +17,8 @@ import PySimpleGUI as sg
 import sportsbetting
 from sportsbetting.auxiliary_functions import get_nb_issues
 from sportsbetting.database_functions import get_all_sports, get_all_competitions
+from sportsbetting.history_functions import OddsHistory
+from sportsbetting.persistence_functions import PersistentOdds, import_pickle
 from sportsbetting.user_functions import parse_competitions
 from sportsbetting.interface_functions import (odds_table_combine,
                                                best_match_under_conditions_interface,
@@ -34,8 +34,6 @@ from sportsbetting.interface_functions import (odds_table_combine,
                                                get_main_competitions_interface,
                                                best_combine_reduit_interface)
 
-PATH_DATA = os.path.dirname(sportsbetting.__file__) + "/resources/data.pickle"
-
 sports = get_all_sports()
 sites = ['betclic', 'betstars', 'bwin', 'france_pari', 'joa', 'netbet', 'parionssport',
          'pasinobet', 'pmu', 'unibet', 'winamax', 'zebet']
@@ -50,10 +48,11 @@ print("""
     /_/                                                         /____/   
 """)
 
-try:
-    sportsbetting.ODDS = pickle.load(open(PATH_DATA, "rb"))
-except FileNotFoundError:
-    pass
+sportsbetting.ODDS = PersistentOdds()
+import_pickle(sportsbetting.ODDS)
+sportsbetting.ODDS.preload()
+sportsbetting.HISTORY = OddsHistory()
+sportsbetting.HISTORY.purge()
 
 
 # All the stuff inside your window.
@@ -468,7 +467,7 @@ while True:
     event, values = window.read(timeout=100)
     try:
         if sportsbetting.ABORT or not thread.is_alive():
-            pickle.dump(sportsbetting.ODDS, open(PATH_DATA, "wb"))
+            sportsbetting.ODDS.save()
             window['PROGRESS_PARSING'].update(0, 100, visible=False)
             window["TEXT_PARSING"].update(visible=sportsbetting.ABORT)
             window["REMAINING_TIME_PARSING"].update(visible=False)
@@ -658,7 +657,7 @@ while True:
         odds_match_interface(window, values)
     elif event == "DELETE_ODDS":
         delete_odds_interface(window, values)
-        pickle.dump(sportsbetting.ODDS, open(PATH_DATA, "wb"))
+        sportsbetting.ODDS.save()
     elif event == "ADD_COMBI_OPT":
         sport = ""
         if values["SPORT_COMBI_OPT"]:
@@ -697,5 +696,6 @@ while True:
     else:
         pass
 sportsbetting.INTERFACE = False
+sportsbetting.ODDS.save()
 window.close()
 sys.stdout = old_stdout
@@ -1,14 +1,12 @@
 """
 initialisation du module
 """
-import chromedriver_autoinstaller
 import collections
+import functools
 import os
 import queue
 import re
-
-
-from fake_useragent import UserAgent
+import threading
 
 ALL_ODDS_COMBINE = {}
 ODDS = {}
@@ -18,13 +16,18 @@ SUB_PROGRESS_LIMIT = 1
 SITE_PROGRESS = collections.defaultdict(int)
 QUEUE_TO_GUI = queue.Queue()
 QUEUE_FROM_GUI = queue.Queue()
-ODDS_INTERFACE = ""
+ODDS_INTERFACE = None
+# Historique des cotes (history_functions.OddsHistory), alimenté à chaque parsing s'il est défini
+HISTORY = None
 EXPECTED_TIME = 0
 INTERFACE = False
 IS_PARSING = False
 ABORT = False
 SPORTS = ["basketball", "football", "handball", "hockey-sur-glace", "rugby", "tennis"]
-PATH_DRIVER = ""
+SITES = ['betclic', 'betstars', 'bwin', 'france_pari', 'joa', 'netbet', 'parionssport',
+         'pasinobet', 'pmu', 'unibet', 'winamax', 'zebet']
+# Installation de chromedriver par un seul thread à la fois
+PATH_DRIVER_LOCK = threading.Lock()
 
 class UnavailableCompetitionException(Exception):
     """
@@ -64,9 +67,24 @@ def find_files(filename, search_path):
             return os.path.abspath(os.path.join(root, filename))
 
 
-ua = UserAgent()
-USER_AGENT = sorted(ua.data_browsers["chrome"], key=lambda a: grp(r'Chrome/[^ ]+', a))[-1]
-try:
-    PATH_DRIVER = chromedriver_autoinstaller.install(True)
-except IndexError:
-    PATH_DRIVER = find_files("chromedriver.exe", ".")
+@functools.lru_cache(maxsize=None)
+def get_user_agent():
+    """
+    User-agent de la version la plus récente de Chrome, déterminé au premier appel
+    """
+    from fake_useragent import UserAgent
+    ua = UserAgent()
+    return sorted(ua.data_browsers["chrome"], key=lambda a: grp(r'Chrome/[^ ]+', a))[-1]
+
+
+@functools.lru_cache(maxsize=None)
+def get_path_driver():
+    """
+    Chemin de chromedriver, installé si besoin au premier appel
+    """
+    import chromedriver_autoinstaller
+    with PATH_DRIVER_LOCK:
+        try:
+            return chromedriver_autoinstaller.install(True)
+        except IndexError:
+            return find_files("chromedriver.exe", ".")
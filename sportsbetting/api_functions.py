@@ -0,0 +1,339 @@
+"""
+Récupération des cotes à partir des réponses JSON que les pages des bookmakers téléchargent,
+lues dans le journal de performance de Chrome (DevTools), sans analyser le DOM
+"""
+
+import base64
+import datetime
+import json
+import re
+
+import selenium
+import selenium.common
+
+from sportsbetting.auxiliary_functions import (format_bwin_names, format_unibet_names,
+                                               reverse_match_odds)
+
+# Fragment de l'URL des réponses (requêtes HTTP ou websockets) contenant l'offre de chaque site
+API_URLS = {"betclic": "offer.cdn.betclic.fr/api/pub/",
+            "bwin": "/cds-api/bettingoffer/",
+            "parionssport": "/lvs-api/",
+            "pasinobet": "swarm",
+            "unibet": "/zones/"}
+# Identifiant de la compétition (ou du sport) dans l'URL de la page, présent dans les requêtes
+# de l'API qui la concernent. Sans identifiant, toutes les réponses de l'API sont retenues
+API_IDS = {"betclic": r"-[a-z](\d+)(?:$|\?)",
+           "bwin": r"-(\d+)(?:$|\?)",
+           "pasinobet": r"competition=(\d+)"}
+# Classe des noms des matches dans le DOM de chaque site
+API_MATCH_CLASSES = {"betclic": "betBox_matchName",
+                     "bwin": "participants-pair-game",
+                     "parionssport": "wpsel-desc",
+                     "pasinobet": "event-title",
+                     "unibet": "cell-event"}
+
+
+def start_capture(driver):
+    """
+    Vide le journal de performance d'un driver avant le chargement d'une nouvelle page
+    """
+    try:
+        driver.get_log("performance")
+    except selenium.common.exceptions.WebDriverException:
+        pass
+
+
+def network_messages(driver):
+    """
+    Messages DevTools du journal de performance reçus depuis sa dernière lecture
+    """
+    try:
+        entries = driver.get_log("performance")
+    except selenium.common.exceptions.WebDriverException:
+        return []
+    messages = []
+    for entry in entries:
+        try:
+            messages.append(json.loads(entry["message"])["message"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return messages
+
+
+def response_body(driver, request_id):
+    """
+    Contenu d'une réponse HTTP conservé par Chrome, None s'il n'est plus disponible
+    """
+    try:
+        body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    except selenium.common.exceptions.WebDriverException:
+        return None
+    if body.get("base64Encoded"):
+        return base64.b64decode(body["body"]).decode("utf-8", "replace")
+    return body["body"]
+
+
+def competition_id(site, url):
+    """
+    Identifiant de la compétition dans l'URL d'une page d'un site, None s'il n'est pas connu
+    """
+    if site not in API_IDS:
+        return None
+    match = re.search(API_IDS[site], url)
+    return match.group(1) if match else None
+
+
+def captured_json(driver, url_fragment, _id=None):
+    """
+    Retourne les contenus JSON des réponses HTTP et des messages websocket reçus par le driver
+    depuis start_capture dont l'URL contient url_fragment. Si _id est donné, seules les réponses
+    HTTP dont l'URL contient cet identifiant, et les réponses websocket à un message envoyé le
+    contenant (même champ rid), sont retenues
+    """
+    id_in_url = re.compile(r"[/=,]{}(?!\d)".format(_id)) if _id else re.compile("")
+    id_in_frame = re.compile(r"(?<!\d){}(?!\d)".format(_id)) if _id else re.compile("")
+    payloads = []
+    websockets = set()
+    frames = []
+    rids = set()
+    for message in network_messages(driver):
+        params = message.get("params", {})
+        if message.get("method") == "Network.responseReceived":
+            response = params.get("response", {})
+            url = response.get("url", "")
+            if (url_fragment in url and "json" in response.get("mimeType", "")
+                    and id_in_url.search(url)):
+                payloads.append(response_body(driver, params.get("requestId")))
+        elif message.get("method") == "Network.webSocketCreated":
+            if url_fragment in params.get("url", ""):
+                websockets.add(params.get("requestId"))
+        elif message.get("method") == "Network.webSocketFrameSent":
+            payload = params.get("response", {}).get("payloadData", "")
+            if params.get("requestId") in websockets and id_in_frame.search(payload):
+                rids.add(frame_rid(payload))
+        elif message.get("method") == "Network.webSocketFrameReceived":
+            if params.get("requestId") in websockets:
+                frames.append(params.get("response", {}).get("payloadData"))
+    payloads += [frame for frame in frames if not _id or frame_rid(frame) in rids - {None}]
+    data = []
+    for payload in payloads:
+        try:
+            data.append(json.loads(payload))
+        except (TypeError, ValueError):
+            pass
+    return data
+
+
+def frame_rid(payload):
+    """
+    Identifiant (rid) associant un message websocket envoyé et sa réponse, None s'il est absent
+    """
+    try:
+        rid = json.loads(payload).get("rid")
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return None if rid is None else str(rid)
+
+
+def dom_match_count(site, driver):
+    """
+    Nombre de matches affichés dans le DOM de la page chargée par le driver
+    """
+    try:
+        return driver.execute_script("return document.getElementsByClassName(arguments[0])"
+                                     ".length", API_MATCH_CLASSES[site])
+    except selenium.common.exceptions.WebDriverException:
+        return 0
+
+
+def walk(data):
+    """
+    Parcourt tous les dictionnaires d'un contenu JSON
+    """
+    if isinstance(data, dict):
+        yield data
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return
+    for value in values:
+        yield from walk(value)
+
+
+def parse_iso_date(string):
+    """
+    Convertit une date ISO 8601 (secondes décimales et décalage horaire ou Z facultatifs) en
+    date locale, sans datetime.fromisoformat, absent de Python 3.6
+    """
+    match = re.match(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$",
+                     string)
+    if not match:
+        raise ValueError(string)
+    date_time = datetime.datetime.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S")
+    if match.group(2):
+        date_time += datetime.timedelta(seconds=float(match.group(2)))
+    if match.group(3):
+        offset = datetime.timedelta()
+        if match.group(3) != "Z":
+            sign = -1 if match.group(3)[0] == "-" else 1
+            hours, minutes = int(match.group(3)[1:3]), int(match.group(3)[-2:])
+            offset = sign * datetime.timedelta(hours=hours, minutes=minutes)
+        date_time = (date_time.replace(tzinfo=datetime.timezone(offset)).astimezone()
+                     .replace(tzinfo=None))
+    return date_time
+
+
+def format_timestamp(timestamp):
+    """
+    Convertit une date JSON (horodatage en secondes ou millisecondes, ou date ISO 8601) en date
+    locale, "undefined" si elle n'est pas reconnue
+    """
+    try:
+        if isinstance(timestamp, (int, float)):
+            return datetime.datetime.fromtimestamp(timestamp / 1000 if timestamp > 1e11
+                                                   else timestamp)
+        return parse_iso_date(timestamp)
+    except (OSError, OverflowError, TypeError, ValueError):
+        return "undefined"
+
+
+def parse_betclic_api(data):
+    """
+    Cotes des matches de l'API de betclic
+    """
+    match_odds_hash = {}
+    for event in walk(data):
+        if not (isinstance(event.get("name"), str) and " - " in event["name"]
+                and event.get("markets")):
+            continue
+        selections = event["markets"][0].get("selections", [])
+        if selections and isinstance(selections[0], list):
+            selections = [selection for line in selections for selection in line]
+        odds = [selection.get("odds") for selection in selections]
+        if odds and all(isinstance(odd, (int, float)) for odd in odds):
+            match_odds_hash[event["name"]] = {"odds": {"betclic": odds},
+                                              "date": format_timestamp(event.get("date"))}
+    return match_odds_hash
+
+
+def parse_bwin_api(data):
+    """
+    Cotes des matches de l'API de bwin, en retenant le pari principal (vainqueur) de chaque match
+    """
+    match_odds_hash = {}
+    for fixture in walk(data):
+        if not (isinstance(fixture.get("name"), dict) and fixture.get("games")):
+            continue
+        games = [game for game in fixture["games"] if game.get("isMain")] or fixture["games"]
+        odds = [result.get("odds") for result in games[0].get("results", [])]
+        if not odds or not all(isinstance(odd, (int, float)) for odd in odds):
+            continue
+        match = fixture["name"].get("value", "")
+        if " @ " in match:
+            match, odds = reverse_match_odds(match.replace(" @ ", " - "), odds)
+        match = format_bwin_names(match)
+        if " - " in match:
+            match_odds_hash[match] = {"odds": {"bwin": odds},
+                                      "date": format_timestamp(fixture.get("startDate"))}
+    return match_odds_hash
+
+
+def parse_parionssport_api(data):
+    """
+    Cotes des matches de l'API de ParionsSport, dont les événements, les marchés et les issues
+    sont liés par leur champ parent
+    """
+    match_odds_hash = {}
+    for payload in data:
+        if not isinstance(payload, dict) or not isinstance(payload.get("items"), dict):
+            continue
+        items = payload["items"]
+        markets = {}
+        outcomes = {}
+        for key, item in items.items():
+            if isinstance(item, dict) and key.startswith("m"):
+                markets.setdefault(item.get("parent"), []).append(key)
+            elif isinstance(item, dict) and key.startswith("o"):
+                outcomes.setdefault(item.get("parent"), []).append(item)
+        for key, event in items.items():
+            if not (key.startswith("e") and isinstance(event, dict)
+                    and " - " in str(event.get("desc", "")) and markets.get(key)):
+                continue
+            market = min(markets[key], key=lambda market_key: items[market_key].get("pos", 0))
+            try:
+                odds = [float(str(outcome["price"]).replace(",", "."))
+                        for outcome in sorted(outcomes.get(market, []),
+                                              key=lambda outcome: outcome.get("pos", 0))]
+            except (KeyError, ValueError):
+                continue
+            if odds:
+                match = event["desc"].split(" À")[0].strip().replace("  ", " ")
+                match_odds_hash[match] = {"odds": {"parionssport": odds},
+                                          "date": format_timestamp(event.get("start"))}
+    return match_odds_hash
+
+
+def parse_pasinobet_api(data):
+    """
+    Cotes des matches des messages websocket de pasinobet, en retenant le marché 1N2 ou 12
+    """
+    match_odds_hash = {}
+    for game in walk(data):
+        if not ("team1_name" in game and "team2_name" in game
+                and isinstance(game.get("market"), dict)):
+            continue
+        for market in game["market"].values():
+            if isinstance(market, dict) and market.get("type") in ["P1XP2", "P1P2"]:
+                events = sorted(market.get("event", {}).values(),
+                                key=lambda event: event.get("order", 0))
+                odds = [event.get("price") for event in events]
+                if odds and all(isinstance(odd, (int, float)) for odd in odds):
+                    match = game["team1_name"] + " - " + game["team2_name"]
+                    match_odds_hash[match] = {"odds": {"pasinobet": odds},
+                                              "date": format_timestamp(game.get("start_ts"))}
+                break
+    return match_odds_hash
+
+
+def parse_unibet_api(data):
+    """
+    Cotes des matches de l'API de unibet, les cotes étant données sous forme fractionnaire
+    """
+    match_odds_hash = {}
+    for event in walk(data):
+        if not (isinstance(event.get("eventName"), str) and event.get("markets")):
+            continue
+        try:
+            odds = [round(1 + selection["currentPriceUp"] / selection["currentPriceDown"], 2)
+                    for selection in event["markets"][0].get("selections", [])]
+        except (KeyError, TypeError, ZeroDivisionError):
+            continue
+        match = format_unibet_names(event["eventName"].strip())
+        if odds and match.count(" - ") == 1:
+            match_odds_hash[match] = {"odds": {"unibet": odds},
+                                      "date": format_timestamp(event.get("eventStartDate"))}
+    return match_odds_hash
+
+
+API_PARSERS = {"betclic": parse_betclic_api,
+               "bwin": parse_bwin_api,
+               "parionssport": parse_parionssport_api,
+               "pasinobet": parse_pasinobet_api,
+               "unibet": parse_unibet_api}
+
+
+def parse_api(site, driver, url=""):
+    """
+    Retourne les cotes contenues dans les réponses de l'API de site concernant la compétition de
+    l'URL url reçues par le driver depuis start_capture. Retourne un dictionnaire vide (les
+    cotes doivent alors être lues dans le DOM) si aucune réponse exploitable n'a été reçue, ou si
+    l'API donne moins de matches que le DOM
+    """
+    data = captured_json(driver, API_URLS[site], competition_id(site, url))
+    if not data:
+        return {}
+    match_odds_hash = API_PARSERS[site](data)
+    if len(match_odds_hash) < dom_match_count(site, driver):
+        return {}
+    return match_odds_hash
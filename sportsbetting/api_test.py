@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests de la récupération des cotes dans les réponses des API des bookmakers
+"""
+
+import datetime
+import json
+
+from sportsbetting import api_functions
+
+
+class FakeDriver:
+    """
+    Driver factice dont le journal de performance contient les réponses données
+    """
+
+    def __init__(self, responses, frames=(), dom_matches=0):
+        self.log = []
+        self.bodies = {}
+        self.dom_matches = dom_matches
+        for i, (url, data) in enumerate(responses):
+            self.add_message("Network.responseReceived",
+                             {"requestId": str(i),
+                              "response": {"url": url, "mimeType": "application/json"}})
+            self.bodies[str(i)] = json.dumps(data)
+        for url, sent, data in frames:
+            self.add_message("Network.webSocketCreated", {"requestId": "ws", "url": url})
+            self.add_message("Network.webSocketFrameSent",
+                             {"requestId": "ws", "response": {"payloadData": json.dumps(sent)}})
+            self.add_message("Network.webSocketFrameReceived",
+                             {"requestId": "ws", "response": {"payloadData": json.dumps(data)}})
+
+    def add_message(self, method, params):
+        self.log.append({"message": json.dumps({"message": {"method": method,
+                                                            "params": params}})})
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        log, self.log = self.log, []
+        return log
+
+    def execute_script(self, script, *args):
+        assert "getElementsByClassName" in script
+        return self.dom_matches
+
+    def execute_cdp_cmd(self, command, params):
+        assert command == "Network.getResponseBody"
+        return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+
+
+def test_parse_api():
+    """
+    :return: Les cotes sont lues dans les réponses JSON de l'API du site concernant la
+    compétition, et un journal vide ou une API donnant moins de matches que le DOM renvoie au
+    parsing du DOM
+    """
+    url = "https://www.betclic.fr/football-s1/ligue-1-uber-eats-c4"
+    betclic = {"matches": [{"name": "Paris SG - Marseille", "date": "2020-09-13T19:00:00Z",
+                            "markets": [{"selections": [{"odds": 1.4}, {"odds": 4.5},
+                                                        {"odds": 6.8}]}]}]}
+    driver = FakeDriver([("https://www.betclic.fr/img/logo.json", {"name": "A - B"}),
+                         ("https://offer.cdn.betclic.fr/api/pub/v2/competitions/4", betclic),
+                         ("https://offer.cdn.betclic.fr/api/pub/v2/competitions/41",
+                          {"matches": [dict(betclic["matches"][0], name="Lyon - Nice")]})])
+    match_odds_hash = api_functions.parse_api("betclic", driver, url)
+    assert list(match_odds_hash) == ["Paris SG - Marseille"]
+    assert match_odds_hash["Paris SG - Marseille"]["odds"] == {"betclic": [1.4, 4.5, 6.8]}
+    assert isinstance(match_odds_hash["Paris SG - Marseille"]["date"], datetime.datetime)
+    assert api_functions.parse_api("betclic", driver, url) == {}
+    driver = FakeDriver([("https://offer.cdn.betclic.fr/api/pub/v2/competitions/4", betclic)],
+                        dom_matches=2)
+    assert api_functions.parse_api("betclic", driver, url) == {}
+    unibet = {"marketsByType": [{"days": [{"events": [
+        {"eventName": "Colo - Colo - Everton", "eventStartDate": 1600023600000,
+         "markets": [{"selections": [{"currentPriceUp": 3, "currentPriceDown": 4},
+                                     {"currentPriceUp": 2, "currentPriceDown": 1}]}]}]}]}]}
+    driver = FakeDriver([("https://www.unibet.fr/zones/sportnode/markets.json", unibet)])
+    assert (api_functions.parse_api("unibet", driver)["Colo-Colo - Everton"]["odds"]
+            == {"unibet": [1.75, 3]})
+    swarm = {"data": {"data": {"game": {"1": {
+        "team1_name": "Nadal", "team2_name": "Federer", "start_ts": 1600023600,
+        "market": {"7": {"type": "P1P2", "event": {"9": {"price": 2.1, "order": 1},
+                                                   "8": {"price": 1.7, "order": 0}}}}}}}}}
+    other = {"data": {"data": {"game": {"2": dict(swarm["data"]["data"]["game"]["1"],
+                                                  team1_name="Thiem")}}}}
+    driver = FakeDriver([], [("wss://eu-swarm-ws.betconstruct.com/",
+                              {"rid": 1, "params": {"where": {"competition": {"id": 545}}}},
+                              dict(swarm, rid=1)),
+                             ("wss://eu-swarm-ws.betconstruct.com/",
+                              {"rid": 2, "params": {"where": {"competition": {"id": 546}}}},
+                              dict(other, rid=2))])
+    assert (api_functions.parse_api("pasinobet", driver,
+                                    "https://www.pasinobet.fr/#/sport/?type=0&competition=545")
+            == {"Nadal - Federer": {"odds": {"pasinobet": [1.7, 2.1]},
+                                    "date": datetime.datetime.fromtimestamp(1600023600)}})
+
+
+def test_format_timestamp():
+    """
+    :return: Les dates ISO 8601, avec secondes décimales et Z ou décalage horaire, sont
+    converties en date locale sans datetime.fromisoformat
+    """
+    utc = datetime.datetime(2020, 9, 13, 19, 0, 0, 250000, datetime.timezone.utc)
+    local = utc.astimezone().replace(tzinfo=None)
+    assert api_functions.format_timestamp("2020-09-13T19:00:00.250Z") == local
+    assert api_functions.format_timestamp("2020-09-13T21:00:00.25+02:00") == local
+    assert api_functions.format_timestamp("2020-09-13T19:00:00") == datetime.datetime(
+        2020, 9, 13, 19)
+    assert api_functions.format_timestamp("13/09/2020") == "undefined"
+    assert api_functions.format_timestamp(None) == "undefined"
@@ -4,22 +4,27 @@ Fonctions auxiliaires (peu utiles pour l'utilisateur)
 
 from itertools import product, chain
 import collections
-from pprint import pprint
 import datetime
 import copy
 import itertools
 import math
 import re
 import time
+import numpy as np
 import sportsbetting
-from sportsbetting.database_functions import (get_formatted_name, is_in_db_site, is_in_db,
+from sportsbetting.database_functions import (resolve_names, print_unknown_name, is_in_db,
                                               get_close_name, add_name_to_db,
                                               get_id_by_site, get_id_by_opponent, get_close_name2,
                                               get_close_name3, get_double_team_tennis,
                                               get_id_by_opponent_thesportsdb, get_competition_id,
                                               is_matching_next_match, get_time_next_match)
 
-from sportsbetting.basic_functions import cotes_combine, cotes_freebet, mises2, mises, gain2
+from sportsbetting.basic_functions import mises2, mises, gain2, indicateurs_mises
+from sportsbetting.bet_result import STAKES_HEADER, BetResult, format_stakes
+from sportsbetting.odds_store import OddsStore, OddsView
+from sportsbetting.stakes_functions import StakeDistributor
+from sportsbetting.vectorized_functions import (best_match_vectorized, cotes_combine_vect,
+                                                cotes_freebet_vect)
 
 
 def valid_odds(all_odds, sport):
@@ -29,6 +34,8 @@ def valid_odds(all_odds, sport):
     retirées
     """
     n = 2 + (sport not in ["tennis", "volleyball", "basketball"])
+    if isinstance(all_odds, OddsStore):
+        return valid_odds_store(all_odds, n)
     copy_all_odds = copy.deepcopy(all_odds)
     for match in all_odds:
         for site in all_odds[match]["odds"]:
@@ -37,6 +44,24 @@ def valid_odds(all_odds, sport):
     return copy_all_odds
 
 
+def valid_odds_store(all_odds, n):
+    """
+    Équivalent de valid_odds pour un OddsStore
+    """
+    rows = all_odds.rows
+    nb_odds = all_odds.nb_odds[rows]
+    dates = all_odds.dates[rows]
+    past = ~np.isnat(dates) & (dates < np.datetime64(datetime.datetime.today(), "us"))
+    invalid = (nb_odds > 0) & ((nb_odds != n) | past[:, np.newaxis])
+    odds = np.full((len(rows), len(all_odds.sites), max(n, all_odds.odds.shape[2])), np.nan,
+                   dtype=np.float32)
+    odds[:, :, :all_odds.odds.shape[2]] = all_odds.odds[rows]
+    odds[invalid] = np.nan
+    odds[invalid, :n] = 1.01
+    nb_odds = np.where(invalid, n, nb_odds).astype(np.uint8)
+    return OddsStore(list(all_odds), dates, odds, nb_odds, all_odds.sites)
+
+
 def add_matches_to_db(odds, sport, site, id_competition):
     """
     :param odds: Cotes des matches
@@ -49,14 +74,9 @@ def add_matches_to_db(odds, sport, site, id_competition):
     teams = set(chain.from_iterable(list(map(lambda x: x.split(" - "), list(matches)))))
     teams = set(map(lambda x: x.strip(), teams))
     teams_sets = []
-    not_matching_teams = {}
+    not_matching_teams = {team: [] for team in teams}
     i = 0
-    teams_sets.append(set())
-    for team in teams:
-        not_matching_teams[team] = []
-        line = is_in_db_site(team, sport, site)
-        if not line:
-            teams_sets[i].add(team)
+    teams_sets.append(resolve_names(site, sport, teams)[1])
     if not teams_sets[i]:
         return
     print(i, list(teams_sets[i]), site)
@@ -111,20 +131,33 @@ def add_matches_to_db(odds, sport, site, id_competition):
                 return
 
 
-def adapt_names(odds, site, sport, competition):
+def adapt_match_names(odds, site, sport, competition):
     """
-    Uniformisation des noms d'équipe/joueur d'un site donné conformément aux noms disponibles sur
-    comparateur-de-cotes.fr. Par exemple, le match "OM - PSG" devient "Marseille - Paris SG"
+    Noms uniformisés des matches d'un site donné : {match: nouveau nom}, sans les matches dont
+    une équipe/un joueur est inconnu
     """
-    new_dict = {}
+    new_names = {}
     id_competition = get_competition_id(competition, sport)
     add_matches_to_db(odds, sport, site, id_competition)
+    teams = {team.strip() for match in odds for team in match.split(" - ")}
+    resolved, unresolved = resolve_names(site, sport, teams)
+    for team in unresolved:
+        print_unknown_name(team, site)
     for match in odds:
-        new_match = " - ".join(list(map(lambda x: get_formatted_name(x.strip(), site, sport),
-                                        match.split(" - "))))
-        if "UNKNOWN TEAM/PLAYER" not in new_match:
-            new_dict[new_match] = odds[match]
-    return new_dict
+        try:
+            new_names[match] = " - ".join(resolved[team.strip()] for team in match.split(" - "))
+        except KeyError:
+            continue
+    return new_names
+
+
+def adapt_names(odds, site, sport, competition):
+    """
+    Uniformisation des noms d'équipe/joueur d'un site donné conformément aux noms disponibles sur
+    comparateur-de-cotes.fr. Par exemple, le match "OM - PSG" devient "Marseille - Paris SG"
+    """
+    return {new_match: odds[match]
+            for match, new_match in adapt_match_names(odds, site, sport, competition).items()}
 
 
 def format_team_names(dict_odds, sport, competition):
@@ -190,6 +223,20 @@ def afficher_mises_combine(matches, sites, list_mises, cotes, sport="football",
     """
     Affichage de la répartition des mises
     """
+    print("\n" + STAKES_HEADER)
+    for line in format_stakes(repartition_mises_combine(matches, sites, list_mises, cotes, sport,
+                                                        rang_freebet, uniquement_freebet,
+                                                        cotes_boostees, rang_2e_freebet)):
+        print(line)
+
+
+def repartition_mises_combine(matches, sites, list_mises, cotes, sport="football",
+                              rang_freebet=None, uniquement_freebet=False,
+                              cotes_boostees=None, rang_2e_freebet=-1):
+    """
+    Répartition des mises par issue (ou combinaison d'issues), au format
+    [(issue, {site: {"mise": mise, "cote": cote}, ..., "total": total}), ...]
+    """
     opponents = []
     is_1n2 = sport not in ["tennis", "volleyball", "basketball", "nba"]
     for match in matches:
@@ -197,12 +244,8 @@ def afficher_mises_combine(matches, sites, list_mises, cotes, sport="football",
         if is_1n2:
             opponents_match.insert(1, "Nul")
         opponents.append(opponents_match)
-    dict_combinaison = {}
-    nb_chars = max(map(lambda x: len(" / ".join(x)), product(*opponents)))
-    print("\nRépartition des mises (les totaux affichés prennent en compte les "
-          "éventuels freebets):")
+    repartition = []
     for i, combinaison in enumerate(product(*opponents)):
-        diff = nb_chars - len(" / ".join(combinaison))
         sites_bet_combinaison = {}
         for j, list_sites in enumerate(sites):
             if list_sites[i] in sites_bet_combinaison:
@@ -242,8 +285,8 @@ def afficher_mises_combine(matches, sites, list_mises, cotes, sport="football",
                 sites_bet_combinaison["total"] = round(sum((x["cote"] - 1) * x["mise freebet"]
                                                            for x in sites_bet_combinaison.values()),
                                                        2)
-        dict_combinaison[combinaison] = sites_bet_combinaison
-        print(" / ".join(combinaison) + " " * diff + "\t", sites_bet_combinaison)
+        repartition.append((" / ".join(combinaison), sites_bet_combinaison))
+    return repartition
 
 
 def find_almost_won_matches(best_matches, repartition_mises, sport, output=False):
@@ -251,6 +294,18 @@ def find_almost_won_matches(best_matches, repartition_mises, sport, output=False
     Calcule la somme maximale remboursée pour une promotion du type pari rembourse si un seul
     résultat perdant, sans limite du nombre paris remboursés
     """
+    bonus = bonus_almost_won_matches(best_matches, repartition_mises, sport)
+    if output:
+        print("bonus min =", min(bonus))
+        print("bonus max =", max(bonus))
+    return max(bonus)
+
+
+def bonus_almost_won_matches(best_matches, repartition_mises, sport):
+    """
+    Sommes remboursées pour chaque combinaison gagnante, pour une promotion du type pari
+    remboursé si un seul résultat perdant
+    """
     matches = best_matches.split(" / ")
     opponents = []
     for match in matches:
@@ -275,13 +330,8 @@ def find_almost_won_matches(best_matches, repartition_mises, sport, output=False
     dict_index_almost_won = {}
     for gagnant, almost in dict_almost_won.items():
         dict_index_almost_won[gagnant] = list(map(list_combi.index, almost))
-    if output:
-        print("bonus min =", min(sum(repartition_mises[k] for k in list_index)
-                                 for list_index in dict_index_almost_won.values()))
-        print("bonus max =", max(sum(repartition_mises[k] for k in list_index)
-                                 for list_index in dict_index_almost_won.values()))
-    return max(sum(repartition_mises[k] for k in list_index)
-               for list_index in dict_index_almost_won.values())
+    return [sum(repartition_mises[k] for k in list_index)
+            for list_index in dict_index_almost_won.values()]
 
 
 def cotes_combine_all_sites(*matches, freebet=False):
@@ -289,16 +339,19 @@ def cotes_combine_all_sites(*matches, freebet=False):
     Calcule les cotes combinées de matches dont on connait les cotes sur plusieurs
     bookmakers
     """
-    sites = set(matches[0]["odds"].keys())
-    for match in matches:
-        sites = sites.intersection(match["odds"].keys())
+    sites = [site for site in matches[0]["odds"]
+             if all(site in match["odds"] for match in matches[1:])]
     combine_dict = {"date": max([match["date"] for match in matches]), "odds": {}}
-    for site in sites:
-        if freebet:
-            combine_dict["odds"][site] = cotes_freebet(cotes_combine([match["odds"][site]
-                                                                      for match in matches]))
-        else:
-            combine_dict["odds"][site] = cotes_combine([match["odds"][site] for match in matches])
+    if not sites:
+        return combine_dict
+    try:
+        combined = cotes_combine_vect([[match["odds"][site] for site in sites]
+                                       for match in matches])
+    except ValueError:  # Nombres de cotes différents selon les sites
+        combined = [cotes_combine_vect([[match["odds"][site]] for match in matches])[0]
+                    for site in sites]
+    for site, odds in zip(sites, combined):
+        combine_dict["odds"][site] = (cotes_freebet_vect(odds) if freebet else odds).tolist()
     return combine_dict
 
 
@@ -306,34 +359,11 @@ def defined_bets(odds_main, odds_second, main_sites, second_sites):
     """
     second_sites type : [[rank, bet, site],...]
     """
-    gain = 0
-    bets = []
-    if second_sites:
-        sites = copy.deepcopy(main_sites)
-        odds_adapted = copy.deepcopy(odds_main)
-        for bet in second_sites:
-            odds_adapted[bet[0]] = odds_second[bet[2]][bet[0]]
-            sites[bet[0]] = bet[2]
-        for bet in second_sites:
-            valid = True
-            bets = mises2(odds_adapted, bet[1], bet[0])
-            gain = bet[1] * odds_adapted[bet[0]]
-            for bet2 in second_sites:
-                if bets[bet2[0]] - bet2[1] > 1e-6:  # Si on mise plus que ce qui est disponible
-                    valid = False
-                    break
-            if valid:
-                break
-        index_to_del = []
-        for i, elem in enumerate(second_sites):
-            second_sites[i][1] -= bets[elem[0]]
-            if elem[1] < 1e-6:
-                index_to_del.append(i)
-        for i in index_to_del[::-1]:
-            del second_sites[i]
-        res = defined_bets(odds_main, odds_second, main_sites, second_sites)
-        return [gain + res[0], [bets] + res[1], [sites] + res[2]]
-    return [0, [], []]
+    distributor = StakeDistributor(len(odds_main), odds_second, len(second_sites))
+    distributor.set_odds(odds_main, odds_second, main_sites)
+    distributor.set_stakes([bet[1:] for bet in second_sites])
+    distributor.evaluate([bet[0] for bet in second_sites])
+    return distributor.distribution()
 
 
 def get_future_opponents(name, matches):
@@ -356,6 +386,10 @@ def get_future_opponents(name, matches):
     return future_opponents, future_matches
 
 def best_combine_reduit(matches, combinaison_boostee, site_combinaison, mise, sport, cote_boostee=0):
+    """
+    Retourne la meilleure répartition des mises d'un combiné réduit couvrant un combiné
+    boosté
+    """
     def get_odd(combinaison, matches, site_combinaison=None):
         sites = ['betclic', 'betstars', 'bwin', 'france_pari', 'joa', 'netbet', 'parionssport',
                  'pasinobet', 'pmu', 'unibet', 'winamax', 'zebet']
@@ -407,9 +441,7 @@ def best_combine_reduit(matches, combinaison_boostee, site_combinaison, mise, sp
             best_gain = new_gain
             best_i = i_boost
     matches_name = " / ".join(matches)
-    print(matches_name)
     mises = mises2(best_cotes, mise, best_i)
-    out = {}
     def get_issue(match, i, sport):
         if i==float("inf"):
             return
@@ -425,23 +457,18 @@ def best_combine_reduit(matches, combinaison_boostee, site_combinaison, mise, sp
         if sport not in ["basketball", "tennis"]:
             opponents_match.insert(1, "Nul")
         opponents.append(opponents_match)
-    nb_chars = max(map(lambda x: len(" / ".join(x)), product(*opponents)))
     sites = ['betclic', 'betstars', 'bwin', 'france_pari', 'joa', 'netbet', 'parionssport',
              'pasinobet', 'pmu', 'unibet', 'winamax', 'zebet']
     odds = {site: [get_odd(combine, matches, site)[0] for combine in best_combinaison] for site in sites}
-    
-    pprint({"date" : max(date for date in [sportsbetting.ODDS[sport][match]["date"]
-                                           for match in matches]),
-            "odds" :odds}, compact=True)
-    print("plus-value =", round(best_gain, 2))
-    print()
-    print("Répartition des mises (les totaux affichés prennent en compte les éventuels freebets):")
+    repartition = []
     for combine, mise, cote, site in zip(best_combinaison, mises, best_cotes, best_sites):
         names = [opponents_match[i] if i!=float("inf") else "" for match, i, opponents_match in zip(matches, combine, opponents)]
         name_combine = " / ".join(x for x in names if x)
-        diff = nb_chars - len(name_combine)
         sites_bet_combinaison = {site:{"mise":round(mise, 2), "cote":round(cote, 2)}, "total":round(round(mise, 2)*cote, 2)}
-        print(name_combine + " " * diff + "\t", sites_bet_combinaison)
+        repartition.append((name_combine, sites_bet_combinaison))
+    return BetResult(matches_name, max(date for date in [sportsbetting.ODDS[sport][match]["date"]
+                                                         for match in matches]),
+                     odds, {"plus-value": round(best_gain, 2)}, repartition)
 
 
 def convert_decimal_to_base(num, base):
@@ -453,14 +480,77 @@ def convert_decimal_to_base(num, base):
     return list(map(int, newNum))
 
 
-def best_match_base(odds_function, profit_function, criteria, display_function,
+def best_rank_match(odds, site, n, odds_function, profit_function, criteria, one_site=False):
+    """
+    Détermine la meilleure issue d'un match (cotes au format {site: [cotes]}) pour un site
+    donné. Retourne None si aucune issue ne convient, sinon le gain, le rang de l'issue, les cotes
+    retenues et les sites associés
+    """
+    if site not in odds:
+        return None
+    odds_site = odds[site]
+    best_odds = copy.deepcopy(odds_site)
+    best_sites = [site for _ in range(n)]
+    if not one_site:
+        for odds_i in odds.items():
+            for i in range(n):
+                if odds_i[1][i] > best_odds[i] and (odds_i[1][i] >= 1.1 or odds_i[0] == "pmu"):
+                    best_odds[i] = odds_i[1][i]
+                    best_sites[i] = odds_i[0]
+    for odd_i, site_i in zip(best_odds, best_sites):
+        if odd_i < 1.1 and site_i != "pmu":
+            return None
+    best = None
+    best_profit = -float("inf")
+    for i in range(n):
+        try:
+            odds_to_check = odds_function(best_odds, odds_site, i)
+            if criteria(odds_to_check, i):
+                profit = profit_function(odds_to_check, i)
+                if profit > best_profit:
+                    best_profit = profit
+                    best = (profit, i, odds_to_check,
+                            best_sites[:i] + [site] + best_sites[i + 1:])
+        except ZeroDivisionError:  # Si calcul freebet avec cote de 1
+            pass
+    return best
+
+
+def best_match_loop(all_odds, site, n, odds_function, profit_function, criteria,
+                    one_site=False):
+    """
+    Parcours match par match de best_match_base. Retourne None si aucun match ne convient, sinon
+    le nom du match, le rang de l'issue, les cotes retenues et les sites associés
+    """
+    best_profit = -float("inf")
+    best_match = None
+    best = None
+    nb_matches = len(all_odds)
+    for match in all_odds:
+        sportsbetting.PROGRESS += 100 / nb_matches
+        best_rank = best_rank_match(all_odds[match]['odds'], site, n, odds_function,
+                                    profit_function, criteria, one_site)
+        if best_rank and best_rank[0] > best_profit:
+            best_profit = best_rank[0]
+            best_match = match
+            best = best_rank[1:]
+    if best_match:
+        return (best_match, *best)
+    return None
+
+
+def best_match_base(odds_function, profit_function, criteria, indicators_function,
                     result_function, site, sport="football", date_max=None,
                     time_max=None, date_min=None, time_min=None, combine=False,
                     nb_matches_combine=2, freebet=False, one_site=False, recalcul=False,
-                    combine_opt=False):
+                    combine_opt=False, vectorized=None, second_rank_function=None):
     """
     Fonction de base de détermination du meilleur match sur lequel parier en
-    fonction de critères donnés
+    fonction de critères donnés. Si vectorized est renseigné, il contient les versions
+    vectorisées (numpy) de odds_function, profit_function et criteria, et le parcours des matches
+    se fait en une seule passe. indicators_function et result_function donnent les indicateurs et
+    la répartition des mises pour les cotes retenues, et second_rank_function l'éventuelle issue
+    sur laquelle est placé un 2e freebet. Retourne un BetResult
     """
     try:
         if combine:
@@ -473,73 +563,49 @@ def best_match_base(odds_function, profit_function, criteria, display_function,
         print("""
         Merci de définir les côtes de base, appelez la fonction parse_football,
         parse_nba ou parse_tennis selon vos besoins""")
-        return
-    best_profit = -float("inf")
-    best_rank = 0
+        return BetResult()
     if combine:
         n = (2 + (sport not in ["tennis", "volleyball", "basketball", "nba"])) ** nb_matches_combine
     else:
         n = 2 + (sport not in ["tennis", "volleyball", "basketball", "nba"])
-    best_match = None
-    best_overall_odds = None
-    sites = None
-    nb_matches = len(all_odds)
-    for match in all_odds:
-        sportsbetting.PROGRESS += 100 / nb_matches
-        if site in all_odds[match]['odds']:
-            odds_site = all_odds[match]['odds'][site]
-            best_odds = copy.deepcopy(odds_site)
-            best_sites = [site for _ in range(n)]
-            if not one_site:
-                for odds in all_odds[match]['odds'].items():
-                    for i in range(n):
-                        if odds[1][i] > best_odds[i] and (odds[1][i] >= 1.1 or odds[0] == "pmu"):
-                            best_odds[i] = odds[1][i]
-                            best_sites[i] = odds[0]
-            for odd_i, site_i in zip(best_odds, best_sites):
-                if odd_i < 1.1 and site_i != "pmu":
-                    break
-            else:
-                for i in range(n):
-                    try:
-                        odds_to_check = odds_function(best_odds, odds_site, i)
-                        if criteria(odds_to_check, i):
-                            profit = profit_function(odds_to_check, i)
-                            if profit > best_profit:
-                                best_rank = i
-                                best_profit = profit
-                                best_match = match
-                                best_overall_odds = odds_to_check
-                                sites = best_sites[:i] + [site] + best_sites[i + 1:]
-                    except ZeroDivisionError:  # Si calcul freebet avec cote de 1
-                        pass
-    if best_match:
-        if combine_opt and combine:
-            ref_combinaison = list(reversed(convert_decimal_to_base(best_rank, get_nb_issues(sport))))
-            n_combi = len(ref_combinaison)
-            for _ in range(nb_matches_combine - n_combi):
-                ref_combinaison.append(0)
-            stakes = result_function(best_overall_odds, best_rank)
-            best_combine_reduit(best_match.split(" / "), list(reversed(ref_combinaison)), site, stakes[best_rank], sport)
-        else:
-            print(best_match)
-            pprint(all_odds[best_match], compact=True)
-            if recalcul:
-                sum_almost_won = find_almost_won_matches(best_match,
-                                                        result_function(best_overall_odds,
-                                                                        best_rank),
-                                                        sport)
-                display_function = lambda x, y: mises(x, 10000 * 50 / sum_almost_won, True)
-                result_function = lambda x, y: mises(x, 10000 * 50 / sum_almost_won, False)
-                find_almost_won_matches(best_match, result_function(best_overall_odds, best_rank),
-                                        sport, True)
-            second_rank = display_function(best_overall_odds, best_rank)
-            afficher_mises_combine(best_match.split(" / "), [sites],
-                                [result_function(best_overall_odds, best_rank)],
-                                all_odds[best_match]["odds"], sport, best_rank if freebet else None,
-                                one_site and freebet, best_overall_odds, second_rank)
+    if vectorized:
+        best = best_match_vectorized(all_odds, site, n, *vectorized, one_site)
+        sportsbetting.PROGRESS += 100 * bool(all_odds)
     else:
-        print("No match found")
+        best = best_match_loop(all_odds, site, n, odds_function, profit_function, criteria,
+                               one_site)
+    best_match, best_rank, best_overall_odds, sites = best or (None, 0, None, None)
+    if not best_match:
+        return BetResult()
+    if combine_opt and combine:
+        ref_combinaison = list(reversed(convert_decimal_to_base(best_rank, get_nb_issues(sport))))
+        n_combi = len(ref_combinaison)
+        for _ in range(nb_matches_combine - n_combi):
+            ref_combinaison.append(0)
+        stakes = result_function(best_overall_odds, best_rank)
+        return best_combine_reduit(best_match.split(" / "), list(reversed(ref_combinaison)), site,
+                                   stakes[best_rank], sport)
+    indicators = {}
+    if recalcul:
+        sum_almost_won = find_almost_won_matches(best_match,
+                                                 result_function(best_overall_odds, best_rank),
+                                                 sport)
+        indicators_function = lambda x, y: indicateurs_mises(x, 10000 * 50 / sum_almost_won)
+        result_function = lambda x, y: mises(x, 10000 * 50 / sum_almost_won, False)
+        bonus = bonus_almost_won_matches(best_match, result_function(best_overall_odds, best_rank),
+                                         sport)
+        indicators.update({"bonus min": min(bonus), "bonus max": max(bonus)})
+    indicators.update(indicators_function(best_overall_odds, best_rank))
+    second_rank = (second_rank_function(best_overall_odds, best_rank) if second_rank_function
+                   else None)
+    odds_best_match = all_odds[best_match]
+    stakes = repartition_mises_combine(best_match.split(" / "), [sites],
+                                       [result_function(best_overall_odds, best_rank)],
+                                       odds_best_match["odds"], sport,
+                                       best_rank if freebet else None, one_site and freebet,
+                                       best_overall_odds, second_rank)
+    return BetResult(best_match, odds_best_match["date"], odds_best_match["odds"], indicators,
+                     stakes)
 
 
 def generate_sites(url_netbet):
@@ -583,17 +649,18 @@ def datetime_from_strings(date_max=None, time_max=None, date_min=None, time_min=
     return datetime_max, datetime_min
 
 def filter_dict_dates(odds, date_max=None, time_max=None, date_min=None, time_min=None):
-    all_odds = copy.deepcopy(odds)
+    """
+    Retourne une vue (sans copie) des matches compris entre les dates données
+    """
     datetime_max, datetime_min = datetime_from_strings(date_max, time_max, date_min, time_min)
-    def check(datetime_min, datetime_max, date):
-        return ((not datetime_min) or datetime_min <= date) and ((not datetime_max) or datetime_max >= date)
-    all_odds = {k: v for k, v in all_odds.items() if check(datetime_min, datetime_max, v["date"])}
-    return all_odds
+    return OddsView(odds).dates(datetime_min, datetime_max)
 
 def filter_dict_minimum_odd(odds, minimum_odd, site):
-    all_odds = copy.deepcopy(odds)
-    all_odds = {k: v for k, v in all_odds.items() if site in v["odds"] and all([odd >= minimum_odd for odd in v["odds"][site]])}
-    return all_odds
+    """
+    Retourne une vue (sans copie) des matches dont toutes les cotes sur site sont supérieures à
+    minimum_odd
+    """
+    return OddsView(odds).minimum_odd(minimum_odd, site)
 
 def combine_reduit(nb_matches, combi_to_keep, sport):
     def get_issues(combi_to_keep_aux):
@@ -690,6 +757,15 @@ def format_bwin_time(string):
                                                 "%d %b %Y %H:%M")
     return datetime.datetime.strptime(string, "%d/%m/%Y %H:%M")
 
+def format_unibet_names(match):
+    hyphenated_names = ["Bordeaux-Bègles", "Flensburg-Handewitt", "TSV Hannovre-Burgdorf",
+                        "Tremblay-en-France", "FC Vion Zlate Moravce-Vrable",
+                        "Toulon St-Cyr Var (F)", "Châlons-Reims", "Colo-Colo", "Bourg-en-Bresse",
+                        "Grande-Bretagne", "Rostov-Don (F)", "CS Hammam-Lif"]
+    for name in hyphenated_names:
+        match = match.replace(name.replace("-", " - "), name)
+    return match
+
 def reverse_match_odds(match, odds):
     match = " - ".join(reversed(match.split(" - ")))
     odds.reverse()
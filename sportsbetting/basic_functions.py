@@ -3,9 +3,18 @@
 Assistant de paris sportifs
 """
 
-from itertools import product
 import numpy as np
 
+from sportsbetting.vectorized_functions import cotes_combine_vect
+
+
+def afficher_indicateurs(indicateurs):
+    """
+    Affiche les indicateurs d'une répartition des mises ({nom: valeur})
+    """
+    for nom, valeur in indicateurs.items():
+        print(nom, "=", valeur)
+
 
 def gain(cotes, mise=1):
     """
@@ -43,21 +52,22 @@ def mises(cotes, mise=1, output=False):
     :return: Répartition optimale des mises
     :rtype: list[float] or None
     """
-    gains = gain(cotes, mise)
-    mises_reelles = list(map(lambda x: gains / x, cotes))
     if output:
-        mis = list(map(lambda x: round(x, 2), mises_reelles))
-        print("somme des mises =", round(sum(mis), 2))
-        print("gain min =", min([round(mis[i] * cotes[i], 2)
-                                 for i in range(len(mis))]))
-        print("gain max =", max([round(mis[i] * cotes[i], 2)
-                                 for i in range(len(mis))]))
-        print("plus-value max =",
-              round(min([round(mis[i] * cotes[i], 2)
-                         for i in range(len(mis))]) - sum(mis), 2))
-        print("mises arrondies =", mis)
+        afficher_indicateurs(indicateurs_mises(cotes, mise))
         return
-    return mises_reelles
+    gains = gain(cotes, mise)
+    return list(map(lambda x: gains / x, cotes))
+
+
+def indicateurs_mises(cotes, mise=1):
+    """
+    Somme des mises, gains et plus-value de la répartition des mises calculée par mises
+    """
+    mis = list(map(lambda x: round(x, 2), mises(cotes, mise)))
+    gains = [round(mis[i] * cotes[i], 2) for i in range(len(mis))]
+    return {"somme des mises": round(sum(mis), 2), "gain min": min(gains),
+            "gain max": max(gains), "plus-value max": round(min(gains) - sum(mis), 2),
+            "mises arrondies": mis}
 
 
 def mises2(cotes, mise_requise, choix=-1, output=False):
@@ -76,26 +86,24 @@ def mises2(cotes, mise_requise, choix=-1, output=False):
     :return: Répartition optimale des mises
     :rtype: list[float] or None
     """
+    if output:
+        afficher_indicateurs(indicateurs_mises2(cotes, mise_requise, choix))
+        return
     if choix == -1:
         choix = np.argmin(cotes)
     gains = mise_requise * cotes[choix]
-    mises_reelles = list(map(lambda x: gains / x, cotes))
-    if output:
-        mis = list(map(lambda x: round(x, 2), mises_reelles))
-        print("somme des mises =", round(sum(mis), 2))
-        print("gain min =", min([round(mis[i] * cotes[i], 2)
-                                 for i in range(len(mis))]))
-        print("gain max =", max([round(mis[i] * cotes[i], 2)
-                                 for i in range(len(mis))]))
-        print("plus-value min =",
-              round(min([round(mis[i] * cotes[i], 2)
-                         for i in range(len(mis))]) - sum(mis), 2))
-        print("plus-value max =",
-              round(max([round(mis[i] * cotes[i], 2)
-                         for i in range(len(mis))]) - sum(mis), 2))
-        print("mises arrondies =", mis)
-        return
-    return mises_reelles
+    return list(map(lambda x: gains / x, cotes))
+
+
+def indicateurs_mises2(cotes, mise_requise, choix=-1):
+    """
+    Somme des mises, gains et plus-values de la répartition des mises calculée par mises2
+    """
+    mis = list(map(lambda x: round(x, 2), mises2(cotes, mise_requise, choix)))
+    gains = [round(mis[i] * cotes[i], 2) for i in range(len(mis))]
+    return {"somme des mises": round(sum(mis), 2), "gain min": min(gains),
+            "gain max": max(gains), "plus-value min": round(min(gains) - sum(mis), 2),
+            "plus-value max": round(max(gains) - sum(mis), 2), "mises arrondies": mis}
 
 
 def cotes_freebet(cotes):
@@ -130,19 +138,35 @@ def mises_freebet(cotes, freebet, issue=-1, output=False):
     Calcule la repartition des mises en presence d'un freebet a placer sur l'une
     des issues. Par defaut, le freebet est place sur la cote la plus haute.
     """
+    if output:
+        afficher_indicateurs(indicateurs_mises_freebet(cotes, freebet, issue))
+        return
     if issue == -1:
         issue = np.argmax(cotes)
-    mises_reelles = mises2(cotes[:issue] + [cotes[issue] - 1] + cotes[issue + 1:], freebet, issue)
+    return mises2(cotes[:issue] + [cotes[issue] - 1] + cotes[issue + 1:], freebet, issue)
+
+
+def indicateurs_gain_freebet(mis, gains, freebet):
+    """
+    Gains de la répartition des mises (arrondies) mis en présence de freebets de montant total
+    freebet
+    """
+    return {"gain sur freebet": round(gains + freebet - sum(mis), 2),
+            "gain sur freebet / mise freebet": round(gains + freebet - sum(mis), 2) / freebet,
+            "gain": round(gains, 2), "mise totale (hors freebet)": round(sum(mis) - freebet, 2),
+            "mises arrondies": mis}
+
+
+def indicateurs_mises_freebet(cotes, freebet, issue=-1):
+    """
+    Gains de la répartition des mises calculée par mises_freebet
+    """
+    if issue == -1:
+        issue = np.argmax(cotes)
+    mises_reelles = mises_freebet(cotes, freebet, issue)
     gains = mises_reelles[issue] * (cotes[issue] - 1)
-    if output:
-        mis = list(map(lambda x: round(x, 2), mises_reelles))
-        print("gain sur freebet =", round(gains + freebet - sum(mis), 2))
-        print("gain sur freebet / mise freebet =", round(gains + freebet - sum(mis), 2) / freebet)
-        print("gain =", round(gains, 2))
-        print("mise totale (hors freebet) =", round(sum(mis) - freebet, 2))
-        print("mises arrondies =", mis)
-        return
-    return mises_reelles
+    return indicateurs_gain_freebet(list(map(lambda x: round(x, 2), mises_reelles)), gains,
+                                    freebet)
 
 
 def mises_freebet2(cotes, freebet, issue=-1, output=False):
@@ -150,6 +174,18 @@ def mises_freebet2(cotes, freebet, issue=-1, output=False):
     Calcule la repartition des mises en presence de 2 freebets a placer sur des issues d'un même
     match. Le 2e freebet est placé automatiquement.
     """
+    mises_reelles, _, _, issue2 = repartition_freebet2(cotes, freebet, issue)
+    if output:
+        afficher_indicateurs(indicateurs_mises_freebet2(cotes, freebet, issue))
+        return issue2
+    return mises_reelles
+
+
+def repartition_freebet2(cotes, freebet, issue=-1):
+    """
+    Calcul de mises_freebet2 : retourne les mises, le gain, le montant total des freebets placés
+    et l'issue sur laquelle est placé le 2e freebet
+    """
     i_max = np.argmax(cotes)
     if issue == -1:
         issue = i_max
@@ -162,14 +198,16 @@ def mises_freebet2(cotes, freebet, issue=-1, output=False):
         mises_reelles[issue2] = round(gains / (cotes[issue2] - 1), 2)
         mis = list(map(lambda x: round(x, 2), mises_reelles))
         freebet += mis[issue2]
-    if output:
-        print("gain sur freebet =", round(gains + freebet - sum(mis), 2))
-        print("gain sur freebet / mise freebet =", round(gains + freebet - sum(mis), 2) / freebet)
-        print("gain =", round(gains, 2))
-        print("mise totale (hors freebet) =", round(sum(mis) - freebet, 2))
-        print("mises arrondies =", mis)
-        return issue2
-    return mises_reelles
+    return mises_reelles, gains, freebet, issue2
+
+
+def indicateurs_mises_freebet2(cotes, freebet, issue=-1):
+    """
+    Gains de la répartition des mises calculée par mises_freebet2
+    """
+    mises_reelles, gains, freebet, _ = repartition_freebet2(cotes, freebet, issue)
+    return indicateurs_gain_freebet(list(map(lambda x: round(x, 2), mises_reelles)), gains,
+                                    freebet)
 
 
 def gain_freebet2(cotes, freebet, issue=-1):
@@ -194,7 +232,7 @@ def cotes_combine(cotes):
     """
     Calcule les cotes de plusieurs matches combines
     """
-    return [round(np.prod(i), 4) for i in product(*cotes)]
+    return cotes_combine_vect([[cotes_match] for cotes_match in cotes])[0].tolist()
 
 
 def gain_pari_rembourse_si_perdant(cotes, mise_max, rang=-1, remb_freebet=False,
@@ -220,20 +258,32 @@ def mises_pari_rembourse_si_perdant(cotes, mise_max, rang=-1, remb_freebet=False
     defaut, la mise remboursee est placee sur la cote la plus haute et le
     remboursement est effectue en argent reel
     """
+    if output:
+        afficher_indicateurs(indicateurs_mises_pari_rembourse_si_perdant(
+            cotes, mise_max, rang, remb_freebet, taux_remboursement))
+        return
     taux = ((not remb_freebet) + 0.77 * remb_freebet) * taux_remboursement
     if rang == -1:
         rang = np.argmax(cotes)
     gains = mise_max * cotes[rang]
     mis_reelles = list(map(lambda x: (gains - mise_max * taux) / x, cotes))
     mis_reelles[rang] = mise_max
-    if output:
-        mis = list(map(lambda x: round(x, 2), mis_reelles))
-        print("gain net =", round(gains - sum(mis), 2))
-        print("mises arrondies =", mis)
-        return
     return mis_reelles
 
 
+def indicateurs_mises_pari_rembourse_si_perdant(cotes, mise_max, rang=-1, remb_freebet=False,
+                                                taux_remboursement=1):
+    """
+    Gain net de la répartition des mises calculée par mises_pari_rembourse_si_perdant
+    """
+    if rang == -1:
+        rang = np.argmax(cotes)
+    mis = list(map(lambda x: round(x, 2),
+                   mises_pari_rembourse_si_perdant(cotes, mise_max, rang, remb_freebet,
+                                                   taux_remboursement)))
+    return {"gain net": round(mise_max * cotes[rang] - sum(mis), 2), "mises arrondies": mis}
+
+
 def mises_promo_gain_cote(cotes, mise_minimale, rang, output=False):
     """
     Calcule la répartition des mises pour la promotion "gain en freebet de la cote gagnée"
@@ -244,11 +294,18 @@ def mises_promo_gain_cote(cotes, mise_minimale, rang, output=False):
         mis.append((gains / cote))
     mis[rang] = mise_minimale
     if output:
-        print("somme mises=", sum(mis))
-        print("gain=", gains)
+        afficher_indicateurs(indicateurs_mises_promo_gain_cote(cotes, mise_minimale, rang))
     return mis
 
 
+def indicateurs_mises_promo_gain_cote(cotes, mise_minimale, rang):
+    """
+    Somme des mises et gain de la répartition des mises calculée par mises_promo_gain_cote
+    """
+    return {"somme mises": sum(mises_promo_gain_cote(cotes, mise_minimale, rang)),
+            "gain": cotes[rang] * 0.77 + mise_minimale * cotes[rang]}
+
+
 def gain_promo_gain_cote(cotes, mise_minimale, rang):
     """
     Calcule le gain pour la promotion "gain en freebet de la cote gagnée"
@@ -296,6 +353,17 @@ def mises_gains_nets_boostes(cotes, gain_max, boost_selon_cote=True, freebet=Tru
     """
     Optimisation de gain pour promotion Betclic de type "Cotes boostees"
     """
+    if output:
+        afficher_indicateurs(indicateurs_mises_gains_nets_boostes(cotes, gain_max,
+                                                                  boost_selon_cote, freebet,
+                                                                  boost))
+    return repartition_gains_nets_boostes(cotes, gain_max, boost_selon_cote, freebet, boost)[0]
+
+
+def repartition_gains_nets_boostes(cotes, gain_max, boost_selon_cote=True, freebet=True, boost=1):
+    """
+    Calcul de mises_gains_nets_boostes : retourne les mises et la plus-value associée
+    """
     new_cotes = list(map(lambda x: cote_boostee(x, boost_selon_cote, freebet, boost), cotes))
     benefice_max = -float("inf")
     meilleures_mises = []
@@ -316,10 +384,19 @@ def mises_gains_nets_boostes(cotes, gain_max, boost_selon_cote=True, freebet=Tru
         if benefice > benefice_max:
             benefice_max = benefice
             meilleures_mises = mises_corrigees
-    if output:
-        print("somme des mises =", sum(meilleures_mises))
-        print("plus-value =", round(benefice_max, 2))
-    return meilleures_mises
+    return meilleures_mises, benefice_max
+
+
+def indicateurs_mises_gains_nets_boostes(cotes, gain_max, boost_selon_cote=True, freebet=True,
+                                         boost=1):
+    """
+    Somme des mises et plus-value de la répartition des mises calculée par
+    mises_gains_nets_boostes
+    """
+    meilleures_mises, benefice_max = repartition_gains_nets_boostes(cotes, gain_max,
+                                                                    boost_selon_cote, freebet,
+                                                                    boost)
+    return {"somme des mises": sum(meilleures_mises), "plus-value": round(benefice_max, 2)}
 
 
 def gain_gains_nets_boostes(cotes, gain_max, boost_selon_cote=True, freebet=True, boost=1):
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Mesures de performance des parsers (sur des pages synthétiques et sur les pages enregistrées
+avec replay_functions.record_parsing), de la fusion et de l'uniformisation des cotes et des
+recherches de meilleurs matches. Chaque durée est rapportée à celle d'un calcul de référence,
+pour être comparable d'une machine à l'autre, et le test échoue si elle dépasse de plus de
+BENCHMARK_THRESHOLD fois la durée de référence lue dans PATH_BENCHMARKS. Seules les mesures
+d'au moins MIN_GATED_DURATION fois le calcul de référence sont vérifiées, les plus courtes étant
+trop sensibles aux variations de la machine.
+Ces tests ne sont lancés que sur demande (pytest -m benchmark) : aucun workflow d'intégration
+continue ne les lance, la recherche de régressions est donc manuelle. Les durées de référence
+sont enregistrées en lançant les tests avec la variable d'environnement RECORD_BENCHMARKS=1
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import time
+
+import pytest
+
+import sportsbetting
+from sportsbetting import replay_functions, selenium_init
+from sportsbetting.auxiliary_functions import (best_combine_reduit, format_team_names,
+                                               merge_dict_odds)
+from sportsbetting.database_functions import db_fetchall, site_column
+from sportsbetting.parser_functions import parse
+from sportsbetting.scraping_functions import HTTP_SITES
+from sportsbetting.user_functions import (best_match_cashback, best_match_freebet,
+                                          best_match_gain_cote, best_match_pari_gagnant,
+                                          best_match_stakes_to_bet, best_match_under_conditions,
+                                          best_matches_combine, best_matches_freebet,
+                                          best_matches_freebet_one_site, best_stakes_match)
+from sportsbetting.vectorized_test import random_odds
+
+PATH_BENCHMARKS = os.path.dirname(sportsbetting.__file__) + "/resources/benchmarks.json"
+BENCHMARK_THRESHOLD = 2
+MIN_GATED_DURATION = 0.5
+RECORD_BENCHMARKS = os.environ.get("RECORD_BENCHMARKS") == "1"
+NB_MATCHES = 200
+
+pytestmark = pytest.mark.benchmark
+
+
+def reference_duration():
+    """
+    Durée du calcul de référence
+    """
+    durations = []
+    for _ in range(5):
+        start = time.perf_counter()
+        sorted(str(i * 7919 % 10007) for i in range(100000))
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+REFERENCE_DURATION = reference_duration()
+
+
+def benchmark(name, function, repeat=3):
+    """
+    Mesure la durée minimale de function sur repeat exécutions, la compare à la durée de
+    référence du benchmark name et retourne le résultat de function
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        durations.append(time.perf_counter() - start)
+    relative_duration = min(durations) / REFERENCE_DURATION
+    try:
+        with open(PATH_BENCHMARKS, encoding="utf-8") as file:
+            baselines = json.load(file)
+    except (OSError, ValueError):
+        baselines = {}
+    if RECORD_BENCHMARKS:
+        baselines[name] = relative_duration
+        with open(PATH_BENCHMARKS, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=4, sort_keys=True)
+    if baselines.get(name, 0) < MIN_GATED_DURATION:
+        return result
+    assert relative_duration <= BENCHMARK_THRESHOLD * baselines[name], (
+        "{} : {:.1f} fois la durée de référence, contre {:.1f} auparavant"
+        .format(name, relative_duration, baselines[name]))
+    return result
+
+
+def synthetic_page(match_html):
+    """
+    Page contenant NB_MATCHES matches, entourés d'éléments sans intérêt pour les parsers
+    """
+    rnd = random.Random(0)
+    noise = ("<div class='noise'><ul><li><span>x</span><a href='#'>y</a></li></ul>"
+             "<p><b>z</b><i>w</i></p></div>") * 3
+    body = "".join(match_html(i, ["{:.2f}".format(rnd.uniform(1.01, 9)) for _ in range(3)])
+                   + noise for i in range(NB_MATCHES))
+    return ("<html><head><title>A//B - pmu</title><script>var a = 1;</script></head><body>"
+            "<div><div>" + body + "</div></div></body></html>")
+
+
+def synthetic_pages():
+    """
+    Pages synthétiques au format de chaque parser : {site: (url, page)}
+    """
+    date = datetime.datetime.today() + datetime.timedelta(days=1)
+    day = date.strftime("%A %d %B")
+    spans = lambda odds, comma=False, prefix="", cls="": "".join(
+        "{}<span{}>{}</span>".format(prefix, " class='{}'".format(cls) if cls else "",
+                                     odd.replace(".", ",") if comma else odd) for odd in odds)
+    return {
+        "betclic": ("https://www.betclic.fr/football/ligue-1/e1", synthetic_page(
+            lambda i, odds: "<div class='betBox_matchName'><span>A{0}</span><span>B{0}</span>"
+                            "</div><app-date>{1}</app-date><div class='betBox_odds'>{2}</div>"
+            .format(i, date.strftime("%d/%m/%Y %H:%M"), spans(odds, True, cls="oddValue")))),
+        "bwin": ("https://sports.bwin.fr/fr/sports/football-4/paris-sportifs/france-16/ligue-1",
+                 synthetic_page(
+                     lambda i, odds: "<div class='participants-pair-game'><div>A{0}</div>"
+                                     "<div>B{0}</div></div><div class='starting-time'>{1}</div>"
+                                     "<div class='grid-group-container'>"
+                                     "<div class='grid-option-group'>{2}</div></div>"
+                     .format(i, date.strftime("%d/%m/%Y %H:%M"), spans(odds)))),
+        "france_pari": ("https://www.france-pari.fr/competition/96-ligue-1", synthetic_page(
+            lambda i, odds: "<div class='date'>{1}</div><div class='odd-event-block "
+                            "snc-odds-date-lib'><span>20:00</span><span>A{0}</span><span>/"
+                            "</span><span>B{0}</span></div><div class='odd-event-block'>{2}</div>"
+            .format(i, day, spans(odds, True, "<span>1</span>")))),
+        "joa": ("https://www.joa-online.fr/fr/sport/paris/ligue-1", synthetic_page(
+            lambda i, odds: "<div class='bet-event-name'><span>A{0}</span><span>B{0}</span>"
+                            "</div><div class='bet-event-date-info'>{1}</div>"
+                            "<div class='bet-outcome-list'>{2}</div>"
+            .format(i, date.strftime("%d/%m%H:%M"), spans(odds)))),
+        "netbet": ("https://www.netbet.fr/football/france/96-ligue-1", synthetic_page(
+            lambda i, odds: "<div class='nb-event_datestart'><span>{1}</span></div><div class="
+                            "'nb-event_timestart'>20:00</div><div class='nb-event_actors'><span>"
+                            "A{0}</span><span>B{0}</span></div><div class='nb-event_odds_wrapper'>"
+                            "{2}</div>".format(i, date.strftime("%d/%m"),
+                                               spans(odds, True, "<span>1</span>")))),
+        "parionssport": ("https://www.enligne.parionssport.fdj.fr/paris-football/france/ligue-1"
+                         "?filtre=1", synthetic_page(
+                             lambda i, odds: "<div class='wpsel-titleRubric'>{1}</div><span "
+                                             "class='wpsel-timerLabel'>À 20h00</span><div class="
+                                             "'wpsel-desc'>A{0} - B{0}</div><div class="
+                                             "'buttonLine'>{2}</div>"
+                             .format(i, day, spans(odds, True)))),
+        "pasinobet": ("https://www.pasinobet.fr/#/sport/?type=0&competition=1", synthetic_page(
+            lambda i, odds: "<div class='category-date'>{1}</div><div class='event-title'><div "
+                            "class='teams-container'><span>A{0}</span></div><div class="
+                            "'teams-container'><span>B{0}</span></div></div><div class='time'>"
+                            "20:00</div><div class='event-list'>{2}</div>"
+            .format(i, date.strftime("%A, %d %B %Y"), spans(odds)))),
+        "pmu": ("https://paris-sportifs.pmu.fr/pari/competition/169/football/ligue-1",
+                synthetic_page(
+                    lambda i, odds: "<div class='shadow' data-date='{1}'></div><div class="
+                                    "'trow--live--remaining-time'>20h00</div><a data-name='x' "
+                                    "data-sport_id='football' href='/m/{0}'><span class="
+                                    "'trow--event--name'><span>A{0}</span><span>//</span><span>"
+                                    "B{0}</span></span></a><div class='event-list-odds-list'>{2}"
+                                    "</div>".format(i, date.strftime("%Y-%m-%d"),
+                                                    spans(odds, True)))),
+        "unibet": ("https://www.unibet.fr/sport/football/france/ligue-1", synthetic_page(
+            lambda i, odds: "<div class='cell-event'>A{0} - B{0}</div><div class='datetime'>{1}"
+                            "</div><div class='oddsbox'>{2}</div>"
+            .format(i, date.strftime("%d/%m/%Y %H:%M"), spans(odds, cls="price")))),
+        "zebet": ("https://www.zebet.fr/fr/competition/96-ligue_1", synthetic_page(
+            lambda i, odds: "<div class='bet-time'>{1}</div><div class='competition'>{2}</div>"
+            .format(i, date.strftime("%d/%m %H:%M"),
+                    "".join("<span>{}</span><span>{}{}</span><span>x</span><span>y</span>"
+                            .format(odd.replace(".", ","), "AB"[k > 0], i)
+                            for k, odd in enumerate(odds))))),
+    }
+
+
+def test_benchmark_parsers(tmp_path):
+    """
+    :return: Les parsers lisent tous les matches des pages synthétiques rejouées, dans le temps
+    imparti
+    """
+    pages = synthetic_pages()
+    for site, (url, page) in pages.items():
+        if site in HTTP_SITES:
+            replay_functions.save_http_fixture(str(tmp_path), url, page.encode("utf-8"))
+        else:
+            replay_functions.save_selenium_fixture(str(tmp_path), url, page)
+    with replay_functions.replaying(str(tmp_path)):
+        for site, (url, _) in pages.items():
+            if site not in HTTP_SITES:
+                selenium_init.DRIVER.warm(site)
+            odds = benchmark("parse_" + site, lambda: parse(site, url))
+            assert len(odds) == NB_MATCHES, site
+            assert all(len(match["odds"][site]) == 3 for match in odds.values()), site
+
+
+def test_benchmark_recorded_parsers():
+    """
+    :return: Les parsers traitent les pages enregistrées dans le temps imparti
+    """
+    parsings = replay_functions.recorded_parsings()
+    if not parsings:
+        pytest.skip("Aucune page enregistrée")
+    for site, url in parsings:
+        benchmark("replay_" + site + "_" + url, lambda: replay_functions.replay_parsing(site, url))
+
+
+def test_benchmark_odds():
+    """
+    :return: L'uniformisation des noms et la fusion des cotes des sites se font dans le temps
+    imparti
+    """
+    dict_odds = {}
+    for site in ["betclic", "winamax", "unibet"]:
+        names = [line[0] for line in db_fetchall("SELECT {0} FROM names WHERE sport='football' "
+                                                 "AND {0} IS NOT NULL LIMIT 400"
+                                                 .format(site_column("name_", site)))]
+        dict_odds[site] = {names[i] + " - " + names[i + 1]:
+                           {"date": datetime.datetime(2030, 1, 1), "odds": {site: [2, 3, 4]}}
+                           for i in range(0, len(names) - 1, 2)}
+    list_odds = benchmark("format_team_names",
+                          lambda: format_team_names(dict_odds, "football", "Ligue 1"))
+    assert all(list_odds)
+    list_odds = [{match: {"date": odds["date"], "odds": {site: odds["odds"][site]}}
+                  for match, odds in random_odds(2000, 3, i).items() if site in odds["odds"]}
+                 for i, site in enumerate(sportsbetting.SITES)]
+    merged = benchmark("merge_dict_odds", lambda: merge_dict_odds(list_odds))
+    assert len(merged) == 2000
+
+
+def test_benchmark_best_matches(monkeypatch):
+    """
+    :return: Les recherches de meilleurs matches se font dans le temps imparti
+    """
+    all_odds = random_odds(200, 3)
+    monkeypatch.setitem(sportsbetting.ODDS, "football", all_odds)
+    matches = [match for match in all_odds if len(all_odds[match]["odds"]) >= 10][:3]
+    strategies = {
+        "best_match_under_conditions": lambda: best_match_under_conditions("betclic", 1.7, 10),
+        "best_match_freebet": lambda: best_match_freebet("betclic", 10),
+        "best_match_cashback": lambda: best_match_cashback("betclic", 1.7, 10),
+        "best_matches_combine": lambda: best_matches_combine("betclic", 2, 10, processes=1),
+        "best_matches_freebet_one_site": lambda: best_matches_freebet_one_site("betclic", 10),
+        "best_match_stakes_to_bet": lambda: best_match_stakes_to_bet(
+            [[10, "betclic", 1.5], [5, "winamax", 1.5]], 2),
+        "best_matches_freebet": lambda: best_matches_freebet(["betclic", "unibet"],
+                                                             [[10, "winamax"], [5, "pmu"]]),
+        "best_match_pari_gagnant": lambda: best_match_pari_gagnant("betclic", 1.7, 10),
+        "best_match_gain_cote": lambda: best_match_gain_cote("betclic", 10),
+        "best_stakes_match": lambda: best_stakes_match(matches[0], "betclic", 10, 1.5),
+        "best_combine_reduit": lambda: best_combine_reduit(matches, [0, 0, 0], "betclic", 10,
+                                                           "football"),
+    }
+    for name, strategy in strategies.items():
+        assert benchmark(name, strategy), name
@@ -0,0 +1,67 @@
+"""
+Résultat des fonctions de recherche du meilleur match (best_* de user_functions)
+"""
+
+import pprint
+
+STAKES_HEADER = ("Répartition des mises (les totaux affichés prennent en compte les éventuels "
+                 "freebets):")
+# Indicateur affiché après les autres, sans être repris parmi les indicateurs de l'interface
+ROUNDED_STAKES = "mises arrondies"
+
+
+def format_stakes(stakes):
+    """
+    Lignes d'affichage de la répartition des mises, au format [(issue, {site: mise, ...}), ...]
+    """
+    if not stakes:
+        return []
+    nb_chars = max(len(outcome) for outcome, _ in stakes)
+    return [outcome + " " * (nb_chars - len(outcome)) + "\t " + str(stakes_outcome)
+            for outcome, stakes_outcome in stakes]
+
+
+class BetResult:
+    """
+    Match retenu (None si aucun match ne convient), date, cotes par site, indicateurs (somme des
+    mises, plus-value, ...) et répartition des mises par issue. L'affichage (print, ou
+    représentation dans l'interpréteur) reproduit la sortie de la recherche dans le terminal
+    """
+
+    def __init__(self, match=None, date=None, odds=None, indicators=None, stakes=None):
+        self.match = match
+        self.date = date
+        self.odds = odds or {}
+        self.indicators = indicators or {}
+        self.stakes = stakes or []
+
+    def __bool__(self):
+        return self.match is not None
+
+    @property
+    def outcomes(self):
+        """
+        Noms des issues (ou combinaisons d'issues) sur lesquelles miser
+        """
+        return [outcome for outcome, _ in self.stakes]
+
+    def main_indicators(self):
+        """
+        Indicateurs, hors mises arrondies
+        """
+        return {name: value for name, value in self.indicators.items() if name != ROUNDED_STAKES}
+
+    def render(self):
+        """
+        Texte affiché dans le terminal
+        """
+        if not self:
+            return "No match found"
+        lines = [self.match, pprint.pformat({"date": self.date, "odds": self.odds}, compact=True)]
+        lines += ["{} = {}".format(name, value) for name, value in self.indicators.items()]
+        if self.stakes:
+            lines += ["", STAKES_HEADER] + format_stakes(self.stakes)
+        return "\n".join(lines)
+
+    __str__ = render
+    __repr__ = render
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests des résultats des fonctions de recherche du meilleur match
+"""
+
+import sportsbetting
+from sportsbetting.bet_result import BetResult
+from sportsbetting.interface_functions import indicators, infos, odds_table, stakes
+from sportsbetting.user_functions import best_match_under_conditions, best_matches_combine
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_bet_result(monkeypatch, capsys):
+    """
+    :return: Les fonctions best_* retournent le résultat sans rien afficher, et l'affichage du
+    résultat reprend le match, les cotes, les indicateurs et la répartition des mises
+    """
+    monkeypatch.setitem(sportsbetting.ODDS, "football", random_odds(30, 3))
+    result = best_match_under_conditions("betclic", 1.7, 10)
+    combine = best_matches_combine("betclic", 2, 10, processes=1)
+    not_found = best_match_under_conditions("betclic", 100, 10)
+    assert capsys.readouterr().out == ""
+    assert isinstance(result, BetResult) and result and not not_found
+    assert str(not_found) == "No match found" and infos(not_found) == (None, None)
+    assert result.odds == sportsbetting.ODDS["football"][result.match]["odds"]
+    assert result.outcomes == [result.match.split(" - ")[0], "Nul", result.match.split(" - ")[1]]
+    assert round(sum(stake["betclic"]["mise"] for _, stake in result.stakes
+                     if "betclic" in stake), 2) >= 10
+    rendered = str(result).split("\n")
+    assert rendered[0] == result.match
+    assert "plus-value min = {}".format(result.indicators["plus-value min"]) in rendered
+    assert stakes(result) == "\n".join(rendered[-3:]) + "\n"
+    assert [name for name, _ in indicators(result)] == ["somme des mises", "gain min", "gain max",
+                                                       "plus-value min", "plus-value max"]
+    assert len(odds_table(result)) == len(result.odds)
+    assert combine.match.count(" / ") == 1 and "plus-value" in combine.indicators
@@ -0,0 +1,198 @@
+"""
+Recherche des meilleurs combinés sans énumérer toutes les combinaisons de matches
+"""
+
+import heapq
+import multiprocessing
+import os
+import threading
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8 : recherche séquentielle uniquement
+    shared_memory = None
+
+import numpy as np
+
+import sportsbetting
+from sportsbetting.auxiliary_functions import best_rank_match, binomial, cotes_combine_all_sites
+from sportsbetting.vectorized_functions import cotes_combine_vect, odds_matrix
+
+# Marge relative couvrant l'arrondi à 4 décimales des cotes combinées
+EPSILON_BOUND = 1e-4
+# Nombre minimal de combinaisons pour lancer la recherche en parallèle
+MIN_COMBINES_PARALLEL = 20000
+# Contexte de la recherche, hérité par les processus lors du fork
+CONTEXT = {}
+
+
+def search_combines(context, first_indices, shared_threshold=None):
+    """
+    Recherche par séparation et évaluation des context["top"] meilleurs combinés dont le premier
+    match (dans l'ordre de tri) est dans first_indices. Si shared_threshold est renseigné, il
+    contient le seuil d'élagage partagé entre les processus.
+    Retourne la liste des (gain, -numéro d'évaluation, indices des matches dans l'ordre de tri)
+    """
+    matrix, sites, site = context["matrix"], context["sites"], context["site"]
+    max_odds, overrounds = context["max_odds"], context["overrounds"]
+    suffix_max_odds, positions = context["suffix_max_odds"], context["positions"]
+    nb_matches, top, bound_function = context["nb_matches"], context["top"], context["bound"]
+    n = matrix.shape[2] ** nb_matches
+    best = []
+    count = [0]
+
+    def threshold():
+        local = best[0][0] if len(best) == top else -float("inf")
+        return max(local, shared_threshold.value) if shared_threshold else local
+
+    def bound(index, depth, odd, overround):
+        """
+        Majorant du gain des combinés complétés à partir du match d'indice index
+        """
+        remaining = nb_matches - depth
+        odd *= suffix_max_odds[index] ** remaining
+        for i in range(index, index + remaining):
+            overround *= overrounds[i]
+        return bound_function(odd * (1 + EPSILON_BOUND), overround / (1 + EPSILON_BOUND))
+
+    def evaluate(chosen):
+        rows = matrix[sorted(chosen, key=lambda i: positions[i])]
+        available = ~np.isnan(rows).any(axis=(0, 2))
+        combined = cotes_combine_vect(list(rows[:, available]))
+        odds = dict(zip([sites[j] for j in np.flatnonzero(available)], combined.tolist()))
+        result = best_rank_match(odds, site, n, context["odds_function"],
+                                 context["profit_function"], context["criteria"],
+                                 context["one_site"])
+        if result and result[0] > threshold():
+            count[0] += 1
+            entry = (result[0], -count[0], tuple(chosen))
+            if len(best) == top:
+                heapq.heapreplace(best, entry)
+            else:
+                heapq.heappush(best, entry)
+            if shared_threshold and len(best) == top:
+                with shared_threshold.get_lock():
+                    shared_threshold.value = max(shared_threshold.value, best[0][0])
+
+    def search(start, chosen, odd, overround):
+        depth = len(chosen)
+        if depth == nb_matches:
+            evaluate(chosen)
+            return
+        for index in range(start, len(max_odds) - nb_matches + depth + 1):
+            if bound(index, depth, odd, overround) <= threshold():
+                break  # Les matches suivants ont une somme des inverses au moins aussi grande
+            search(index + 1, chosen + [index], odd * max_odds[index],
+                   overround * overrounds[index])
+
+    for i, index in enumerate(first_indices):
+        if bound(index, 0, 1, 1) <= threshold():
+            nb_done = len(first_indices) - i  # Les premiers matches restants sont écartés
+        else:
+            search(index + 1, [index], max_odds[index], overrounds[index])
+            nb_done = 1
+        if not shared_threshold:
+            sportsbetting.PROGRESS += 100 * nb_done / context["nb_first"]
+        if nb_done > 1:
+            break
+    return best
+
+
+def init_worker(name, shape, shared_threshold):
+    """
+    Initialisation d'un processus de recherche : les cotes sont lues dans la mémoire partagée
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    CONTEXT["shm"] = shm
+    CONTEXT["matrix"] = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    CONTEXT["shared_threshold"] = shared_threshold
+
+
+def search_chunk(first_indices):
+    """
+    Recherche des meilleurs combinés d'un lot de premiers matches dans un processus
+    """
+    return len(first_indices), search_combines(CONTEXT, first_indices,
+                                               CONTEXT["shared_threshold"])
+
+
+def search_combines_parallel(context, processes):
+    """
+    Répartit la recherche par lots de premiers matches sur processes processus. La matrice des
+    cotes est placée en mémoire partagée, chaque processus renvoie son top local et le seuil
+    d'élagage est partagé entre processus
+    """
+    fork = multiprocessing.get_context("fork")
+    matrix = context["matrix"]
+    shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    try:
+        np.ndarray(matrix.shape, dtype=float, buffer=shm.buf)[:] = matrix
+        shared_threshold = fork.Value("d", -float("inf"))
+        CONTEXT.clear()
+        CONTEXT.update({key: value for key, value in context.items() if key != "matrix"})
+        nb_chunks = processes * 4
+        chunks = [list(range(i, context["nb_first"], nb_chunks)) for i in range(nb_chunks)]
+        best = []
+        with fork.Pool(processes, init_worker,
+                       (shm.name, matrix.shape, shared_threshold)) as pool:
+            for nb_first, best_chunk in pool.imap_unordered(search_chunk,
+                                                            [chunk for chunk in chunks if chunk]):
+                best += best_chunk
+                sportsbetting.PROGRESS += 100 * nb_first / context["nb_first"]
+    finally:
+        CONTEXT.clear()
+        shm.close()
+        shm.unlink()
+    return best
+
+
+def best_combines(all_odds, site, nb_matches, odds_function, profit_function, criteria,
+                  bound_function, one_site=False, top=1, processes=1):
+    """
+    Recherche par séparation et évaluation des top meilleurs combinés de nb_matches matches.
+    bound_function(cote_max, somme_inverses) majore le gain d'un combiné dont la cote sur site
+    est au plus cote_max et dont la somme des inverses des meilleures cotes est au moins
+    somme_inverses ; elle doit être croissante en cote_max et décroissante en somme_inverses.
+    Les matches sont triés par somme des inverses croissante et les branches dont le majorant ne
+    peut dépasser le top-ième gain courant sont abandonnées. Si processes vaut None (autant que
+    de coeurs) ou est supérieur à 1, la recherche est répartie sur plusieurs processus lorsque le
+    fork et la mémoire partagée sont disponibles, que le nombre de combinaisons le justifie et
+    qu'aucun autre thread ne tourne (le fork d'un processus multi-thread, comme l'interface, peut
+    bloquer les processus créés).
+    Retourne la liste triée par gain décroissant des (gain, nom du combiné, cotes du combiné)
+    """
+    matches = [(name, match) for name, match in all_odds.items() if site in match["odds"]]
+    if len(matches) < nb_matches:
+        return []
+    n = len(matches[0][1]["odds"][site])
+    matches = [match for match in matches if len(match[1]["odds"][site]) == n]
+    _, sites, matrix = odds_matrix(dict(matches), n)
+    bounds = (np.max(matrix[:, sites.index(site)], axis=1),
+              np.sum(1 / np.nanmax(matrix, axis=1), axis=1))
+    order = sorted(range(len(matches)), key=lambda i: bounds[1][i])
+    max_odds = [float(bounds[0][i]) for i in order]
+    suffix_max_odds = max_odds + [1]
+    for i in reversed(range(len(order) - 1)):
+        suffix_max_odds[i] = max(max_odds[i], suffix_max_odds[i + 1])
+    context = {"matrix": matrix[order], "sites": sites, "site": site, "max_odds": max_odds,
+               "overrounds": [float(bounds[1][i]) for i in order],
+               "suffix_max_odds": suffix_max_odds, "positions": order,
+               "nb_matches": nb_matches, "top": top, "bound": bound_function,
+               "odds_function": odds_function, "profit_function": profit_function,
+               "criteria": criteria, "one_site": one_site,
+               "nb_first": len(order) - nb_matches + 1}
+    processes = processes or os.cpu_count()
+    if (processes > 1 and shared_memory is not None
+            and "fork" in multiprocessing.get_all_start_methods()
+            and threading.active_count() == 1
+            and binomial(len(order), nb_matches) >= MIN_COMBINES_PARALLEL):
+        best = search_combines_parallel(context, processes)
+    else:
+        best = search_combines(context, range(context["nb_first"]))
+    best = sorted(best, key=lambda entry: (-entry[0], entry[2]))[:top]
+    result = []
+    for profit, _, chosen in best:
+        combine = [matches[order[i]] for i in sorted(chosen, key=lambda i: order[i])]
+        result.append((profit, " / ".join(match[0] for match in combine),
+                       cotes_combine_all_sites(*[match[1] for match in combine])))
+    return result
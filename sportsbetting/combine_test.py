@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests de la recherche des meilleurs combinés
+"""
+
+import multiprocessing
+import threading
+from itertools import combinations
+
+import pytest
+
+from sportsbetting.auxiliary_functions import best_match_loop, cotes_combine_all_sites
+from sportsbetting.basic_functions import gain2
+from sportsbetting import combine_functions
+from sportsbetting.combine_functions import best_combines
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_best_combines():
+    """
+    :return: La recherche par séparation et évaluation trouve le même combiné que l'énumération
+    de toutes les combinaisons
+    """
+    all_odds = {match: odds for match, odds in random_odds(25, 3).items()
+                if "betclic" in odds["odds"]}
+    odds_function = lambda best_odds, odds_site, i: best_odds[:i] + [odds_site[i]] + best_odds[i + 1:]
+    profit_function = lambda odds_to_check, i: gain2(odds_to_check, i, 10)
+    for minimum_odd in [1.5, 5]:
+        criteria = lambda odds_to_check, i: odds_to_check[i] >= minimum_odd
+        bound_function = lambda odd, overround: 10 * max(odd * (overround < 1),
+                                                         minimum_odd) * (1 - overround)
+        all_odds_combine = {" / ".join(match[0] for match in combine):
+                            cotes_combine_all_sites(*[match[1] for match in combine])
+                            for combine in combinations(all_odds.items(), 2)}
+        best = best_match_loop(all_odds_combine, "betclic", 9, odds_function, profit_function,
+                               criteria)
+        best_bb = best_combines(all_odds, "betclic", 2, odds_function, profit_function, criteria,
+                                bound_function, top=3)
+        assert best[0] == best_bb[0][1]
+        assert abs(profit_function(best[2], best[1]) - best_bb[0][0]) < 1e-9
+        assert best_bb[0][0] >= best_bb[1][0] >= best_bb[2][0]
+
+
+def test_best_combines_parallel(monkeypatch):
+    """
+    :return: La recherche répartie sur plusieurs processus donne le même top que la recherche
+    séquentielle
+    """
+    if (combine_functions.shared_memory is None
+            or "fork" not in multiprocessing.get_all_start_methods()):
+        pytest.skip("fork ou mémoire partagée indisponible")
+    if threading.active_count() > 1:
+        pytest.skip("d'autres threads sont actifs")
+    monkeypatch.setattr(combine_functions, "MIN_COMBINES_PARALLEL", 0)
+    calls = []
+    search_combines_parallel = combine_functions.search_combines_parallel
+    monkeypatch.setattr(combine_functions, "search_combines_parallel",
+                        lambda *args: calls.append(args) or search_combines_parallel(*args))
+    all_odds = random_odds(20, 3)
+    odds_function = lambda best_odds, odds_site, i: best_odds[:i] + [odds_site[i]] + best_odds[i + 1:]
+    profit_function = lambda odds_to_check, i: gain2(odds_to_check, i, 10)
+    criteria = lambda odds_to_check, i: odds_to_check[i] >= 3
+    bound_function = lambda odd, overround: 10 * max(odd * (overround < 1), 3) * (1 - overround)
+    best = best_combines(all_odds, "betclic", 3, odds_function, profit_function, criteria,
+                         bound_function, top=3)
+    best_parallel = best_combines(all_odds, "betclic", 3, odds_function, profit_function,
+                                  criteria, bound_function, top=3, processes=2)
+    assert len(calls) == 1 and best == best_parallel
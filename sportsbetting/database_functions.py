@@ -11,12 +11,135 @@ import urllib
 import urllib.request
 import urllib.error
 import datetime
-import re
+import threading
 import unidecode
 from bs4 import BeautifulSoup
 import sportsbetting
+from sportsbetting.http_functions import get_soup
+from sportsbetting.name_index import NameIndex
 
 PATH_DB = os.path.dirname(sportsbetting.__file__) + "/resources/teams.db"
+CONNECTIONS = threading.local()
+# Correspondances (sport, site, nom sur le site) -> nom uniformisé (None si le nom est inconnu)
+NAMES_CACHE = {}
+NAMES_CACHE_STATS = {"hits": 0, "misses": 0}
+NAMES_CACHE_LOCK = threading.Lock()
+# Index des noms pour la recherche de noms proches, par sport
+NAMES_INDEX = {}
+NAMES_INDEX_LOCK = threading.RLock()
+# Bases de données dont le schéma a été mis à jour par ce processus
+MIGRATED_DB = set()
+MIGRATION_LOCK = threading.Lock()
+# Nombre maximal de paramètres d'une requête groupée
+MAX_VARIABLES = 500
+
+
+def get_connection():
+    """
+    Retourne la connexion à la base de données propre au thread courant, ouverte à la première
+    utilisation en mode WAL (les lectures ne bloquent pas les écritures) avec un délai d'attente
+    en cas de verrou
+    """
+    conn = getattr(CONNECTIONS, "conn", None)
+    if conn is None or CONNECTIONS.path != PATH_DB:
+        conn = sqlite3.connect(PATH_DB, timeout=30, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        with MIGRATION_LOCK:
+            if PATH_DB not in MIGRATED_DB:
+                migrate_db(conn)
+                MIGRATED_DB.add(PATH_DB)
+        CONNECTIONS.conn = conn
+        CONNECTIONS.path = PATH_DB
+    return conn
+
+
+def migration_names_v2(conn):
+    """
+    Table names_v2 à une ligne par nom d'équipe/joueur sur un site, indexée par (sport, site,
+    nom sur le site) et par id, et tenue à jour depuis la table names par des déclencheurs.
+    La table names et ses colonnes name_<site> sont conservées
+    """
+    conn.execute("DROP TABLE IF EXISTS names_v2")
+    conn.execute("""
+    CREATE TABLE names_v2 (
+        row INTEGER,
+        id INTEGER,
+        sport TEXT,
+        name TEXT,
+        site TEXT,
+        name_site TEXT
+    )""")
+    insert = ("INSERT INTO names_v2 (row, id, sport, name, site, name_site) "
+              "SELECT {0}rowid, {0}id, {0}sport, {0}name, '{1}', {0}name_{1} {2} "
+              "WHERE {0}name_{1} IS NOT NULL")
+    for site in sportsbetting.SITES:
+        conn.execute(insert.format("", site, "FROM names"))
+    inserts_new = "".join(insert.format("NEW.", site, "") + ";\n"
+                          for site in sportsbetting.SITES)
+    conn.execute("CREATE TRIGGER names_v2_insert AFTER INSERT ON names BEGIN\n{}END"
+                 .format(inserts_new))
+    conn.execute("CREATE TRIGGER names_v2_update AFTER UPDATE ON names BEGIN\n"
+                 "DELETE FROM names_v2 WHERE row = OLD.rowid;\n{}END".format(inserts_new))
+    conn.execute("CREATE TRIGGER names_v2_delete AFTER DELETE ON names BEGIN\n"
+                 "DELETE FROM names_v2 WHERE row = OLD.rowid;\nEND")
+    conn.execute("CREATE INDEX names_v2_site ON names_v2 (sport, site, name_site, row)")
+    conn.execute("CREATE INDEX names_v2_id ON names_v2 (id)")
+    conn.execute("CREATE INDEX names_v2_row ON names_v2 (row)")
+    conn.execute("CREATE INDEX names_id ON names (id)")
+    conn.execute("CREATE INDEX names_sport_name ON names (sport, name)")
+
+
+# Étapes de mise à jour du schéma, la version du schéma (PRAGMA user_version) étant le nombre
+# d'étapes appliquées
+MIGRATIONS = [migration_names_v2]
+
+
+def migrate_db(conn):
+    """
+    Applique les étapes de mise à jour du schéma non encore appliquées à la base de données
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for i, migration in enumerate(MIGRATIONS[version:], version + 1):
+            migration(conn)
+            conn.execute("PRAGMA user_version = {}".format(i))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def db_fetchall(query, parameters=()):
+    """
+    Exécute une requête paramétrée et retourne toutes les lignes
+    """
+    return get_connection().execute(query, parameters).fetchall()
+
+
+def db_fetchone(query, parameters=()):
+    """
+    Exécute une requête paramétrée et retourne la première ligne
+    """
+    return get_connection().execute(query, parameters).fetchone()
+
+
+def db_execute(query, parameters=()):
+    """
+    Exécute une requête d'écriture paramétrée dans une transaction
+    """
+    conn = get_connection()
+    with conn:
+        conn.execute(query, parameters)
+
+
+def site_column(prefix, site):
+    """
+    Retourne le nom de la colonne associée à un site (name_<site> ou url_<site>)
+    """
+    if site not in sportsbetting.SITES:
+        raise ValueError("Site inconnu : {}".format(site))
+    return prefix + site
 
 
 def get_id_formatted_competition_name(competition, sport):
@@ -24,12 +147,7 @@ def get_id_formatted_competition_name(competition, sport):
     Retourne l'id et le nom tel qu'affiché sur comparateur-de-cotes.fr. Par
     exemple, "Ligue 1" devient "France - Ligue 1"
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id, competition FROM competitions WHERE sport='{}'
-    """.format(sport))
-    for line in c.fetchall():
+    for line in db_fetchall("SELECT id, competition FROM competitions WHERE sport=?", (sport,)):
         strings_name = competition.lower().split()
         possible = True
         for string in strings_name:
@@ -44,12 +162,104 @@ def get_competition_by_id(_id, site):
     """
     Retourne l'url d'une competition donnée sur un site donné
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT url_{} FROM competitions WHERE id='{}'
-    """.format(str(site), _id))
-    return c.fetchone()[0]
+    return db_fetchone("SELECT {} FROM competitions WHERE id=?".format(site_column("url_", site)),
+                       (_id,))[0]
+
+
+SQL_NAME_SITE = """
+SELECT {} FROM names_v2 WHERE sport=? AND site=? AND name_site=? ORDER BY row LIMIT 1
+"""
+
+
+def load_names_cache():
+    """
+    Charge en une fois dans le cache toutes les correspondances entre les noms des sites et les
+    noms uniformisés de la base de données
+    """
+    with NAMES_CACHE_LOCK:
+        if NAMES_CACHE:
+            return
+        cache = {}
+        for sport, site, name_site, name in db_fetchall("SELECT sport, site, name_site, name "
+                                                        "FROM names_v2 ORDER BY row"):
+            cache.setdefault((sport, site, name_site), name)
+        NAMES_CACHE.update(cache)
+
+
+def invalidate_name(name, site, sport):
+    """
+    Retire du cache la correspondance d'un nom d'équipe/joueur d'un site après une écriture dans la
+    base de données
+    """
+    NAMES_CACHE.pop((sport, site, name), None)
+
+
+def resolve_name(name, site, sport):
+    """
+    Retourne le nom uniformisé d'un nom d'équipe/joueur d'un site à partir du cache, ou None si ce
+    nom n'est pas dans la base de données
+    """
+    if not NAMES_CACHE:
+        load_names_cache()
+    key = (sport, site, name)
+    try:
+        formatted_name = NAMES_CACHE[key]
+        with NAMES_CACHE_LOCK:
+            NAMES_CACHE_STATS["hits"] += 1
+        return formatted_name
+    except KeyError:
+        with NAMES_CACHE_LOCK:
+            NAMES_CACHE_STATS["misses"] += 1
+    res = db_fetchone(SQL_NAME_SITE.format("name"), (sport, site, name))
+    NAMES_CACHE[key] = res[0] if res else None
+    return NAMES_CACHE[key]
+
+
+def resolve_names(site, sport, raw_names):
+    """
+    Résolution groupée de noms d'équipe/joueur d'un site : les noms absents du cache sont
+    recherchés en une seule requête (par lots de MAX_VARIABLES noms).
+    Retourne le dictionnaire {nom sur le site: nom uniformisé} des noms connus et l'ensemble des
+    noms inconnus
+    """
+    if not NAMES_CACHE:
+        load_names_cache()
+    resolved = {}
+    missing = []
+    for name in set(raw_names):
+        key = (sport, site, name)
+        if key in NAMES_CACHE:
+            resolved[name] = NAMES_CACHE[key]
+        else:
+            missing.append(name)
+    with NAMES_CACHE_LOCK:
+        NAMES_CACHE_STATS["hits"] += len(resolved)
+        NAMES_CACHE_STATS["misses"] += len(missing)
+    for i in range(0, len(missing), MAX_VARIABLES):
+        chunk = missing[i:i + MAX_VARIABLES]
+        query = """
+        WITH raw(name_site) AS (VALUES {})
+        SELECT raw.name_site, (SELECT name FROM names_v2
+                               WHERE sport=? AND site=? AND names_v2.name_site=raw.name_site
+                               ORDER BY row LIMIT 1)
+        FROM raw
+        """.format(", ".join(["(?)"] * len(chunk)))
+        for name, formatted_name in db_fetchall(query, chunk + [sport, site]):
+            NAMES_CACHE[(sport, site, name)] = formatted_name
+            resolved[name] = formatted_name
+    unresolved = {name for name, formatted_name in resolved.items() if formatted_name is None}
+    return {name: formatted_name for name, formatted_name in resolved.items()
+            if formatted_name is not None}, unresolved
+
+
+def print_unknown_name(name, site):
+    """
+    Affiche en rouge un nom d'équipe/joueur inconnu d'un site
+    """
+    colorama.init()
+    print(termcolor.colored('{} {}'.format(name, site), 'red'))
+    colorama.Style.RESET_ALL
+    colorama.deinit()
 
 
 def get_formatted_name(name, site, sport):
@@ -57,19 +267,11 @@ def get_formatted_name(name, site, sport):
     Uniformisation d'un nom d'équipe/joueur d'un site donné conformément aux noms disponibles sur
     comparateur-de-cotes.fr. Par exemple, "OM" devient "Marseille"
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    res = list(c.execute("""
-    SELECT name FROM names WHERE sport="{}" AND name_{}="{}"
-    """.format(sport, site, name)))
-    c.close()
-    try:
-        return res[0][0]
-    except IndexError:
-        colorama.init()
-        print(termcolor.colored('{} {}'.format(name, site), 'red'))
-        colorama.Style.RESET_ALL
-        colorama.deinit()
+    formatted_name = resolve_name(name, site, sport)
+    if formatted_name is not None:
+        return formatted_name
+    else:
+        print_unknown_name(name, site)
         return "unknown team/player ".upper() + name
 
 
@@ -77,12 +279,7 @@ def get_competition_id(name, sport):
     """
     Retourne l'id d'une compétition
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id, competition FROM competitions WHERE sport='{}'
-    """.format(sport))
-    for line in c.fetchall():
+    for line in db_fetchall("SELECT id, competition FROM competitions WHERE sport=?", (sport,)):
         strings_name = name.lower().split()
         possible = True
         for string in strings_name:
@@ -97,12 +294,8 @@ def get_competition_url(name, sport, site):
     """
     Retourne l'url d'une compétition sur un site donné
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT competition, url_{} FROM competitions WHERE sport='{}'
-    """.format(site, sport))
-    for line in c.fetchall():
+    for line in db_fetchall("SELECT competition, {} FROM competitions WHERE sport=?"
+                            .format(site_column("url_", site)), (sport,)):
         strings_name = name.lower().split()
         possible = True
         for string in strings_name:
@@ -118,20 +311,15 @@ def import_teams_by_url(url):
     Ajout dans la base de données de toutes les équipes/joueurs d'une même compétition (url) ayant
     un match prévu sur comparateur-de-cotes.fr
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     sport = soup.find("title").string.split()[-1].lower()
     for line in soup.find_all(["a"]):
         if "href" in line.attrs and "-td" in line["href"] and line.text:
             _id = line["href"].split("-td")[-1]
             if not is_id_in_db(_id):
-                c.execute("""
-                INSERT INTO names (id, name, sport)
-                VALUES ({}, "{}", "{}")
-                """.format(_id, line.text, sport))
-                conn.commit()
-    c.close()
+                db_execute("INSERT INTO names (id, name, sport) VALUES (?, ?, ?)",
+                           (int(_id), line.text, sport))
+                refresh_names_index(_id)
 
 
 def import_teams_by_sport(sport):
@@ -140,7 +328,7 @@ def import_teams_by_sport(sport):
     sur comparateur-de-cotes.fr
     """
     url = "http://www.comparateur-de-cotes.fr/comparateur/" + sport
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     for line in soup.find_all(["a"]):
         if "href" in line.attrs and "-ed" in line["href"] and line.text and sport in line["href"]:
             import_teams_by_url(unidecode.unidecode("http://www.comparateur-de-cotes.fr/"
@@ -149,7 +337,7 @@ def import_teams_by_sport(sport):
 
 def import_teams_by_competition_id_thesportsdb(_id):
     url = "https://www.thesportsdb.com/api/v1/json/1/eventsnextleague.php?id=" + str(-_id)
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     dict_competition = json.loads(soup.text)
     if dict_competition["events"]:
         for event in dict_competition["events"]:
@@ -161,30 +349,17 @@ def is_id_in_db(_id):
     """
     Vérifie si l'id est dans la base de données
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id FROM names WHERE id="{}"
-    """.format(_id))
-    for line in c.fetchall():
-        return line
+    return db_fetchone("SELECT id FROM names WHERE id=?", (_id,))
 
 
 def is_in_db(name, sport, site, only_null=True):
     """
     Vérifie si le nom uniformisé de l'équipe est dans la base de données
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
     if only_null:
-        c.execute("""
-        SELECT id, name FROM names WHERE sport="{}" AND name="{}" and name_{} IS NULL
-        """.format(sport, name, site))
-    else:
-        c.execute("""
-        SELECT id FROM names WHERE sport="{}" AND name="{}"
-        """.format(sport, name))
-    return list(c.fetchall())
+        return db_fetchall("SELECT id, name FROM names WHERE sport=? AND name=? AND {} IS NULL"
+                           .format(site_column("name_", site)), (sport, name))
+    return db_fetchall("SELECT id FROM names WHERE sport=? AND name=?", (sport, name))
 
 
 def is_in_db_site(name, sport, site):
@@ -192,32 +367,18 @@ def is_in_db_site(name, sport, site):
     Vérifie si le nom de l'équipe/joueur tel qu'il est affiché sur un site est dans la base de
     données
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id FROM names WHERE sport="{}" AND name_{}="{}"
-    """.format(sport, site, name))
-    for line in c.fetchall():
-        return line
+    return db_fetchone(SQL_NAME_SITE.format("id"), (sport, site, name))
 
 
 def get_formatted_name_by_id(_id):
     """
     Retourne le nom d'une équipe en fonction de son id dans la base de donbées
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT name FROM names WHERE id='{}'
-    """.format(_id))
     try:
-        return c.fetchone()[0]
+        return db_fetchone("SELECT name FROM names WHERE id=?", (_id,))[0]
     except TypeError:
         add_id_to_db(_id)
-        c.execute("""
-        SELECT name FROM names WHERE id='{}'
-        """.format(_id))
-        return c.fetchone()[0]
+        return db_fetchone("SELECT name FROM names WHERE id=?", (_id,))[0]
 
 
 def add_id_to_db(_id):
@@ -227,18 +388,13 @@ def add_id_to_db(_id):
     if is_id_in_db(_id):  # Pour éviter les ajouts intempestifs (précaution)
         return
     url = "http://www.comparateur-de-cotes.fr/comparateur/football/Angers-td" + str(_id)
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     for line in soup.findAll("a", {"class": "otn"}):
         if str(_id) in line["href"]:
             sport = line["href"].split("/")[1]
-            conn = sqlite3.connect(PATH_DB)
-            c = conn.cursor()
-            c.execute("""
-            INSERT INTO names (id, name, sport)
-            VALUES ({}, "{}", "{}")
-            """.format(_id, line.text, sport))
-            conn.commit()
-            c.close()
+            db_execute("INSERT INTO names (id, name, sport) VALUES (?, ?, ?)",
+                       (int(_id), line.text, sport))
+            refresh_names_index(_id)
             break
 
 
@@ -246,41 +402,40 @@ def add_id_to_db_thesportsdb(_id):
     if is_id_in_db(_id):  # Pour éviter les ajouts intempestifs (précaution)
         return
     url = "https://www.thesportsdb.com/api/v1/json/1/lookupteam.php?id=" + str(-_id)
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     dict_team = json.loads(soup.text)
     name = dict_team["teams"][0]["strTeam"]
     sport = (dict_team["teams"][0]["strSport"].lower().replace("soccer", "football")
              .replace("ice_hockey", "hockey-sur-glace"))
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO names (id, name, sport)
-    VALUES ({}, "{}", "{}")
-    """.format(_id, name, sport))
-    conn.commit()
-    c.close()
+    db_execute("INSERT INTO names (id, name, sport) VALUES (?, ?, ?)", (int(_id), name, sport))
+    refresh_names_index(_id)
 
 
 def get_sport_by_id(_id):
     """
     Retourne le sport associé à un id d'équipe/joueur dans la base de données
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT sport FROM names WHERE id='{}'
-    """.format(_id))
     try:
-        return c.fetchone()[0]
+        return db_fetchone("SELECT sport FROM names WHERE id=?", (_id,))[0]
     except TypeError:
         if int(_id)>0:
             add_id_to_db(_id)
         else:
             add_id_to_db_thesportsdb(_id)
-        c.execute("""
-        SELECT sport FROM names WHERE id='{}'
-        """.format(_id))
-        return c.fetchone()[0]
+        return db_fetchone("SELECT sport FROM names WHERE id=?", (_id,))[0]
+
+
+SQL_UPDATE_NAME_SITE = """
+UPDATE names
+SET {0} = ?
+WHERE _rowid_ = (
+    SELECT _rowid_
+    FROM names
+    WHERE id = ? AND {0} IS NULL
+    ORDER BY _rowid_
+    LIMIT 1
+)
+"""
 
 
 def add_name_to_db(_id, name, site, check=False, date_next_match=None, date_next_match_db=None):
@@ -290,8 +445,7 @@ def add_name_to_db(_id, name, site, check=False, date_next_match=None, date_next
     sport = get_sport_by_id(_id)
     if is_in_db_site(name, sport, site): #Pour éviter les ajouts intempestifs
         return True
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
+    column = site_column("name_", site)
     name_is_potential_double = sport == "tennis" and any(x in name for x in ["-", "/", "&"])
     formatted_name = get_formatted_name_by_id(_id)
     id_is_potential_double = "&" in formatted_name
@@ -311,25 +465,14 @@ def add_name_to_db(_id, name, site, check=False, date_next_match=None, date_next
                             "(nouvelle entrée : {}) (y/n)"
                             .format(formatted_name, site, name))
         if not check or ans in ['y', 'Yes']:
-            c.execute("""
-            UPDATE names
-            SET name_{0} = "{1}"
-            WHERE _rowid_ = (
-                SELECT _rowid_
-                FROM names
-                WHERE id = {2} AND name_{0} IS NULL
-                ORDER BY _rowid_
-                LIMIT 1
-            );
-            """.format(site, name, _id))
+            db_execute(SQL_UPDATE_NAME_SITE.format(column), (name, _id))
+            invalidate_name(name, site, sport)
+            refresh_names_index(_id)
         else:
             return False
     else:
-        c.execute("""
-        SELECT sport, name, name_{} FROM names
-        WHERE id = {}
-        """.format(site, _id))
-        sport, formatted_name, name_site = c.fetchone()
+        sport, formatted_name, name_site = db_fetchone("SELECT sport, name, {} FROM names WHERE id=?"
+                                                       .format(column), (_id,))
         if name and name != name_site:
             if check:
                 if sportsbetting.INTERFACE:
@@ -347,26 +490,14 @@ def add_name_to_db(_id, name, site, check=False, date_next_match=None, date_next
                                 .format(formatted_name, site, name_site, name))
             if not check or ans in ['y', 'Yes']:
                 if name_site and not is_id_available_for_site(_id, site):
-                    c.execute("""
-                    INSERT INTO names (id, name, sport, name_{})
-                    VALUES ({}, "{}", "{}", "{}")
-                    """.format(site, _id, formatted_name, sport, name))
+                    db_execute("INSERT INTO names (id, name, sport, {}) VALUES (?, ?, ?, ?)"
+                               .format(column), (_id, formatted_name, sport, name))
                 else:
-                    c.execute("""
-                    UPDATE names
-                    SET name_{0} = "{1}"
-                    WHERE _rowid_ = (
-                        SELECT _rowid_
-                        FROM names
-                        WHERE id = {2} AND name_{0} IS NULL
-                        ORDER BY _rowid_
-                        LIMIT 1
-                    );
-                    """.format(site, name, _id))
+                    db_execute(SQL_UPDATE_NAME_SITE.format(column), (name, _id))
+                invalidate_name(name, site, sport)
+                refresh_names_index(_id)
             else:
                 return False
-    c.close()
-    conn.commit()
     return True
 
 
@@ -375,37 +506,58 @@ def is_id_available_for_site(_id, site):
     Vérifie s'il est possible d'ajouter un nom associé à un site et à un id sans créer de nouvelle
     entrée
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT name_{} FROM names WHERE id = {}
-    """.format(site, _id))
-    for line in c.fetchall():
+    for line in db_fetchall("SELECT {} FROM names WHERE id=?".format(site_column("name_", site)),
+                            (_id,)):
         if line[0] is None:
             return True
     return False
 
 
+def index_lines(lines, sport=None):
+    """
+    Ajoute aux index des noms les lignes (rowid, sport, id, nom, noms sur les sites) de la table
+    names, en se limitant à sport s'il est renseigné
+    """
+    for line in lines:
+        if line[1] in NAMES_INDEX and (sport is None or line[1] == sport):
+            NAMES_INDEX[line[1]].add(line[0], line[2], line[3],
+                                     dict(zip(sportsbetting.SITES, line[4:])))
+
+
+def names_index_query(condition):
+    """
+    Requête des lignes de la table names indexées, pour la condition donnée
+    """
+    return ("SELECT _rowid_, sport, id, name, {} FROM names WHERE {}"
+            .format(", ".join(site_column("name_", site) for site in sportsbetting.SITES),
+                    condition))
+
+
+def get_names_index(sport):
+    """
+    Retourne l'index des noms d'un sport, construit à la première utilisation
+    """
+    with NAMES_INDEX_LOCK:
+        if sport not in NAMES_INDEX:
+            NAMES_INDEX[sport] = NameIndex()
+            index_lines(db_fetchall(names_index_query("sport=?"), (sport,)), sport)
+        return NAMES_INDEX[sport]
+
+
+def refresh_names_index(_id):
+    """
+    Met à jour les index des noms après l'écriture des lignes d'un id dans la base de données
+    """
+    with NAMES_INDEX_LOCK:
+        index_lines(db_fetchall(names_index_query("id=?"), (_id,)))
+
+
 def get_close_name(name, sport, site, only_null=True):
     """
     Cherche un nom similaire dans la base de données
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    if only_null:
-        c.execute("""
-        SELECT id, name FROM names WHERE sport='{}' AND name_{} IS NULL
-        """.format(sport, site))
-    else:
-        c.execute("""
-        SELECT id, name FROM names WHERE sport='{}'
-        """.format(sport))
-    results = []
-    for line in c.fetchall():
-        if (unidecode.unidecode(name.lower()) in unidecode.unidecode(line[1].lower())
-                or unidecode.unidecode(line[1].lower()) in unidecode.unidecode(name.lower())):
-            results.append(line)
-    return results
+    with NAMES_INDEX_LOCK:
+        return get_names_index(sport).close(name, site, only_null)
 
 
 def get_close_name2(name, sport, site, only_null=True):
@@ -413,40 +565,8 @@ def get_close_name2(name, sport, site, only_null=True):
     Cherche un nom similaire dans la base de données en ignorant tous les sigles. Par exemple,
     "Paris SG" devient "Paris"
     """
-    name = name.split("(")[0].strip()
-    split_name = re.split('[ .\-,]', name)
-    split_name2 = " ".join([string for string in split_name if (len(string) > 2
-                                                                or string != string.upper())])
-    if not split_name2:
-        return []
-    set_name = set(map(lambda x: unidecode.unidecode(x.lower()), split_name))
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    if only_null:
-        c.execute("""
-        SELECT id, name FROM names WHERE sport='{}' AND name_{} IS NULL
-        """.format(sport, site))
-    else:
-        c.execute("""
-        SELECT id, name FROM names WHERE sport='{}'
-        """.format(sport))
-    results = []
-    for line in c.fetchall():
-        string_line = line[1].split("(")[0].strip()
-        split_line = re.split('[ .\-,]', string_line)
-        split_line2 = " ".join([string for string in split_line if (len(string) > 2
-                                                                    or string != string.upper())])
-        if not split_line2:
-            continue
-        if (unidecode.unidecode(split_name2.lower()) in unidecode.unidecode(split_line2.lower())
-                or unidecode.unidecode(split_line2.lower()) in unidecode.unidecode(split_name2
-                                                                                   .lower())):
-            results.append(line)
-            continue
-        set_line = set(map(lambda x: unidecode.unidecode(x.lower()), split_line))
-        if set_line.issubset(set_name):
-            results.append(line)
-    return results
+    with NAMES_INDEX_LOCK:
+        return get_names_index(sport).close_without_acronyms(name, site, only_null)
 
 
 def get_close_name3(name, sport, site, only_null=True):
@@ -460,20 +580,9 @@ def get_close_name3(name, sport, site, only_null=True):
         if len(split_name) == 2 and len(split_name[0]) == 1:
             init_first_name = split_name[0]
             last_name = split_name[1].strip()
-            reg_exp = r'{}[a-z]+\s{}'.format(init_first_name, last_name)
-            conn = sqlite3.connect(PATH_DB)
-            c = conn.cursor()
-            if only_null:
-                c.execute("""
-                SELECT id, name FROM names WHERE sport='{}' AND name_{} IS NULL
-                """.format(sport, site))
-            else:
-                c.execute("""
-                SELECT id, name FROM names WHERE sport='{}'
-                """.format(sport))
-            for line in c.fetchall():
-                if re.match(reg_exp, line[1]):
-                    results.append(line)
+            with NAMES_INDEX_LOCK:
+                results = get_names_index(sport).initial_and_last_name(init_first_name,
+                                                                       last_name, site, only_null)
     return results
 
 
@@ -481,12 +590,7 @@ def get_id_by_site(name, sport, site):
     """
     Retourne l'id d'une équipe/joueur sur un site donné
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id FROM names WHERE name_{}="{}" AND sport='{}'
-    """.format(site, name, sport))
-    _id = c.fetchone()
+    _id = db_fetchone(SQL_NAME_SITE.format("id"), (sport, site, name))
     if _id:
         return _id[0]
     return 0
@@ -501,7 +605,7 @@ def get_id_by_opponent(id_opponent, name_site_match, matches):
     if date_match == "undefined":
         date_match = datetime.datetime.today()
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        soup = get_soup(url)
     except urllib.error.HTTPError:
         return
     get_next_id = False
@@ -527,7 +631,7 @@ def get_id_by_opponent_thesportsdb(id_opponent, name_site_match, matches):
     if date_match == "undefined":
         date_match = datetime.datetime.today()
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        soup = get_soup(url)
     except urllib.error.HTTPError:
         return
     dict_events = json.loads(soup.text)
@@ -549,7 +653,7 @@ def get_id_by_opponent_thesportsdb(id_opponent, name_site_match, matches):
 def get_time_next_match_thesportsdb(id_competition, id_team):
     url = "https://www.thesportsdb.com/api/v1/json/1/eventsnextleague.php?id=" + str(-id_competition)
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        soup = get_soup(url)
         dict_competition = json.loads(soup.text)
         if dict_competition["events"]:
             for event in dict_competition["events"]:
@@ -569,7 +673,7 @@ def get_time_next_match(id_competition, id_team):
     else:
         return get_time_next_match_thesportsdb(id_competition, id_team)
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        soup = get_soup(url)
         for line in soup.find_all("a"):
             if "href" in line.attrs:
                 if line["href"].split("td"+str(id_team))[0][-1] == "-":
@@ -585,7 +689,7 @@ def get_next_competition(id_team):
     if id_team > 0:
         url = "http://www.comparateur-de-cotes.fr/comparateur/football/a-td" + str(id_team)
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        soup = get_soup(url)
         for line in soup.find_all("h1"):
             return line.text.strip()
         return
@@ -650,17 +754,14 @@ def get_double_team_tennis(team, sport, site, only_null=False):
             else:
                 players = list(map(lambda x: x.split(" ")[0].strip(), complete_names))
         players = list(map(lambda x:x.strip(), players))
-        conn = sqlite3.connect(PATH_DB)
-        c = conn.cursor()
         if only_null:
-            c.execute("""
-            SELECT id, name FROM names WHERE sport='tennis' AND name LIKE '% & %' AND name_{} IS NULL
-            """.format(site))
+            lines = db_fetchall("SELECT id, name FROM names WHERE sport='tennis' "
+                                "AND name LIKE '% & %' AND {} IS NULL"
+                                .format(site_column("name_", site)))
         else:
-            c.execute("""
-            SELECT id, name FROM names WHERE sport='tennis' AND name LIKE '% & %'
-            """)
-        for line in c.fetchall():
+            lines = db_fetchall("SELECT id, name FROM names WHERE sport='tennis' "
+                                "AND name LIKE '% & %'")
+        for line in lines:
             compared_players = unidecode.unidecode(line[1]).lower().split(" & ")
             if are_same_double(players, compared_players):
                 results.append(line)
@@ -671,12 +772,8 @@ def get_all_competitions(sport):
     """
     Retourne toutes les compétitions d'un sport donné
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT competition FROM competitions WHERE sport='{}'
-    """.format(sport))
-    return sorted(list(map(lambda x: x[0], c.fetchall())))
+    return sorted(list(map(lambda x: x[0], db_fetchall("SELECT competition FROM competitions "
+                                                       "WHERE sport=?", (sport,)))))
 
 
 def get_all_sports():
@@ -684,32 +781,22 @@ def get_all_sports():
     Retourne tous les sports disponibles dans la db
     """
     print(PATH_DB)
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT sport FROM competitions
-    """)
-    return sorted(list(set(map(lambda x: x[0], c.fetchall()))))
+    return sorted(list(set(map(lambda x: x[0], db_fetchall("SELECT sport FROM competitions")))))
 
 
 def get_competition_name_by_id(_id):
     """
     Retourne l'url d'une competition donnée sur un site donné
     """
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT competition FROM competitions WHERE id='{}'
-    """.format(_id))
     try:
-        return c.fetchone()[0]
+        return db_fetchone("SELECT competition FROM competitions WHERE id=?", (_id,))[0]
     except TypeError:
         return
 
 
 def get_all_current_competitions(sport):
     url = "http://www.comparateur-de-cotes.fr/comparateur/"+sport
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     id_leagues = []
     leagues = []
     for line in soup.find_all("a"):
@@ -724,14 +811,8 @@ def get_all_current_competitions(sport):
                                                     .format(league_name))
                     ans = sportsbetting.QUEUE_FROM_GUI.get(True)
                     if ans == "Yes":
-                        conn = sqlite3.connect(PATH_DB)
-                        c = conn.cursor()
-                        c.execute("""
-                        INSERT INTO competitions (id, sport, competition)
-                        VALUES ({}, "{}", "{}")
-                        """.format(id_league, sport, league_name))
-                        conn.commit()
-                        c.close()
+                        db_execute("INSERT INTO competitions (id, sport, competition) "
+                                   "VALUES (?, ?, ?)", (id_league, sport, league_name))
                         leagues.append(league_name)
             else:
                 leagues.append(league)
@@ -768,26 +849,22 @@ def get_all_current_competitions_betclic(sport):
                 if not ("onclick" in line.attrs and "Paris sur la compétition" in line["onclick"]):
                     ids.append(link.split("-e")[-1])
     def get_competition_name_by_betclic_id(_id):
-        conn = sqlite3.connect(PATH_DB)
-        c = conn.cursor()
-        c.execute("""
-        SELECT competition FROM competitions WHERE url_betclic LIKE "%-e{}"
-        """.format(_id))
-        result = c.fetchone()
+        result = db_fetchone("SELECT competition FROM competitions WHERE url_betclic LIKE ?",
+                             ("%-e{}".format(_id),))
         if result:
             return result[0]
     return [x for x in list(map(get_competition_name_by_betclic_id, ids)) if x]
     
 
 def is_played_soon(url):
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     for line in soup.find_all("table", attrs={"class":"bettable"}):
         date_time = datetime.datetime.strptime(list(line.stripped_strings)[3].lower(), "%A %d %B %Y à %Hh%M")
         return date_time<datetime.datetime.today()+datetime.timedelta(days=7)
 
 def get_main_competitions(sport):
     url = "http://www.comparateur-de-cotes.fr/comparateur/"+sport
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    soup = get_soup(url)
     sportsbetting.ODDS = {}
     names = []
     for line in soup.find_all(attrs={"class": "subhead"}):
@@ -800,50 +877,8 @@ def get_main_competitions(sport):
     return names
 
 
-def get_all_names_from_id(_id):
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT * FROM names WHERE id="{}"
-    """.format(_id))
-    results = c.fetchall()
-    sport, name = results[0][1:3]
-    names_site = set(item for sublist in results for item in sublist[3:] if item)
-    for name_site in names_site:
-        yield sport, name, name_site
-
-
-def add_id_to_new_db(_id):
-    conn = sqlite3.connect(PATH_DB)
-    for sport, name, name_site in get_all_names_from_id(_id):
-        c = conn.cursor()
-        c.execute("""
-        INSERT INTO names_v2 (id, sport, name, name_site)
-        VALUES ({}, "{}", "{}", "{}")
-        """.format(_id, sport, name, name_site))
-    conn.commit()
-
-def get_all_ids():
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    SELECT id FROM names
-    """)
-    for id_ in sorted(list(set(map(lambda x: x[0], c.fetchall())))):
-        yield id_
-
-def create_new_db():
-    for _id in get_all_ids():
-        if _id>133300:
-            add_id_to_new_db(_id)
-
 def is_id_consistent(_id):
-    conn = sqlite3.connect(PATH_DB)
-    c = conn.cursor()
-    c.execute("""
-    select * from names where id={} order by _rowid_
-    """.format(_id))
-    results = c.fetchall()
+    results = db_fetchall("SELECT * FROM names WHERE id=? ORDER BY _rowid_", (_id,))
     n = len(results)
     list_sites = ["betclic", "betstars", "bwin", "france_pari", "joa", "netbet", "parionssport", "pasinobet", "pmu", "unibet", "winamax", "zebet"]
     out = True
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests des accès à la base de données
+"""
+
+import sqlite3
+
+import sportsbetting
+from sportsbetting.database_functions import (MIGRATIONS, NAMES_CACHE, NAMES_CACHE_STATS, PATH_DB,
+                                              db_fetchall, resolve_name, resolve_names,
+                                              site_column)
+from sportsbetting.name_index import NameIndex
+
+
+def test_packaged_db_migrated():
+    """
+    :return: La base livrée est déjà à jour : son ouverture ne modifie pas le fichier
+    """
+    conn = sqlite3.connect("file:{}?mode=ro".format(PATH_DB), uri=True)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_names_cache():
+    """
+    :return: Le cache des noms donne les mêmes résultats que la base de données
+    """
+    for site in sportsbetting.SITES:
+        expected = {}
+        for sport, name, name_site in db_fetchall("SELECT sport, name, {} FROM names "
+                                                  "ORDER BY _rowid_"
+                                                  .format(site_column("name_", site))):
+            if name_site is not None:
+                expected.setdefault((sport, name_site), name)
+        for (sport, name_site), name in expected.items():
+            assert resolve_name(name_site, site, sport) == name
+    misses = NAMES_CACHE_STATS["misses"]
+    assert resolve_name("Equipe inexistante", "betclic", "football") is None
+    assert resolve_name("Equipe inexistante", "betclic", "football") is None
+    assert NAMES_CACHE_STATS["misses"] == misses + 1
+
+
+def test_resolve_names():
+    """
+    :return: La résolution groupée donne les mêmes noms que la résolution nom par nom
+    """
+    names = [line[0] for line in db_fetchall("SELECT name_betclic FROM names WHERE sport='football'"
+                                             " AND name_betclic IS NOT NULL LIMIT 600")]
+    NAMES_CACHE.clear()
+    NAMES_CACHE[(None, None, None)] = None  # Cache non chargé, tous les noms sont recherchés
+    resolved, unresolved = resolve_names("betclic", "football", names + ["Equipe inexistante"])
+    NAMES_CACHE.clear()
+    assert unresolved == {"Equipe inexistante"}
+    assert resolved == {name: resolve_name(name, "betclic", "football") for name in names}
+
+def test_name_index():
+    """
+    :return: L'index des noms retrouve les noms proches dans l'ordre de la table
+    """
+    index = NameIndex()
+    names = ["Paris SG", "Paris FC", "Rafael Nadal", "Olympique Marseille", "Nadal"]
+    for rowid, name in enumerate(names):
+        index.add(rowid, rowid + 10, name, {"betclic": None})
+    assert index.close("paris", "betclic") == [(10, "Paris SG"), (11, "Paris FC")]
+    assert index.close_without_acronyms("PSG Paris", "betclic") == [(10, "Paris SG"),
+                                                                    (11, "Paris FC")]
+    assert index.initial_and_last_name("R", "Nadal", "betclic") == [(12, "Rafael Nadal")]
+    index.add(0, 10, "Paris SG", {"betclic": "PSG"})
+    assert index.close("Paris", "betclic") == [(11, "Paris FC")]
+    assert index.close("Paris", "betclic", False) == [(10, "Paris SG"), (11, "Paris FC")]
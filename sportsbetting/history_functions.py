@@ -0,0 +1,215 @@
+"""
+Historique des cotes : à chaque parsing, les cotes qui ont changé depuis le parsing précédent
+sont ajoutées à une base SQLite, pour suivre l'évolution des cotes de chaque match
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+import sportsbetting
+from sportsbetting.persistence_functions import get_odds_connection
+
+PATH_HISTORY_DB = os.path.dirname(sportsbetting.__file__) + "/resources/history.db"
+# Durée de conservation des cotes
+RETENTION = datetime.timedelta(days=60)
+# Les noms des matches et des sites sont remplacés par des identifiants dans la table ticks, qui
+# ne contient qu'une ligne par cote modifiée (odd NULL si la cote n'est plus proposée)
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_matches (
+    id INTEGER PRIMARY KEY,
+    sport TEXT NOT NULL,
+    match TEXT NOT NULL,
+    UNIQUE (sport, match)
+);
+CREATE TABLE IF NOT EXISTS history_sites (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS ticks (
+    match_id INTEGER NOT NULL,
+    site_id INTEGER NOT NULL,
+    outcome INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    odd REAL,
+    PRIMARY KEY (match_id, site_id, outcome, time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ticks_site_time ON ticks (site_id, time);
+"""
+
+
+def to_timestamp(date):
+    """
+    Conversion d'une date (datetime) en secondes depuis l'epoch, None conservé
+    """
+    return None if date is None else int(date.timestamp())
+
+
+class OddsHistory:
+    """
+    Historique des cotes enregistré dans la base path. record n'écrit que les cotes modifiées
+    depuis l'enregistrement précédent, en les comparant aux dernières cotes enregistrées pour le
+    sport, gardées en mémoire
+    """
+
+    def __init__(self, path=PATH_HISTORY_DB, retention=RETENTION):
+        self.path = path
+        self.retention = retention
+        self.lock = threading.RLock()
+        self.site_ids = {}
+        self.match_ids = {}
+        # Dernières cotes enregistrées par sport : {sport: {match: {site: [cotes]}}}
+        self.last = {}
+
+    def connection(self):
+        """
+        Connexion à la base de l'historique propre au thread courant
+        """
+        return get_odds_connection(self.path, HISTORY_SCHEMA)
+
+    def last_odds(self, sport):
+        """
+        Dernières cotes enregistrées pour un sport, lues dans la base au premier appel
+        """
+        if sport not in self.last:
+            conn = self.connection()
+            last = {}
+            for _id, match in conn.execute("SELECT id, match FROM history_matches "
+                                           "WHERE sport = ?", (sport,)):
+                self.match_ids[(sport, match)] = _id
+            for match, site, outcome, odd in conn.execute(
+                    "SELECT m.match, s.site, t.outcome, t.odd FROM ticks AS t "
+                    "JOIN history_matches AS m ON m.id = t.match_id "
+                    "JOIN history_sites AS s ON s.id = t.site_id "
+                    "WHERE m.sport = ? AND t.time = (SELECT MAX(time) FROM ticks AS later "
+                    "WHERE later.match_id = t.match_id AND later.site_id = t.site_id "
+                    "AND later.outcome = t.outcome)", (sport,)):
+                odds_site = last.setdefault(match, {}).setdefault(site, [])
+                odds_site.extend([None] * (outcome + 1 - len(odds_site)))
+                odds_site[outcome] = odd
+            self.last[sport] = last
+        return self.last[sport]
+
+    def match_id(self, sport, match):
+        """
+        Identifiant d'un match, ajouté à la base si besoin
+        """
+        if (sport, match) not in self.match_ids:
+            self.match_ids[(sport, match)] = self.connection().execute(
+                "INSERT INTO history_matches (sport, match) VALUES (?, ?)",
+                (sport, match)).lastrowid
+        return self.match_ids[(sport, match)]
+
+    def site_id(self, site):
+        """
+        Identifiant d'un site, ajouté à la base si besoin
+        """
+        if site not in self.site_ids:
+            conn = self.connection()
+            row = conn.execute("SELECT id FROM history_sites WHERE site = ?", (site,)).fetchone()
+            self.site_ids[site] = row[0] if row else conn.execute(
+                "INSERT INTO history_sites (site) VALUES (?)", (site,)).lastrowid
+        return self.site_ids[site]
+
+    def record(self, sport, odds, timestamp=None):
+        """
+        Ajoute à l'historique les cotes d'un sport (au format de sportsbetting.ODDS[sport]) qui
+        ont changé depuis l'enregistrement précédent, et retourne le nombre de cotes ajoutées.
+        Pour un match parsé, les cotes d'un site présent dans odds mais qui ne propose plus le
+        match sont enregistrées comme retirées (None)
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        with self.lock:
+            last = self.last_odds(sport)
+            sites = {site for odds_match in odds.values() for site in odds_match["odds"]}
+            changes = []
+            for match in odds:
+                odds_match = odds[match]["odds"]
+                last_match = last.setdefault(match, {})
+                for site in sites.intersection(last_match).union(odds_match):
+                    previous = last_match.get(site, [])
+                    current = [float(odd) for odd in odds_match.get(site, [])]
+                    for outcome in range(max(len(previous), len(current))):
+                        odd = current[outcome] if outcome < len(current) else None
+                        if (previous[outcome] if outcome < len(previous) else None) != odd:
+                            changes.append((match, site, outcome, odd))
+                    last_match[site] = current
+            if changes:
+                conn = self.connection()
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO ticks (match_id, site_id, outcome, time, odd) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            [(self.match_id(sport, match), self.site_id(site), outcome,
+                              timestamp, odd) for match, site, outcome, odd in changes])
+                except sqlite3.Error:
+                    # Identifiants et dernières cotes relus dans la base à l'appel suivant
+                    self.match_ids.clear()
+                    self.site_ids.clear()
+                    self.last.pop(sport, None)
+                    raise
+        return len(changes)
+
+    def ticks(self, sport, match=None, site=None, start=None, end=None):
+        """
+        Cotes enregistrées entre les dates start et end (datetime), pour un match et/ou un site,
+        par ordre chronologique : [(date, match, site, issue, cote), ...]
+        """
+        conditions = ["m.sport = ?"]
+        values = [sport]
+        for condition, value in [("m.match = ?", match), ("s.site = ?", site),
+                                 ("t.time >= ?", to_timestamp(start)),
+                                 ("t.time <= ?", to_timestamp(end))]:
+            if value is not None:
+                conditions.append(condition)
+                values.append(value)
+        rows = self.connection().execute(
+            "SELECT t.time, m.match, s.site, t.outcome, t.odd FROM ticks AS t "
+            "JOIN history_matches AS m ON m.id = t.match_id "
+            "JOIN history_sites AS s ON s.id = t.site_id "
+            "WHERE " + " AND ".join(conditions) + " ORDER BY t.time, m.match, s.site, t.outcome",
+            values)
+        return [(datetime.datetime.fromtimestamp(timestamp), match_row, site_row, outcome, odd)
+                for timestamp, match_row, site_row, outcome, odd in rows]
+
+    def series(self, sport, match, site, start=None, end=None):
+        """
+        Évolution des cotes d'un match sur un site : [(date, [cotes]), ...], avec les cotes en
+        vigueur à la date start si elle est précisée (None pour une cote non proposée)
+        """
+        odds = []
+        series = []
+        for date, _, _, outcome, odd in self.ticks(sport, match, site, end=end):
+            odds.extend([None] * (outcome + 1 - len(odds)))
+            odds[outcome] = odd
+            if start is not None and date < start:
+                series = [(start, list(odds))]
+            elif series and series[-1][0] == date:
+                series[-1] = (date, list(odds))
+            else:
+                series.append((date, list(odds)))
+        return series
+
+    def purge(self, now=None):
+        """
+        Supprime les matches dont les cotes n'ont pas été enregistrées depuis plus que la durée
+        de conservation, et les cotes plus anciennes que cette durée qui ne sont plus en vigueur
+        """
+        cutoff = to_timestamp((now or datetime.datetime.now()) - self.retention)
+        with self.lock:
+            conn = self.connection()
+            with conn:
+                conn.execute("DELETE FROM ticks WHERE match_id IN (SELECT match_id FROM ticks "
+                             "GROUP BY match_id HAVING MAX(time) < ?)", (cutoff,))
+                conn.execute("DELETE FROM history_matches WHERE id NOT IN "
+                             "(SELECT DISTINCT match_id FROM ticks)")
+                conn.execute("DELETE FROM ticks WHERE time < ? AND EXISTS (SELECT 1 FROM ticks "
+                             "AS later WHERE later.match_id = ticks.match_id "
+                             "AND later.site_id = ticks.site_id AND later.outcome = ticks.outcome "
+                             "AND later.time > ticks.time AND later.time <= ?)",
+                             (cutoff, cutoff))
+            self.match_ids.clear()
+            self.last.clear()
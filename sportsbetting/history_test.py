@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests de l'historique des cotes
+"""
+
+import datetime
+
+from sportsbetting.history_functions import OddsHistory
+from sportsbetting.odds_store import OddsStore
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_odds_history(tmp_path):
+    """
+    :return: Seules les cotes modifiées sont enregistrées, l'évolution des cotes d'un match est
+    reconstituée et les matches trop anciens sont supprimés
+    """
+    path = str(tmp_path / "history.db")
+    start = datetime.datetime(2030, 1, 1)
+    timestamp = lambda hours: (start + datetime.timedelta(hours=hours)).timestamp()
+    odds = random_odds(20, 3)
+    history = OddsHistory(path)
+    nb_odds = sum(len(odds_site) for match in odds.values()
+                  for odds_site in match["odds"].values())
+    assert history.record("football", OddsStore.from_dict(odds), timestamp(0)) == nb_odds
+    assert history.record("football", odds, timestamp(1)) == 0
+    site = next(iter(odds["A0 - B0"]["odds"]))
+    initial_odds = odds["A0 - B0"]["odds"][site]
+    odds["A0 - B0"]["odds"][site] = [initial_odds[0] + 1] + initial_odds[1:]
+    odds["A0 - B0"]["odds"].pop(next(other for other in odds["A0 - B0"]["odds"]
+                                     if other != site))
+    history = OddsHistory(path)
+    assert history.record("football", odds, timestamp(2)) == 4
+    assert len(history.ticks("football", "A0 - B0", site)) == 4
+    assert len(history.ticks("football", site=site,
+                             start=start + datetime.timedelta(hours=1))) == 1
+    assert history.series("football", "A0 - B0", site) == [
+        (start, initial_odds),
+        (start + datetime.timedelta(hours=2), odds["A0 - B0"]["odds"][site])]
+    assert history.series("football", "A0 - B0", site, start + datetime.timedelta(hours=1)) == [
+        (start + datetime.timedelta(hours=1), initial_odds),
+        (start + datetime.timedelta(hours=2), odds["A0 - B0"]["odds"][site])]
+    odds["A0 - B0"]["odds"][site] = initial_odds
+    history.record("football", {"A0 - B0": odds["A0 - B0"]}, timestamp(24 * 70))
+    history.purge(start + datetime.timedelta(days=70))
+    assert {match for _, match, _, _, _ in history.ticks("football")} == {"A0 - B0"}
+    assert history.series("football", "A0 - B0", site, start + datetime.timedelta(days=10)) == [
+        (start + datetime.timedelta(days=10), [initial_odds[0] + 1] + initial_odds[1:]),
+        (start + datetime.timedelta(days=70), initial_odds)]
@@ -0,0 +1,90 @@
+"""
+Extraction ciblée des éléments des pages des bookmakers : la page est analysée une seule fois
+par lxml et seuls les éléments recherchés, sélectionnés par une expression XPath compilée une
+fois pour toutes, sont parcourus dans l'ordre du document
+"""
+
+import bs4
+import lxml.etree
+import lxml.html
+
+# Balises dont le contenu n'est pas du texte de la page
+IGNORED_TAGS = ["script", "style"]
+
+
+def class_predicate(name):
+    """
+    Condition XPath vérifiant qu'un élément a la classe name
+    """
+    return "contains(concat(' ', normalize-space(@class), ' '), ' {} ')".format(name)
+
+
+def selector(classes=(), tags=(), conditions=()):
+    """
+    Compile la recherche des éléments ayant l'une des classes ou l'un des noms de balise donnés,
+    ou vérifiant l'une des conditions XPath données
+    """
+    predicates = [class_predicate(name) for name in classes]
+    predicates += ["self::{}".format(tag) for tag in tags]
+    predicates += list(conditions)
+    return lxml.etree.XPath("//*[{}]".format(" or ".join(predicates)))
+
+
+def descendant_selector(tag, name):
+    """
+    Compile la recherche des descendants d'un élément de balise tag ayant la classe name
+    """
+    return lxml.etree.XPath(".//{}[{}]".format(tag, class_predicate(name)))
+
+
+def parse_html(content):
+    """
+    Retourne l'élément racine d'une page (contenu en octets ou chaîne), l'encodage étant
+    détecté comme le fait BeautifulSoup
+    """
+    if isinstance(content, bytes):
+        content = bs4.UnicodeDammit(content, is_html=True).unicode_markup or ""
+    try:
+        return lxml.html.document_fromstring(content.encode("utf-8"),
+                                             parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:  # Page vide
+        return lxml.html.document_fromstring("<html></html>")
+
+
+def has_class(element, name):
+    """
+    Vérifie qu'un élément a la classe name
+    """
+    return name in element.get("class", "").split()
+
+
+def iter_strings(element):
+    """
+    Parcourt les chaînes de texte contenues dans un élément
+    """
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.tag not in IGNORED_TAGS and node.text:
+            yield node.text
+        if node is not element and node.tail:
+            yield node.tail
+
+
+def strings(element):
+    """
+    Liste des chaînes non vides (sans espaces au début et à la fin) contenues dans un élément
+    """
+    return [string.strip() for string in iter_strings(element) if string.strip()]
+
+
+def text(element):
+    """
+    Texte contenu dans un élément
+    """
+    return "".join(iter_strings(element))
+
+
+def find_parent(element, tag):
+    """
+    Plus proche ancêtre d'un élément ayant le nom de balise tag, None s'il n'existe pas
+    """
+    return next(element.iterancestors(tag), None)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Tests de l'extraction ciblée des éléments des pages
+"""
+
+from sportsbetting.html_functions import (descendant_selector, has_class, parse_html, selector,
+                                          strings, text)
+
+
+def test_selector():
+    """
+    :return: Seuls les éléments recherchés sont retournés, dans l'ordre du document, avec leur
+    texte comme le donnerait BeautifulSoup
+    """
+    root = parse_html("<html><body><div class='match  live'><span> A </span><!-- B -->"
+                      "<script>C</script> D </div><p class='odds'><span class='odd'>1,5</span>"
+                      "<span class='odd'>2,5</span></p><app-date>20:00</app-date>"
+                      "<div class='matches'>E</div></body></html>".encode("utf-8"))
+    lines = selector(classes=["match", "odds"], tags=["app-date"])(root)
+    assert [line.tag for line in lines] == ["div", "p", "app-date"]
+    assert has_class(lines[0], "live") and not has_class(lines[0], "mat")
+    assert strings(lines[0]) == ["A", "D"] and text(lines[0]) == " A  D "
+    assert [text(odd) for odd in descendant_selector("span", "odd")(lines[1])] == ["1,5", "2,5"]
+    assert strings(parse_html(b"")) == []
@@ -0,0 +1,266 @@
+"""
+Client HTTP partagé (connexions persistantes par domaine, compression, nouvelles tentatives) et
+cache des réponses de comparateur-de-cotes.fr et thesportsdb
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+import urllib3
+from bs4 import BeautifulSoup
+
+import sportsbetting
+
+PATH_HTTP_CACHE = os.path.dirname(sportsbetting.__file__) + "/resources/http_cache"
+# Durée de validité (en secondes) des réponses en cache par domaine, 0 pour ne pas les conserver
+HTTP_CACHE_TTL = {"www.comparateur-de-cotes.fr": 3600, "www.thesportsdb.com": 600}
+# Tailles maximales (en octets) des réponses conservées en mémoire et sur le disque
+HTTP_CACHE_MAX_SIZE = 50 * 2 ** 20
+HTTP_CACHE_MAX_DISK_SIZE = 200 * 2 ** 20
+# Réponses en mémoire, de la moins à la plus récemment utilisée, et taille totale de leur contenu
+HTTP_CACHE = collections.OrderedDict()
+HTTP_CACHE_SIZE = 0
+# Pages analysées (arbres BeautifulSoup, bien plus volumineux que les pages) conservées avec les
+# réponses en mémoire : (url, nom) -> réponse, de la moins à la plus récemment utilisée, dans la
+# limite de HTTP_PARSED_CACHE_MAX_ENTRIES
+PARSED_CACHE = collections.OrderedDict()
+HTTP_PARSED_CACHE_MAX_ENTRIES = 16
+HTTP_CACHE_STATS = {"hits": 0, "revalidated": 0, "downloads": 0}
+HTTP_CACHE_LOCK = threading.RLock()
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_4) AppleWebKit/537.36 "
+                              "(KHTML, like Gecko) Chrome/83.0.4103.97 Safari/537.36",
+                **urllib3.util.make_headers(accept_encoding=True)}
+HTTP_TIMEOUT = 10
+# Nombre maximal de requêtes simultanées par domaine
+HTTP_MAX_CONNECTIONS = {"www.winamax.fr": 2}
+HTTP_DEFAULT_MAX_CONNECTIONS = 4
+# Nouvelles tentatives (avec attente croissante) en cas d'erreur de connexion ou de réponse
+# temporairement indisponible, par domaine
+HTTP_RETRIES = {"www.netbet.fr": urllib3.Retry(total=3, backoff_factor=0.5, raise_on_status=False,
+                                               status_forcelist=[403, 429, 500, 502, 503, 504])}
+HTTP_DEFAULT_RETRIES = urllib3.Retry(total=2, backoff_factor=0.5, raise_on_status=False,
+                                     status_forcelist=[429, 500, 502, 503, 504])
+HTTP_POOL = urllib3.PoolManager(num_pools=32, maxsize=HTTP_DEFAULT_MAX_CONNECTIONS)
+HTTP_SEMAPHORES = {}
+HTTP_SEMAPHORES_LOCK = threading.Lock()
+# Transport remplaçant le client partagé (enregistrement ou rejeu des pages, cf.
+# replay_functions), None pour télécharger les pages normalement
+TRANSPORT = None
+
+
+def host_semaphore(host):
+    """
+    Sémaphore limitant le nombre de requêtes simultanées vers un domaine
+    """
+    with HTTP_SEMAPHORES_LOCK:
+        if host not in HTTP_SEMAPHORES:
+            HTTP_SEMAPHORES[host] = threading.BoundedSemaphore(
+                HTTP_MAX_CONNECTIONS.get(host, HTTP_DEFAULT_MAX_CONNECTIONS))
+        return HTTP_SEMAPHORES[host]
+
+
+def fetch(url, headers=None, timeout=HTTP_TIMEOUT):
+    """
+    Télécharge une page avec le client partagé. Les erreurs sont levées comme avec urllib :
+    urllib.error.HTTPError si le code de la réponse finale n'est pas un succès,
+    urllib.error.URLError si la page est inaccessible
+    """
+    if TRANSPORT is not None:
+        return TRANSPORT.fetch(url, headers, timeout)
+    return network_fetch(url, headers, timeout)
+
+
+def network_fetch(url, headers=None, timeout=HTTP_TIMEOUT):
+    """
+    Télécharge une page sur le réseau avec le client partagé
+    """
+    host = urllib.parse.urlsplit(url).netloc
+    with host_semaphore(host):
+        try:
+            response = HTTP_POOL.request("GET", url, headers={**HTTP_HEADERS, **(headers or {})},
+                                         timeout=timeout,
+                                         retries=HTTP_RETRIES.get(host, HTTP_DEFAULT_RETRIES))
+        except urllib3.exceptions.HTTPError as error:
+            raise urllib.error.URLError(error)
+    if response.status >= 300:
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers,
+                                     None)
+    return response
+
+
+def cache_ttl(url):
+    """
+    Durée de validité en cache d'une réponse
+    """
+    return HTTP_CACHE_TTL.get(urllib.parse.urlsplit(url).netloc, 0)
+
+
+def cache_path(url):
+    """
+    Chemin du fichier de cache d'une réponse
+    """
+    return os.path.join(PATH_HTTP_CACHE, hashlib.sha1(url.encode()).hexdigest())
+
+
+def read_disk_cache(url):
+    """
+    Retourne la réponse enregistrée sur le disque pour url, None si elle n'existe pas
+    """
+    try:
+        with open(cache_path(url), "rb") as file:
+            entry = pickle.load(file)
+        os.utime(cache_path(url))
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    entry["parsed"] = {}
+    return entry if entry["url"] == url else None
+
+
+def write_disk_cache(entry):
+    """
+    Enregistre une réponse sur le disque, en supprimant les réponses les moins récemment
+    utilisées au-delà de HTTP_CACHE_MAX_DISK_SIZE
+    """
+    try:
+        os.makedirs(PATH_HTTP_CACHE, exist_ok=True)
+        path = cache_path(entry["url"])
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump({key: value for key, value in entry.items() if key != "parsed"}, file)
+        os.replace(path + ".tmp", path)
+        files = sorted((file.stat().st_mtime, file.stat().st_size, file.path)
+                       for file in os.scandir(PATH_HTTP_CACHE) if file.is_file())
+        size = sum(file[1] for file in files)
+        for _, file_size, file_path in files:
+            if size <= HTTP_CACHE_MAX_DISK_SIZE:
+                break
+            os.remove(file_path)
+            size -= file_size
+    except OSError:
+        pass
+
+
+def remove_entry(url):
+    """
+    Retire une réponse du cache en mémoire, avec ses pages analysées
+    """
+    global HTTP_CACHE_SIZE
+    removed = HTTP_CACHE.pop(url)
+    HTTP_CACHE_SIZE -= len(removed["content"])
+    for key in removed["parsed"]:
+        PARSED_CACHE.pop((url, key), None)
+    removed["parsed"] = {}
+
+
+def store_entry(entry):
+    """
+    Place une réponse en tête du cache en mémoire et supprime les réponses les moins récemment
+    utilisées au-delà de HTTP_CACHE_MAX_SIZE
+    """
+    global HTTP_CACHE_SIZE
+    url = entry["url"]
+    if HTTP_CACHE.get(url) is not entry:
+        if url in HTTP_CACHE:
+            remove_entry(url)
+        HTTP_CACHE[url] = entry
+        HTTP_CACHE_SIZE += len(entry["content"])
+    HTTP_CACHE.move_to_end(url)
+    while HTTP_CACHE_SIZE > HTTP_CACHE_MAX_SIZE and len(HTTP_CACHE) > 1:
+        remove_entry(next(iter(HTTP_CACHE)))
+
+
+def clear_http_cache():
+    """
+    Vide le cache en mémoire
+    """
+    with HTTP_CACHE_LOCK:
+        for url in list(HTTP_CACHE):
+            remove_entry(url)
+
+
+def download(url, headers):
+    """
+    Télécharge une page, retourne le contenu et les en-têtes de la réponse
+    """
+    response = fetch(url, headers)
+    return response.data, response.headers
+
+
+def get_entry(url):
+    """
+    Retourne la réponse en cache pour url, téléchargée ou revalidée (ETag / Last-Modified) si
+    elle a expiré
+    """
+    ttl = cache_ttl(url)
+    with HTTP_CACHE_LOCK:
+        entry = HTTP_CACHE.get(url) or (read_disk_cache(url) if ttl else None)
+        if entry and entry["expires"] > time.time():
+            HTTP_CACHE_STATS["hits"] += 1
+            store_entry(entry)
+            return entry
+    headers = {}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        content, response_headers = download(url, headers)
+    except urllib.error.HTTPError as error:
+        if not (entry and error.code == 304):
+            raise
+        HTTP_CACHE_STATS["revalidated"] += 1
+        entry["expires"] = time.time() + ttl
+    else:
+        HTTP_CACHE_STATS["downloads"] += 1
+        entry = {"url": url, "content": content, "etag": response_headers.get("ETag"),
+                 "last_modified": response_headers.get("Last-Modified"),
+                 "expires": time.time() + ttl, "parsed": {}}
+    if ttl:
+        with HTTP_CACHE_LOCK:
+            store_entry(entry)
+        write_disk_cache(entry)
+    return entry
+
+
+def get_content(url):
+    """
+    Retourne le contenu de la page url
+    """
+    return get_entry(url)["content"]
+
+
+def get_parsed(url, parse_function, key):
+    """
+    Retourne parse_function(contenu de la page url), conservé avec la réponse en mémoire sous le
+    nom key tant que la page n'a pas changé (dans la limite de HTTP_PARSED_CACHE_MAX_ENTRIES
+    pages analysées)
+    """
+    entry = get_entry(url)
+    with HTTP_CACHE_LOCK:
+        if key in entry["parsed"]:
+            if (url, key) in PARSED_CACHE:
+                PARSED_CACHE.move_to_end((url, key))
+            return entry["parsed"][key]
+    parsed = parse_function(entry["content"])
+    with HTTP_CACHE_LOCK:
+        if HTTP_CACHE.get(url) is entry:
+            entry["parsed"][key] = parsed
+            PARSED_CACHE[(url, key)] = entry
+            PARSED_CACHE.move_to_end((url, key))
+            while len(PARSED_CACHE) > HTTP_PARSED_CACHE_MAX_ENTRIES:
+                (_, removed_key), removed = PARSED_CACHE.popitem(last=False)
+                removed["parsed"].pop(removed_key, None)
+    return parsed
+
+
+def get_soup(url):
+    """
+    Retourne l'arbre BeautifulSoup de la page url, partagé entre les appels : il ne doit pas
+    être modifié
+    """
+    return get_parsed(url, lambda content: BeautifulSoup(content, features="lxml"), "soup")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests du client HTTP partagé et du cache des réponses
+"""
+
+import collections
+import email.message
+import gzip
+import http.server
+import socketserver
+import threading
+import urllib.error
+
+import pytest
+
+from sportsbetting import http_functions
+
+
+def test_http_cache(monkeypatch, tmp_path):
+    """
+    :return: Les pages en cache ne sont téléchargées qu'une fois, puis revalidées après expiration
+    """
+    requests = []
+
+    def download(url, headers):
+        requests.append((url, headers))
+        if headers.get("If-None-Match") == '"v1"':
+            raise urllib.error.HTTPError(url, 304, "Not Modified", None, None)
+        response_headers = email.message.Message()
+        response_headers["ETag"] = '"v1"'
+        return b"<html><h1>" + url.encode() + b"</h1></html>", response_headers
+
+    monkeypatch.setattr(http_functions, "download", download)
+    monkeypatch.setattr(http_functions, "PATH_HTTP_CACHE", str(tmp_path))
+    monkeypatch.setattr(http_functions, "HTTP_CACHE", collections.OrderedDict())
+    monkeypatch.setattr(http_functions, "HTTP_CACHE_SIZE", 0)
+    monkeypatch.setattr(http_functions, "PARSED_CACHE", collections.OrderedDict())
+    url = "http://www.comparateur-de-cotes.fr/comparateur/football/a-td1"
+    soup = http_functions.get_soup(url)
+    assert http_functions.get_soup(url) is soup and len(requests) == 1
+    http_functions.clear_http_cache()
+    assert not http_functions.PARSED_CACHE and http_functions.HTTP_CACHE_SIZE == 0
+    assert http_functions.get_content(url) == b"<html><h1>" + url.encode() + b"</h1></html>"
+    assert len(requests) == 1  # Réponse relue sur le disque
+    http_functions.HTTP_CACHE[url]["expires"] = 0
+    assert http_functions.get_soup(url).h1.text == url
+    assert requests[-1][1] == {"If-None-Match": '"v1"'}
+    monkeypatch.setattr(http_functions, "HTTP_CACHE_MAX_SIZE", 200)
+    for i in range(5):
+        http_functions.get_content(url + str(i))
+    assert list(http_functions.HTTP_CACHE) == [url + "3", url + "4"]
+    assert http_functions.HTTP_CACHE_SIZE == sum(len(entry["content"])
+                                                 for entry in http_functions.HTTP_CACHE.values())
+    monkeypatch.setattr(http_functions, "HTTP_PARSED_CACHE_MAX_ENTRIES", 1)
+    http_functions.get_soup(url + "3")
+    http_functions.get_soup(url + "4")
+    assert list(http_functions.PARSED_CACHE) == [(url + "4", "soup")]
+    assert not http_functions.HTTP_CACHE[url + "3"]["parsed"]
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """
+    Serveur HTTP multi-thread (http.server.ThreadingHTTPServer n'existe qu'à partir de
+    Python 3.7)
+    """
+    daemon_threads = True
+
+
+class GzipHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serveur de test : /page renvoie une page compressée, les autres chemins une erreur 404
+    """
+
+    def do_GET(self):
+        if self.path == "/page" and "gzip" in self.headers["Accept-Encoding"]:
+            content = gzip.compress(b"<html>page</html>")
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_fetch():
+    """
+    :return: Le client partagé décompresse les réponses et lève les erreurs comme urllib
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GzipHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}/".format(server.server_port)
+    try:
+        assert http_functions.fetch(url + "page").data == b"<html>page</html>"
+        with pytest.raises(urllib.error.HTTPError):
+            http_functions.fetch(url + "absente")
+    finally:
+        server.shutdown()
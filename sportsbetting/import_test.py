@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests du temps d'import du module
+"""
+
+import os
+import subprocess
+import sys
+
+import sportsbetting
+
+# Durée maximale (en secondes) de l'import de sportsbetting.basic_functions, numpy compris
+IMPORT_BUDGET = 1
+
+
+def test_import_time():
+    """
+    :return: L'import des fonctions de base ne télécharge rien, ne lance pas l'installation de
+    chromedriver et reste rapide
+    """
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import sportsbetting.basic_functions\n"
+            "print(time.perf_counter() - start)\n"
+            "print(any(module.split('.')[0] in ['fake_useragent', 'chromedriver_autoinstaller',"
+            " 'selenium', 'urllib3'] for module in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.PIPE,
+                            universal_newlines=True,
+                            cwd=os.path.dirname(os.path.dirname(sportsbetting.__file__)))
+    duration, heavy_modules_loaded = output.stdout.split()
+    assert heavy_modules_loaded == "False"
+    assert float(duration) < IMPORT_BUDGET
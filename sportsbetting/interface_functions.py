@@ -5,14 +5,13 @@
 .. module::interface_functions
 :synopsis: Fonctions d'intéraction entre l'interface et les fonctions du package sportsbetting
 """
-import sys
-import io
 import datetime
 import numpy as np
 import PySimpleGUI as sg
 
 import sportsbetting
 from sportsbetting.auxiliary_functions import get_nb_issues
+from sportsbetting.bet_result import format_stakes
 from sportsbetting.database_functions import get_all_current_competitions, get_main_competitions, get_all_competitions
 from sportsbetting.user_functions import (best_match_under_conditions,
                                           best_match_freebet, best_stakes_match,
@@ -21,95 +20,54 @@ from sportsbetting.user_functions import (best_match_under_conditions,
                                           best_match_pari_gagnant, odds_match,
                                           best_combine_booste)
 
-WHAT_WAS_PRINTED_COMBINE = ""
-
 
 def odds_table(result):
     """
-    :param result: ensemble des valeurs affichées dans le terminal par une fonction du package
-    sportsbetting
+    :param result: Résultat (BetResult) d'une fonction du package sportsbetting
     :return: Tableau des cotes
     """
-    lines = result.split("\n")
-    i = 0
-    for i, line in enumerate(lines):
-        if "}}" in line:
-            break
-    dict_odds = eval("".join(lines[1:i + 1]))
-    odds = dict_odds["odds"]
-    if len(list(odds.values())[0]) == 2:
-        for key in odds.keys():
-            odds[key].insert(1, "-   ")
     table = []
-    for key, value in odds.items():
+    for key, value in result.odds.items():
+        if len(value) == 2:
+            value = [value[0], "-   ", value[1]]
         table.append([key] + list(map(str, value)))
     return table
 
 
 def indicators(result):
     """
-    :param result: ensemble des valeurs affichées dans le terminal par une fonction du package
-    sportsbetting
-    :return: Valeurs utiles concernant le résultat affiché (Somme des mises, plus-value, ...)
+    :param result: Résultat (BetResult) d'une fonction du package sportsbetting
+    :return: Valeurs utiles concernant le résultat (Somme des mises, plus-value, ...)
     """
-    lines = result.split("}}\n")[1].split("\nmises arrondies")[0].split("\n")
-    for line in lines:
-        if not line:
-            break
-        yield line.split(" = ")
+    for name, value in result.main_indicators().items():
+        yield [name, str(value)]
 
 
 def stakes(result):
     """
-    :param result: ensemble des valeurs affichées dans le terminal par une fonction du package
-    sportsbetting
-    :return: Dictionnaire des mises
+    :param result: Résultat (BetResult) d'une fonction du package sportsbetting
+    :return: Répartition des mises
     """
-    return result.split(
-        "Répartition des mises (les totaux affichés prennent en compte les éventuels freebets):\n")[
-        1]
+    return "".join(line + "\n" for line in format_stakes(result.stakes))
 
 
 def infos(result):
     """
-    :param result: ensemble des valeurs affichées dans le terminal par une fonction du package
-    sportsbetting
+    :param result: Résultat (BetResult) d'une fonction du package sportsbetting
     :return: Nom et date du match sélectionné
     """
-    lines = result.split("\n")
-    match = lines[0]
-    i = 0
-    if match == "No match found":
+    if not result:
         return None, None
-    for i, line in enumerate(lines):
-        if "}}" in line:
-            break
-    dict_odds = eval("".join(lines[1:i + 1]))
-    date = dict_odds["date"]
-    return match, date.strftime("%A %d %B %Y %H:%M")
+    return result.match, result.date.strftime("%A %d %B %Y %H:%M")
 
 
 def odds_table_combine(result):
     """
-    :param result: ensemble des valeurs affichées dans le terminal par une fonction du package
-    sportsbetting
+    :param result: Résultat (BetResult) d'une fonction du package sportsbetting
     :return: Tableau des cotes dans le cas d'un combiné
     """
-    lines = result.split("\n")
-    i = 0
-    for i, line in enumerate(lines):
-        if "}}" in line:
-            break
-    dict_odds = eval("".join(lines[1:i + 1]))
-    odds = dict_odds["odds"]
-    table = []
-    combinaisons = []
-    for line in result.split("freebets):\n")[1].split("\n"):
-        combinaisons.append(line.split("\t")[0].strip())
-    del combinaisons[-1]
-    combinaisons = ["Combinaison"] + combinaisons
-    table.append(combinaisons)
-    for key, value in odds.items():
+    table = [["Combinaison"] + result.outcomes]
+    for key, value in result.odds.items():
         table.append([key] + list(map(lambda x:str(round(x, 3)), value)))
     return np.transpose(table).tolist()
 
@@ -133,13 +91,9 @@ def best_match_under_conditions_interface(window, values):
             date_max = values["DATE_MAX_UNDER_CONDITION"]
             time_max = values["TIME_MAX_UNDER_CONDITION"].replace(":", "h")
         one_site = values["ONE_SITE_UNDER_CONDITION"]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_match_under_conditions(site, minimum_odd, bet, sport, date_max, time_max, date_min,
-                                    time_min, one_site)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()  # contains the entire contents of the buffer.
-        match, date = infos(what_was_printed)
+        result = best_match_under_conditions(site, minimum_odd, bet, sport, date_max, time_max,
+                                             date_min, time_min, one_site)
+        match, date = infos(result)
         if match is None:
             window["MATCH_UNDER_CONDITION"].update("Aucun match trouvé")
             window["DATE_UNDER_CONDITION"].update("")
@@ -152,14 +106,13 @@ def best_match_under_conditions_interface(window, values):
         else:
             window["MATCH_UNDER_CONDITION"].update(match)
             window["DATE_UNDER_CONDITION"].update(date)
-            window["ODDS_UNDER_CONDITION"].update(odds_table(what_was_printed), visible=True)
-            window["RESULT_UNDER_CONDITION"].update(stakes(what_was_printed), visible=True)
+            window["ODDS_UNDER_CONDITION"].update(odds_table(result), visible=True)
+            window["RESULT_UNDER_CONDITION"].update(stakes(result), visible=True)
             window["TEXT_UNDER_CONDITION"].update(visible=True)
-            for i, elem in enumerate(indicators(what_was_printed)):
+            for i, elem in enumerate(indicators(result)):
                 window["INDICATORS_UNDER_CONDITION" + str(i)].update(elem[0].capitalize(),
                                                                      visible=True)
                 window["RESULTS_UNDER_CONDITION" + str(i)].update(elem[1], visible=True)
-        buffer.close()
     except IndexError:
         pass
     except ValueError:
@@ -179,13 +132,9 @@ def best_stakes_match_interface(window, values):
         minimum_odd = float(values["ODD_STAKE"])
         sport = values["SPORT_STAKE"][0]
         match = values["MATCHES"][0]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_stakes_match(match, site, bet, minimum_odd, sport)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()
-        match, date = infos(what_was_printed)
-        if "No match found" in what_was_printed:
+        result = best_stakes_match(match, site, bet, minimum_odd, sport)
+        match, date = infos(result)
+        if not result:
             window["MATCH_STAKE"].update("Cote trop élevée pour le match choisi")
             window["DATE_STAKE"].update("")
             window["ODDS_STAKE"].update(visible=False)
@@ -197,13 +146,12 @@ def best_stakes_match_interface(window, values):
         else:
             window["MATCH_STAKE"].update(match)
             window["DATE_STAKE"].update(date)
-            window["ODDS_STAKE"].update(odds_table(what_was_printed), visible=True)
-            window["RESULT_STAKE"].update(stakes(what_was_printed), visible=True)
+            window["ODDS_STAKE"].update(odds_table(result), visible=True)
+            window["RESULT_STAKE"].update(stakes(result), visible=True)
             window["TEXT_STAKE"].update(visible=True)
-            for i, elem in enumerate(indicators(what_was_printed)):
+            for i, elem in enumerate(indicators(result)):
                 window["INDICATORS_STAKE" + str(i)].update(elem[0].capitalize(), visible=True)
                 window["RESULTS_STAKE" + str(i)].update(elem[1], visible=True)
-        buffer.close()
     except IndexError:
         sg.Popup("Site ou match non défini")
     except ValueError:
@@ -222,21 +170,16 @@ def best_match_freebet_interface(window, values):
         site = values["SITE_FREEBET"][0]
         freebet = float(values["BET_FREEBET"])
         sport = values["SPORT_FREEBET"][0]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_match_freebet(site, freebet, sport)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()
-        match, date = infos(what_was_printed)
+        result = best_match_freebet(site, freebet, sport)
+        match, date = infos(result)
         window["MATCH_FREEBET"].update(match)
         window["DATE_FREEBET"].update(date)
-        window["ODDS_FREEBET"].update(odds_table(what_was_printed), visible=True)
-        window["RESULT_FREEBET"].update(stakes(what_was_printed), visible=True)
+        window["ODDS_FREEBET"].update(odds_table(result), visible=True)
+        window["RESULT_FREEBET"].update(stakes(result), visible=True)
         window["TEXT_FREEBET"].update(visible=True)
-        for i, elem in enumerate(indicators(what_was_printed)):
+        for i, elem in enumerate(indicators(result)):
             window["INDICATORS_FREEBET" + str(i)].update(elem[0].capitalize(), visible=True)
             window["RESULTS_FREEBET" + str(i)].update(elem[1], visible=True)
-        buffer.close()
     except IndexError:
         pass
     except ValueError:
@@ -267,13 +210,9 @@ def best_match_cashback_interface(window, values):
         if values["DATE_MAX_CASHBACK_BOOL"]:
             date_max = values["DATE_MAX_CASHBACK"]
             time_max = values["TIME_MAX_CASHBACK"].replace(":", "h")
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_match_cashback(site, minimum_odd, bet, sport, freebet, combi_max, combi_odd,
-                            rate_cashback, date_max, time_max, date_min, time_min)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()
-        match, date = infos(what_was_printed)
+        result = best_match_cashback(site, minimum_odd, bet, sport, freebet, combi_max, combi_odd,
+                                     rate_cashback, date_max, time_max, date_min, time_min)
+        match, date = infos(result)
         if match is None:
             window["MATCH_CASHBACK"].update("Aucun match trouvé")
             window["DATE_CASHBACK"].update("")
@@ -286,13 +225,12 @@ def best_match_cashback_interface(window, values):
         else:
             window["MATCH_CASHBACK"].update(match)
             window["DATE_CASHBACK"].update(date)
-            window["ODDS_CASHBACK"].update(odds_table(what_was_printed), visible=True)
-            window["RESULT_CASHBACK"].update(stakes(what_was_printed), visible=True)
+            window["ODDS_CASHBACK"].update(odds_table(result), visible=True)
+            window["RESULT_CASHBACK"].update(stakes(result), visible=True)
             window["TEXT_CASHBACK"].update(visible=True)
-            for i, elem in enumerate(indicators(what_was_printed)):
+            for i, elem in enumerate(indicators(result)):
                 window["INDICATORS_CASHBACK" + str(i)].update(elem[0].capitalize(), visible=True)
                 window["RESULTS_CASHBACK" + str(i)].update(elem[1], visible=True)
-        buffer.close()
     except IndexError:
         pass
 
@@ -318,13 +256,9 @@ def best_matches_combine_interface(window, values):
             date_max = values["DATE_MAX_COMBINE"]
             time_max = values["TIME_MAX_COMBINE"].replace(":", "h")
         one_site = values["ONE_SITE_COMBINE"]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_matches_combine(site, minimum_odd, bet, sport, nb_matches, one_site, date_max,
-                             time_max, date_min, time_min, minimum_odd_selection)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()
-        match, date = infos(what_was_printed)
+        result = best_matches_combine(site, minimum_odd, bet, sport, nb_matches, one_site, date_max,
+                                      time_max, date_min, time_min, minimum_odd_selection)
+        match, date = infos(result)
         if match is None:
             window["MATCH_COMBINE"].update("Aucun match trouvé")
             window["DATE_COMBINE"].update("")
@@ -338,13 +272,12 @@ def best_matches_combine_interface(window, values):
             window["MATCH_COMBINE"].update(match)
             window["DATE_COMBINE"].update(date)
             window["ODDS_COMBINE"].update(visible=True)
-            window["RESULT_COMBINE"].update(stakes(what_was_printed), visible=True)
+            window["RESULT_COMBINE"].update(stakes(result), visible=True)
             window["TEXT_COMBINE"].update(visible=True)
-            for i, elem in enumerate(indicators(what_was_printed)):
+            for i, elem in enumerate(indicators(result)):
                 window["INDICATORS_COMBINE" + str(i)].update(elem[0].capitalize(), visible=True)
                 window["RESULTS_COMBINE" + str(i)].update(elem[1], visible=True)
-        buffer.close()
-        sportsbetting.ODDS_INTERFACE = what_was_printed
+        sportsbetting.ODDS_INTERFACE = result
     except IndexError:
         pass
     except ValueError:
@@ -370,22 +303,17 @@ def best_match_stakes_to_bet_interface(window, values, visible_stakes):
     if values["DATE_MAX_STAKES_BOOL"]:
         date_max = values["DATE_MAX_STAKES"]
         time_max = values["TIME_MAX_STAKES"].replace(":", "h")
-    old_stdout = sys.stdout  # Memorize the default stdout stream
-    sys.stdout = buffer = io.StringIO()
-    best_match_stakes_to_bet(stakes_list, nb_matches, sport, date_max, time_max)
-    sys.stdout = old_stdout  # Put the old stream back in place
-    what_was_printed = buffer.getvalue()
-    match, date = infos(what_was_printed)
+    result = best_match_stakes_to_bet(stakes_list, nb_matches, sport, date_max, time_max)
+    match, date = infos(result)
     window["MATCH_STAKES"].update(match)
     window["DATE_STAKES"].update(date)
     window["ODDS_STAKES"].update(visible=True)
-    window["RESULT_STAKES"].update(stakes(what_was_printed), visible=True)
+    window["RESULT_STAKES"].update(stakes(result), visible=True)
     window["TEXT_STAKES"].update(visible=True)
-    for i, elem in enumerate(indicators(what_was_printed)):
+    for i, elem in enumerate(indicators(result)):
         window["INDICATORS_STAKES" + str(i)].update(elem[0].capitalize(), visible=True)
         window["RESULTS_STAKES" + str(i)].update(elem[1], visible=True)
-    buffer.close()
-    sportsbetting.ODDS_INTERFACE = what_was_printed
+    sportsbetting.ODDS_INTERFACE = result
 
 
 def best_matches_freebet_interface(window, values, visible_freebets):
@@ -400,22 +328,17 @@ def best_matches_freebet_interface(window, values, visible_freebets):
         freebets_list.append([float(values["STAKE_FREEBETS_" + str(i)]),
                               values["SITE_FREEBETS_" + str(i)]])
     sites = values["SITES_FREEBETS"]
-    old_stdout = sys.stdout  # Memorize the default stdout stream
-    sys.stdout = buffer = io.StringIO()
-    best_matches_freebet(sites, freebets_list)
-    sys.stdout = old_stdout  # Put the old stream back in place
-    what_was_printed = buffer.getvalue()
-    match, date = infos(what_was_printed)
+    result = best_matches_freebet(sites, freebets_list)
+    match, date = infos(result)
     window["MATCH_FREEBETS"].update(match)
     window["DATE_FREEBETS"].update(date)
     window["ODDS_FREEBETS"].update(visible=True)
-    window["RESULT_FREEBETS"].update(stakes(what_was_printed), visible=True)
+    window["RESULT_FREEBETS"].update(stakes(result), visible=True)
     window["TEXT_FREEBETS"].update(visible=True)
-    for i, elem in enumerate(indicators(what_was_printed)):
+    for i, elem in enumerate(indicators(result)):
         window["INDICATORS_FREEBETS" + str(i)].update(elem[0].capitalize(), visible=True)
         window["RESULTS_FREEBETS" + str(i)].update(elem[1], visible=True)
-    buffer.close()
-    return what_was_printed
+    return result
 
 
 def best_match_pari_gagnant_interface(window, values):
@@ -437,13 +360,9 @@ def best_match_pari_gagnant_interface(window, values):
             date_max = values["DATE_MAX_GAGNANT"]
             time_max = values["TIME_MAX_GAGNANT"].replace(":", "h")
         nb_matches_combine = values["NB_MATCHES_GAGNANT"]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = buffer = io.StringIO()
-        best_match_pari_gagnant(site, minimum_odd, bet, sport, date_max, time_max, date_min,
-                                time_min, nb_matches_combine)
-        sys.stdout = old_stdout  # Put the old stream back in place
-        what_was_printed = buffer.getvalue()
-        match, date = infos(what_was_printed)
+        result = best_match_pari_gagnant(site, minimum_odd, bet, sport, date_max, time_max,
+                                         date_min, time_min, nb_matches_combine)
+        match, date = infos(result)
         if match is None:
             window["MATCH_GAGNANT"].update("Aucun match trouvé")
             window["DATE_GAGNANT"].update("")
@@ -461,15 +380,14 @@ def best_match_pari_gagnant_interface(window, values):
                 window["ODDS_GAGNANT"].update(visible=False)
                 window["ODDS_COMBINE_GAGNANT"].update(visible=True)
             else:
-                window["ODDS_GAGNANT"].update(odds_table(what_was_printed), visible=True)
+                window["ODDS_GAGNANT"].update(odds_table(result), visible=True)
                 window["ODDS_COMBINE_GAGNANT"].update(visible=False)
-            window["RESULT_GAGNANT"].update(stakes(what_was_printed), visible=True)
+            window["RESULT_GAGNANT"].update(stakes(result), visible=True)
             window["TEXT_GAGNANT"].update(visible=True)
-            for i, elem in enumerate(indicators(what_was_printed)):
+            for i, elem in enumerate(indicators(result)):
                 window["INDICATORS_GAGNANT" + str(i)].update(elem[0].capitalize(), visible=True)
                 window["RESULTS_GAGNANT" + str(i)].update(elem[1], visible=True)
-            sportsbetting.ODDS_INTERFACE = what_was_printed
-        buffer.close()
+            sportsbetting.ODDS_INTERFACE = result
     except IndexError:
         pass
     except ValueError:
@@ -485,10 +403,7 @@ def odds_match_interface(window, values):
     try:
         match = values["MATCHES_ODDS"][0]
         sport = values["SPORT_ODDS"][0]
-        old_stdout = sys.stdout  # Memorize the default stdout stream
-        sys.stdout = io.StringIO()
         odds_dict = odds_match(match, sport)[1]
-        sys.stdout = old_stdout  # Put the old stream back in place
         odds = odds_dict["odds"]
         date = odds_dict["date"]
         if len(list(odds.values())[0]) == 2:
@@ -563,20 +478,16 @@ def best_combine_reduit_interface(window, values, visible_combi_opt):
     site_booste = values["SITE_COMBI_OPT"]
     mise_max = float(values["STAKE_COMBI_OPT"])
     cote_boostee = float(values["ODD_COMBI_OPT"])
-    old_stdout = sys.stdout  # Memorize the default stdout stream
-    sys.stdout = buffer = io.StringIO()
-    best_combine_booste(match_list, combi_boostee, site_booste, mise_max, sport, cote_boostee)
-    sys.stdout = old_stdout  # Put the old stream back in place
-    what_was_printed = buffer.getvalue()
-    match, date = infos(what_was_printed)
+    result = best_combine_booste(match_list, combi_boostee, site_booste, mise_max, sport,
+                                 cote_boostee)
+    match, date = infos(result)
     window["MATCH_COMBI_OPT"].update(match)
     window["DATE_COMBI_OPT"].update(date)
     window["ODDS_COMBI_OPT"].update(visible=True)
-    window["RESULT_COMBI_OPT"].update(stakes(what_was_printed), visible=True)
+    window["RESULT_COMBI_OPT"].update(stakes(result), visible=True)
     window["TEXT_COMBI_OPT"].update(visible=True)
-    for i, elem in enumerate(indicators(what_was_printed)):
+    for i, elem in enumerate(indicators(result)):
         window["INDICATORS_COMBI_OPT" + str(i)].update(elem[0].capitalize(), visible=True)
         window["RESULTS_COMBI_OPT" + str(i)].update(elem[1], visible=True)
-    buffer.close()
-    sportsbetting.ODDS_INTERFACE = what_was_printed
+    sportsbetting.ODDS_INTERFACE = result
     
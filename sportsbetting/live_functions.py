@@ -0,0 +1,233 @@
+"""
+Suivi en continu des cotes : chaque compétition de chaque site est parsée à son propre rythme,
+et seuls les matches dont les cotes ont changé depuis le parsing précédent sont renommés,
+fusionnés et réévalués
+"""
+
+import concurrent.futures
+import socket
+import sys
+import threading
+import time
+import traceback
+import urllib.error
+
+import selenium.common
+import urllib3
+
+import sportsbetting
+from sportsbetting import selenium_init
+from sportsbetting.auxiliary_functions import (adapt_match_names, best_rank_match,
+                                               merge_dict_odds, valid_odds)
+from sportsbetting.database_functions import (get_competition_by_id,
+                                              get_id_formatted_competition_name)
+from sportsbetting.odds_store import OddsStore
+from sportsbetting.parser_functions import parse
+from sportsbetting.scraping_functions import HTTP_SITES, PARSING_WORKERS
+
+# Intervalle (en secondes) entre deux parsings d'une même compétition, par site
+POLL_INTERVAL = {"winamax": 60}
+DEFAULT_POLL_INTERVAL = 30
+PARSING_ERRORS = (urllib.error.URLError, socket.timeout, urllib3.exceptions.MaxRetryError,
+                  selenium.common.exceptions.WebDriverException,
+                  sportsbetting.UnavailableCompetitionException,
+                  sportsbetting.UnavailableSiteException)
+
+
+def fetch_competition(competition, sport, site):
+    """
+    Cotes d'une compétition sur un site, avec les noms du site, None si la compétition n'est pas
+    disponible
+    """
+    try:
+        _id = get_id_formatted_competition_name(competition, sport)[0]
+    except TypeError:
+        return None
+    url = get_competition_by_id(_id, site)
+    if not url:
+        return None
+    if site in HTTP_SITES:
+        return parse(site, url)
+    with selenium_init.DRIVER.lease(site):
+        return parse(site, url)
+
+
+def diff_odds(old, new):
+    """
+    Différences entre deux états des cotes (au format de sportsbetting.ODDS[sport]) : matches
+    nouveaux ou modifiés, et matches retirés
+    """
+    changed = {match: odds_match for match, odds_match in new.items()
+               if old.get(match) != odds_match}
+    removed = [match for match in old if match not in new]
+    return changed, removed
+
+
+def rank_strategy(site, n, odds_function, profit_function, criteria, one_site=False):
+    """
+    Stratégie évaluée match par match comme dans best_match_base : retourne la fonction qui, aux
+    cotes d'un match, associe None ou (gain, rang de l'issue, cotes retenues, sites)
+    """
+    return lambda odds_match: best_rank_match(odds_match["odds"], site, n, odds_function,
+                                              profit_function, criteria, one_site)
+
+
+class OddsWatcher:
+    """
+    Parsing en continu des compétitions competitions d'un sport sur les sites sites. Chaque
+    couple (site, compétition) est parsé toutes les intervals[site] secondes, et comparé au
+    parsing précédent : seuls les noms des nouveaux matches sont uniformisés, et seuls les
+    matches modifiés sont fusionnés et réévalués par les stratégies (fonctions des cotes d'un
+    match retournant None ou un tuple dont le premier élément est le gain, cf. rank_strategy).
+    Après chaque parsing qui modifie des cotes, sportsbetting.ODDS[sport] est mis à jour si
+    publish, et les cotes modifiées sont ajoutées à sportsbetting.HISTORY s'il est défini
+    """
+
+    def __init__(self, competitions, sport="football", sites=None, intervals=None,
+                 strategies=None, parse_function=fetch_competition, publish=True):
+        self.sport = sport
+        self.sites = [site for site in sportsbetting.SITES if not sites or site in sites]
+        self.pairs = [(site, competition) for site in self.sites for competition in competitions]
+        intervals = intervals or {}
+        self.intervals = {site: intervals.get(site, POLL_INTERVAL.get(site, DEFAULT_POLL_INTERVAL))
+                          for site in self.sites}
+        self.strategies = strategies or {}
+        self.parse_function = parse_function
+        self.publish = publish
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.next_poll = {pair: 0 for pair in self.pairs}
+        # Par couple (site, compétition) : cotes avec les noms du site, noms uniformisés (un
+        # match dont une équipe est inconnue n'y figure pas, et son nom est recherché à nouveau
+        # à sa prochaine modification) et cotes avec les noms uniformisés
+        self.raw_odds = {pair: {} for pair in self.pairs}
+        self.names = {pair: {} for pair in self.pairs}
+        self.pair_odds = {pair: {} for pair in self.pairs}
+        self.odds = {}
+        # Résultat de chaque stratégie par match : {stratégie: {match: résultat}}
+        self.evaluations = {name: {} for name in self.strategies}
+
+    def parse_pair(self, pair):
+        """
+        Parse une compétition d'un site, None en cas d'erreur (les autres compétitions sont
+        tout de même mises à jour, et celle-ci est parsée à nouveau à son prochain tour)
+        """
+        site, competition = pair
+        try:
+            return self.parse_function(competition, self.sport, site)
+        except PARSING_ERRORS as error:
+            print("{} non accessible sur {} ({})".format(competition, site, type(error).__name__))
+        except Exception:
+            print(traceback.format_exc(), file=sys.stderr)
+        return None
+
+    def update_pair(self, pair, new_raw_odds):
+        """
+        Prend en compte un nouveau parsing d'une compétition d'un site et retourne les matches
+        (noms uniformisés) dont les cotes de ce site ont changé
+        """
+        site, competition = pair
+        changed, removed = diff_odds(self.raw_odds[pair], new_raw_odds)
+        self.raw_odds[pair] = new_raw_odds
+        names = self.names[pair]
+        new_matches = {match: odds_match for match, odds_match in changed.items()
+                       if match not in names}
+        if new_matches:
+            new_names = adapt_match_names(new_matches, site, self.sport, competition)
+            names.update({match: name for match, name in new_names.items()
+                          if match in new_matches and name})
+        pair_odds = self.pair_odds[pair]
+        affected = set()
+        for match in removed:
+            if names.get(match) in pair_odds:
+                del pair_odds[names[match]]
+                affected.add(names[match])
+        valid = valid_odds({names[match]: odds_match for match, odds_match in changed.items()
+                            if names.get(match)}, self.sport)
+        pair_odds.update(valid)
+        return affected.union(valid)
+
+    def merge(self, matches):
+        """
+        Fusionne les cotes des sites pour les matches donnés, et met à jour les évaluations des
+        stratégies pour ces matches
+        """
+        merged = merge_dict_odds([{match: self.pair_odds[pair][match] for match in matches
+                                   if match in self.pair_odds[pair]} for pair in self.pairs])
+        for match in matches:
+            if match in merged:
+                self.odds[match] = merged[match]
+            else:
+                self.odds.pop(match, None)
+            for name, strategy in self.strategies.items():
+                result = strategy(self.odds[match]) if match in self.odds else None
+                if result is None:
+                    self.evaluations[name].pop(match, None)
+                else:
+                    self.evaluations[name][match] = result
+
+    def poll(self, now=None):
+        """
+        Parse les compétitions dont le tour est venu et met à jour les cotes. Retourne les
+        matches modifiés
+        """
+        now = time.monotonic() if now is None else now
+        due = [pair for pair in self.pairs if self.next_poll[pair] <= now]
+        if not due:
+            return set()
+        with concurrent.futures.ThreadPoolExecutor(min(len(due), PARSING_WORKERS)) as executor:
+            results = list(executor.map(self.parse_pair, due))
+        affected = set()
+        with self.lock:
+            for pair, new_raw_odds in zip(due, results):
+                self.next_poll[pair] = now + self.intervals[pair[0]]
+                if new_raw_odds is not None:
+                    affected |= self.update_pair(pair, new_raw_odds)
+            if not affected:
+                return affected
+            self.merge(affected)
+            if self.publish:
+                sportsbetting.ODDS[self.sport] = OddsStore.from_dict(self.odds)
+            if sportsbetting.HISTORY is not None:
+                sportsbetting.HISTORY.record(self.sport, {match: self.odds[match]
+                                                          for match in affected
+                                                          if match in self.odds})
+        return affected
+
+    def best(self, name):
+        """
+        Meilleur match pour une stratégie : (match, résultat de la stratégie), None si aucun
+        match ne convient
+        """
+        with self.lock:
+            evaluations = self.evaluations[name]
+            if not evaluations:
+                return None
+            match = max(evaluations, key=lambda match: evaluations[match][0])
+            return match, evaluations[match]
+
+    def run(self):
+        """
+        Boucle de parsing, jusqu'à l'appel de stop
+        """
+        while not self.stop_event.is_set():
+            self.poll()
+            self.stop_event.wait(max(0, min(self.next_poll.values()) - time.monotonic()))
+
+    def start(self):
+        """
+        Lance la boucle de parsing en arrière-plan
+        """
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        """
+        Arrête la boucle de parsing après le parsing en cours
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests du suivi en continu des cotes
+"""
+
+import sportsbetting
+from sportsbetting import live_functions
+from sportsbetting.live_functions import OddsWatcher
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_odds_watcher(monkeypatch):
+    """
+    :return: Chaque site est parsé à son rythme, et seuls les matches modifiés sont renommés,
+    fusionnés et réévalués. Un match dont le nom n'a pas été trouvé est renommé à nouveau à sa
+    modification suivante
+    """
+    odds = random_odds(30, 3)
+    pages = {site: {match: {"date": odds_match["date"],
+                            "odds": {site: odds_match["odds"][site]}}
+                    for match, odds_match in odds.items() if site in odds_match["odds"]}
+             for site in ["betclic", "unibet"]}
+    renamed = []
+    evaluated = []
+    unknown = set()
+    monkeypatch.setattr(live_functions, "adapt_match_names",
+                        lambda odds, *args: renamed.extend(odds) or {
+                            match: None if match in unknown else match.lower() for match in odds})
+    monkeypatch.setitem(sportsbetting.ODDS, "football", {})
+
+    def strategy(odds_match):
+        evaluated.append(odds_match)
+        return (max(odds_match["odds"]["betclic"]),) if "betclic" in odds_match["odds"] else None
+
+    watcher = OddsWatcher(["Ligue 1"], "football", ["unibet", "betclic"], {"betclic": 10},
+                          {"max": strategy}, lambda competition, sport, site: pages[site])
+    matches = {match.lower() for page in pages.values() for match in page}
+    assert watcher.poll(0) == matches and len(renamed) == sum(map(len, pages.values()))
+    assert set(sportsbetting.ODDS["football"]) == matches
+    assert len(evaluated) == len(matches)
+    match = next(iter(pages["betclic"]))
+    pages["betclic"] = dict(pages["betclic"])
+    pages["betclic"][match] = {"date": pages["betclic"][match]["date"],
+                               "odds": {"betclic": [100, 1.01, 1.01]}}
+    del pages["betclic"][next(other for other in pages["betclic"] if other != match)]
+    renamed.clear()
+    evaluated.clear()
+    assert watcher.poll(5) == set()
+    assert len(watcher.poll(10)) == 2 and not renamed and len(evaluated) == 2
+    assert watcher.best("max") == (match.lower(), (100,))
+    assert sportsbetting.ODDS["football"][match.lower()]["odds"]["betclic"] == [100, 1.01, 1.01]
+    assert len(sportsbetting.ODDS["football"]) <= len(matches)
+    new_match = "X - Y"
+    unknown.add(new_match)
+    renamed.clear()
+    pages["unibet"] = dict(pages["unibet"], **{new_match: {"date": None,
+                                                           "odds": {"unibet": [2, 3, 4]}}})
+    assert watcher.poll(40) == set() and renamed == [new_match]
+    unknown.clear()
+    pages["unibet"] = dict(pages["unibet"], **{new_match: {"date": None,
+                                                           "odds": {"unibet": [2, 3, 5]}}})
+    assert watcher.poll(80) == {"x - y"} and renamed == [new_match, new_match]
+
+
+def test_odds_watcher_parsing_error(monkeypatch, capsys):
+    """
+    :return: Une erreur inattendue du parsing d'un site n'empêche pas la mise à jour des autres
+    sites, et ce site est parsé à nouveau à son prochain tour
+    """
+    odds = random_odds(10, 3)
+    page = {match: {"date": odds_match["date"], "odds": {"unibet": odds_match["odds"]["unibet"]}}
+            for match, odds_match in odds.items() if "unibet" in odds_match["odds"]}
+    monkeypatch.setattr(live_functions, "adapt_match_names",
+                        lambda odds, *args: {match: match for match in odds})
+    calls = []
+
+    def parse_function(competition, sport, site):
+        calls.append(site)
+        if site == "betclic":
+            raise KeyError("odds")
+        return page
+
+    watcher = OddsWatcher(["Ligue 1"], "football", ["unibet", "betclic"], {"betclic": 10},
+                          parse_function=parse_function, publish=False)
+    assert watcher.poll(0) == set(page)
+    assert "KeyError" in capsys.readouterr().err
+    assert watcher.next_poll[("betclic", "Ligue 1")] == 10
+    watcher.poll(10)
+    assert calls.count("betclic") == 2
@@ -0,0 +1,150 @@
+"""
+Index en mémoire des noms d'équipes/joueurs d'un sport pour la recherche de noms proches
+"""
+
+import re
+from collections import defaultdict
+
+import unidecode
+
+
+def normalize(name):
+    """
+    Forme normalisée d'un nom : minuscules et sans accents
+    """
+    return unidecode.unidecode(name.lower())
+
+
+def split_acronyms(name):
+    """
+    Retourne le nom normalisé sans ses sigles (None s'il ne reste rien) et l'ensemble des mots
+    normalisés du nom. Par exemple, "Paris SG" donne "paris" et {"paris", "sg"}
+    """
+    split_name = re.split(r'[ .\-,]', name.split("(")[0].strip())
+    reduced = " ".join([string for string in split_name if (len(string) > 2
+                                                              or string != string.upper())])
+    return (normalize(reduced) if reduced else None), set(map(normalize, split_name))
+
+
+def trigrams(string):
+    """
+    Ensemble des sous-chaînes de 3 caractères d'une chaîne
+    """
+    return {string[i:i + 3] for i in range(len(string) - 2)}
+
+
+class NameIndex:
+    """
+    Index des noms d'un sport : formes normalisées, formes sans sigles, mots et initiales sont
+    calculés une seule fois par ligne de la table names, et les candidats d'une recherche sont
+    obtenus par des listes d'occurrences de trigrammes, de mots et d'initiales. Les lignes sont
+    identifiées par leur rowid, ce qui permet de conserver l'ordre de la table
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.postings = {"full": defaultdict(set), "reduced": defaultdict(set),
+                         "tokens": defaultdict(set), "initials": defaultdict(set)}
+        self.short = {"full": set(), "reduced": set()}
+
+    def add(self, rowid, _id, name, names_site):
+        """
+        Ajoute ou remplace une ligne, names_site étant le dictionnaire {site: nom sur le site}
+        """
+        if rowid in self.rows:
+            self.remove(rowid)
+        full = normalize(name)
+        reduced, tokens = split_acronyms(name)
+        self.rows[rowid] = {"id": _id, "name": name, "names_site": names_site, "full": full,
+                            "reduced": reduced, "tokens": tokens}
+        self.index_string(rowid, "full", full)
+        if reduced is not None:
+            self.index_string(rowid, "reduced", reduced)
+            for token in tokens:
+                self.postings["tokens"][token].add(rowid)
+        if name:
+            self.postings["initials"][name[0]].add(rowid)
+
+    def index_string(self, rowid, key, string):
+        """
+        Ajoute une chaîne aux occurrences de trigrammes, ou aux chaînes courtes
+        """
+        if len(string) < 3:
+            self.short[key].add(rowid)
+        for trigram in trigrams(string):
+            self.postings[key][trigram].add(rowid)
+
+    def remove(self, rowid):
+        """
+        Retire une ligne de l'index
+        """
+        row = self.rows.pop(rowid)
+        for key in ["full", "reduced"]:
+            self.short[key].discard(rowid)
+            if row[key] is not None:
+                for trigram in trigrams(row[key]):
+                    self.postings[key][trigram].discard(rowid)
+        for token in row["tokens"]:
+            self.postings["tokens"][token].discard(rowid)
+        if row["name"]:
+            self.postings["initials"][row["name"][0]].discard(rowid)
+
+    def lines(self, rowids, site, only_null):
+        """
+        Retourne les couples (id, nom) des lignes dans l'ordre de la table, restreints aux noms non
+        encore associés au site si only_null vaut True
+        """
+        return [(self.rows[rowid]["id"], self.rows[rowid]["name"]) for rowid in sorted(rowids)
+                if not only_null or self.rows[rowid]["names_site"].get(site) is None]
+
+    def substring_candidates(self, key, string):
+        """
+        Lignes dont la chaîne key peut contenir string ou être contenue dans string
+        """
+        string_trigrams = trigrams(string)
+        if not string_trigrams:
+            return [rowid for rowid, row in self.rows.items() if row[key] is not None]
+        candidates = set(self.short[key])
+        for trigram in string_trigrams:
+            candidates.update(self.postings[key].get(trigram, ()))
+        return candidates
+
+    def close(self, name, site, only_null=True):
+        """
+        Lignes dont le nom normalisé contient ou est contenu dans le nom normalisé name
+        """
+        full = normalize(name)
+        return self.lines([rowid for rowid in self.substring_candidates("full", full)
+                           if full in self.rows[rowid]["full"]
+                           or self.rows[rowid]["full"] in full], site, only_null)
+
+    def close_without_acronyms(self, name, site, only_null=True):
+        """
+        Lignes proches de name en ignorant les sigles, ou dont tous les mots sont dans name
+        """
+        reduced, tokens = split_acronyms(name)
+        if reduced is None:
+            return []
+        results = [rowid for rowid in self.substring_candidates("reduced", reduced)
+                   if reduced in self.rows[rowid]["reduced"]
+                   or self.rows[rowid]["reduced"] in reduced]
+        counts = defaultdict(int)
+        for token in tokens:
+            for rowid in self.postings["tokens"].get(token, ()):
+                counts[rowid] += 1
+        results += [rowid for rowid, count in counts.items()
+                    if count == len(self.rows[rowid]["tokens"])]
+        return self.lines(set(results), site, only_null)
+
+    def initial_and_last_name(self, init_first_name, last_name, site, only_null=True):
+        """
+        Lignes dont le nom est de la forme "Prénom Nom" avec un prénom commençant par
+        init_first_name
+        """
+        reg_exp = r'{}[a-z]+\s{}'.format(init_first_name, last_name)
+        if len(init_first_name) == 1 and init_first_name.isalnum():
+            candidates = self.postings["initials"].get(init_first_name, ())
+        else:
+            candidates = self.rows
+        return self.lines([rowid for rowid in candidates
+                           if re.match(reg_exp, self.rows[rowid]["name"])], site, only_null)
@@ -0,0 +1,260 @@
+"""
+Stockage compact (numpy) des cotes d'un sport et vues filtrées sur ces cotes
+"""
+
+import collections.abc
+import datetime
+import sys
+
+import numpy as np
+
+import sportsbetting
+
+
+class OddsStore(collections.abc.Mapping):
+    """
+    Stockage en colonnes des cotes d'un sport. Les noms de matches sont indexés, les dates sont
+    stockées dans un tableau datetime64 et les cotes dans un tableau float32
+    (matches × sites × issues) accompagné du nombre de cotes disponibles par match et par site
+    (0 si le site ne propose pas le match).
+    L'objet se lit comme le dictionnaire sportsbetting.ODDS[sport] : store[match] renvoie
+    {"date": ..., "odds": {site: [cotes]}}, construit à la lecture. Les filtres renvoient des vues
+    qui partagent les tableaux sans les copier
+    """
+
+    def __init__(self, matches, dates, odds, nb_odds, sites, rows=None):
+        self.matches = matches
+        self.dates = dates
+        self.odds = odds
+        self.nb_odds = nb_odds
+        self.sites = sites
+        self.rows = np.arange(len(matches)) if rows is None else rows
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, dict_odds):
+        """
+        Construit le stockage à partir d'un dictionnaire au format de sportsbetting.ODDS[sport]
+        """
+        if isinstance(dict_odds, OddsStore):
+            return dict_odds
+        matches = [sys.intern(match) for match in dict_odds]
+        sites = []
+        index_sites = {}
+        nb_outcomes = 0
+        for match in dict_odds.values():
+            for site, odds in match["odds"].items():
+                if site not in index_sites:
+                    index_sites[site] = len(sites)
+                    sites.append(site)
+                nb_outcomes = max(nb_outcomes, len(odds))
+        for site in sportsbetting.SITES:
+            if site not in index_sites:
+                index_sites[site] = len(sites)
+                sites.append(site)
+        odds_array = np.full((len(matches), len(sites), nb_outcomes), np.nan, dtype=np.float32)
+        nb_odds = np.zeros((len(matches), len(sites)), dtype=np.uint8)
+        dates = []
+        for i, match in enumerate(dict_odds.values()):
+            for site, odds in match["odds"].items():
+                odds_array[i, index_sites[site], :len(odds)] = odds
+                nb_odds[i, index_sites[site]] = len(odds)
+            dates.append(match["date"] if isinstance(match["date"], datetime.datetime) else None)
+        return cls(matches, np.array(dates, dtype="datetime64[us]"), odds_array, nb_odds, sites)
+
+    @property
+    def index(self):
+        """
+        Dictionnaire nom du match -> ligne dans les tableaux
+        """
+        if self._index is None:
+            self._index = {self.matches[row]: row for row in self.rows}
+        return self._index
+
+    def __getitem__(self, match):
+        return self.record(self.index[match])
+
+    def __iter__(self):
+        return (self.matches[row] for row in self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, match):
+        return match in self.index
+
+    def __delitem__(self, match):
+        row = self.index.pop(match)
+        self.rows = self.rows[self.rows != row]
+
+    def __getstate__(self):
+        rows = self.rows
+        return {"matches": [self.matches[row] for row in rows], "dates": self.dates[rows],
+                "odds": self.odds[rows], "nb_odds": self.nb_odds[rows], "sites": self.sites}
+
+    def __setstate__(self, state):
+        self.__init__(state["matches"], state["dates"], state["odds"], state["nb_odds"],
+                      state["sites"])
+
+    def record(self, row):
+        """
+        Retourne les cotes d'une ligne au format {"date": ..., "odds": {site: [cotes]}}
+        """
+        date = self.dates[row]
+        odds = {}
+        for j in np.flatnonzero(self.nb_odds[row]):
+            odds[self.sites[j]] = [round(float(odd), 4)
+                                   for odd in self.odds[row, j, :self.nb_odds[row, j]]]
+        return {"date": None if np.isnat(date) else date.item(), "odds": odds}
+
+    def select(self, mask):
+        """
+        Retourne une vue restreinte aux lignes sélectionnées (masque booléen sur les lignes de la
+        vue courante), sans copie des tableaux
+        """
+        return OddsStore(self.matches, self.dates, self.odds, self.nb_odds, self.sites,
+                         self.rows[mask])
+
+    def values_array(self):
+        """
+        Cotes des lignes de la vue en float64, arrondies comme celles renvoyées par record
+        """
+        return np.round(self.odds[self.rows].astype(float), 4)
+
+    def dates_mask(self, datetime_min=None, datetime_max=None):
+        """
+        Masque des matches dont la date est comprise entre datetime_min et datetime_max
+        """
+        dates = self.dates[self.rows]
+        mask = np.ones(len(self.rows), dtype=bool)
+        if datetime_min:
+            mask &= dates >= np.datetime64(datetime_min, "us")
+        if datetime_max:
+            mask &= dates <= np.datetime64(datetime_max, "us")
+        return mask
+
+    def available_mask(self, site):
+        """
+        Masque des matches disponibles sur site
+        """
+        if site not in self.sites:
+            return np.zeros(len(self.rows), dtype=bool)
+        return self.nb_odds[self.rows, self.sites.index(site)] > 0
+
+    def minimum_odd_mask(self, minimum_odd, site):
+        """
+        Masque des matches disponibles sur site dont toutes les cotes sur ce site sont supérieures
+        à minimum_odd
+        """
+        if site not in self.sites:
+            return np.zeros(len(self.rows), dtype=bool)
+        j = self.sites.index(site)
+        nb_odds = self.nb_odds[self.rows, j]
+        odds = self.values_array()[:, j]
+        ranks = np.arange(odds.shape[1])
+        above = (odds >= minimum_odd) | (ranks >= nb_odds[:, np.newaxis])
+        return (nb_odds > 0) & above.all(axis=1)
+
+    def matrix(self, n):
+        """
+        Retourne les noms des matches, les sites et le tableau des cotes (matches × sites × n) de
+        la vue, au format de vectorized_functions.odds_matrix
+        """
+        matrix = np.full((len(self.rows), len(self.sites), n), np.nan)
+        nb_outcomes = min(n, self.odds.shape[2])
+        matrix[:, :, :nb_outcomes] = self.values_array()[:, :, :nb_outcomes]
+        matrix[self.nb_odds[self.rows] < n] = np.nan
+        return list(self), list(self.sites), matrix
+
+
+def check_dates(match, datetime_min=None, datetime_max=None):
+    """
+    Vérifie que la date du match est comprise entre datetime_min et datetime_max
+    """
+    return ((not datetime_min) or datetime_min <= match["date"]) and ((not datetime_max)
+                                                                     or datetime_max >= match["date"])
+
+
+def check_minimum_odd(match, minimum_odd, site):
+    """
+    Vérifie que le match est disponible sur site avec des cotes toutes supérieures à minimum_odd
+    """
+    return site in match["odds"] and all(odd >= minimum_odd for odd in match["odds"][site])
+
+
+def check_available(match, site):
+    """
+    Vérifie que le match est disponible sur site
+    """
+    return site in match["odds"]
+
+
+CHECKS = {"dates": check_dates, "minimum_odd": check_minimum_odd, "available": check_available}
+
+
+class OddsView(collections.abc.Mapping):
+    """
+    Vue filtrée, évaluée à la première lecture, d'un dictionnaire de cotes ou d'un OddsStore. Les
+    filtres se chaînent (view.dates(...).minimum_odd(...)) sans copie : la vue partage les
+    cotes des matches avec les cotes d'origine, qui ne doivent donc pas être modifiées
+    """
+
+    def __init__(self, odds, filters=()):
+        if isinstance(odds, OddsView):
+            odds, filters = odds.odds, odds.filters + tuple(filters)
+        self.odds = odds
+        self.filters = tuple(filters)
+        self._evaluated = None
+
+    def filter(self, name, *args):
+        """
+        Retourne une nouvelle vue à laquelle est ajouté le filtre name (clé de CHECKS)
+        """
+        return OddsView(self.odds, self.filters + ((name, args),))
+
+    def dates(self, datetime_min=None, datetime_max=None):
+        """
+        Restreint la vue aux matches compris entre datetime_min et datetime_max
+        """
+        return self.filter("dates", datetime_min, datetime_max)
+
+    def minimum_odd(self, minimum_odd, site):
+        """
+        Restreint la vue aux matches dont toutes les cotes sur site sont supérieures à minimum_odd
+        """
+        return self.filter("minimum_odd", minimum_odd, site)
+
+    def available(self, site):
+        """
+        Restreint la vue aux matches disponibles sur site
+        """
+        return self.filter("available", site)
+
+    def evaluate(self):
+        """
+        Applique les filtres et retourne le résultat (OddsStore ou dictionnaire), calculé une
+        seule fois
+        """
+        if self._evaluated is None:
+            if isinstance(self.odds, OddsStore):
+                mask = np.ones(len(self.odds), dtype=bool)
+                for name, args in self.filters:
+                    mask &= getattr(self.odds, name + "_mask")(*args)
+                self._evaluated = self.odds.select(mask)
+            else:
+                self._evaluated = {name_match: match for name_match, match in self.odds.items()
+                                   if all(CHECKS[name](match, *args)
+                                          for name, args in self.filters)}
+        return self._evaluated
+
+    def __getitem__(self, match):
+        return self.evaluate()[match]
+
+    def __iter__(self):
+        return iter(self.evaluate())
+
+    def __len__(self):
+        return len(self.evaluate())
+
+    def __contains__(self, match):
+        return match in self.evaluate()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests du stockage compact des cotes
+"""
+
+import datetime
+import pickle
+
+from sportsbetting.auxiliary_functions import filter_dict_dates, filter_dict_minimum_odd
+from sportsbetting.odds_store import OddsStore, OddsView
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_odds_store():
+    """
+    :return: Le stockage se lit comme le dictionnaire d'origine, y compris filtré ou sérialisé
+    """
+    all_odds = random_odds(50, 3)
+    all_odds["A0 - B0"]["date"] = datetime.datetime(2029, 6, 1, 20)
+    odds_store = OddsStore.from_dict(all_odds)
+    assert dict(odds_store) == all_odds
+    assert dict(pickle.loads(pickle.dumps(odds_store))) == all_odds
+    assert (dict(filter_dict_dates(odds_store, "01/06/2029", "19h", "01/06/2029", "21h"))
+            == filter_dict_dates(all_odds, "01/06/2029", "19h", "01/06/2029", "21h"))
+    assert (dict(filter_dict_minimum_odd(odds_store, 1.7, "betclic"))
+            == filter_dict_minimum_odd(all_odds, 1.7, "betclic"))
+    del odds_store["A0 - B0"]
+    assert "A0 - B0" not in odds_store and len(odds_store) == 49
+
+
+def test_odds_view():
+    """
+    :return: Les filtres chaînés donnent le même résultat sur un dictionnaire et un OddsStore,
+    sans copier les cotes du dictionnaire
+    """
+    all_odds = random_odds(50, 3)
+    all_odds["A0 - B0"]["date"] = datetime.datetime(2029, 6, 1, 20)
+    for odds in [all_odds, OddsStore.from_dict(all_odds)]:
+        view = OddsView(odds).dates(datetime.datetime(2029, 1, 1)).minimum_odd(1.3, "zebet")
+        expected = {match: all_odds[match] for match in all_odds
+                    if "zebet" in all_odds[match]["odds"]
+                    and min(all_odds[match]["odds"]["zebet"]) >= 1.3}
+        assert dict(view.available("zebet")) == expected
+    view = OddsView(all_odds).available("zebet")
+    assert all(view[match] is all_odds[match] for match in view)
@@ -8,25 +8,29 @@ import locale
 import re
 import sys
 import time
-import http.client
 import urllib
 import urllib.error
-import urllib.request
-import fake_useragent
+import urllib.parse
+from multiprocessing.pool import ThreadPool
 
 import selenium
 import selenium.common
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
-from bs4 import BeautifulSoup
+import lxml.etree
 
 import sportsbetting
 from sportsbetting import selenium_init
+from sportsbetting.api_functions import parse_api, start_capture
+from sportsbetting.html_functions import (class_predicate, descendant_selector, find_parent,
+                                          has_class, parse_html, selector, strings, text)
+from sportsbetting.http_functions import fetch
 from sportsbetting.auxiliary_functions import (merge_dicts, reverse_match_odds,
                                                scroll, format_bwin_names,
                                                format_bwin_time,
                                                format_joa_time,
+                                               format_unibet_names,
                                                format_zebet_names)
 
 
@@ -37,14 +41,9 @@ else:  # sys.platform == "linux"
 
 
 def parse_betclic(url):
+    start_capture(selenium_init.DRIVER["betclic"])
     selenium_init.DRIVER["betclic"].get(url)
     is_sport_page = len([x for x in url.split("/") if x]) == 3
-    match_odds_hash = {}
-    match = None
-    date_time = None
-    today = datetime.datetime.today().strftime("%d/%m/%Y")
-    tomorrow = (datetime.datetime.today() +
-                datetime.timedelta(days=1)).strftime("%d/%m/%Y")
     if (selenium_init.DRIVER["betclic"].current_url
             == "https://www.betclic.fr/"):
         raise sportsbetting.UnavailableCompetitionException
@@ -56,36 +55,61 @@ def parse_betclic(url):
         raise sportsbetting.AbortException
     if is_sport_page:
         scroll(selenium_init.DRIVER["betclic"], "betclic", "betBox_match", 10)
+    match_odds_hash = parse_api("betclic", selenium_init.DRIVER["betclic"], url)
+    if match_odds_hash:
+        return match_odds_hash
     for _ in range(10):
         inner_html = selenium_init.DRIVER["betclic"].execute_script(
             "return document.body.innerHTML")
-        soup = BeautifulSoup(inner_html, features="lxml")
-        if "Désolé, cette compétition n'est plus disponible." in str(soup):
-            raise sportsbetting.UnavailableCompetitionException
-        for line in soup.findAll():
-            if "class" in line.attrs and "betBox_matchName" in line["class"]:
-                match = " - ".join(list(line.stripped_strings))
-            if line.name == "app-date":
-                string = " ".join(line.text.replace(
-                    "Aujourd'hui", today).replace("Demain", tomorrow).split())
-                date_time = datetime.datetime.strptime(
-                    string, "%d/%m/%Y %H:%M")
-            if "class" in line.attrs and "betBox_odds" in line["class"]:
-                try:
-                    odds = list(map(lambda x: float(x.text.replace(",", ".")),
-                                    list(line.findChildren("span", {"class": "oddValue"}))))
-                    if match:
-                        match_odds_hash[match] = {}
-                        match_odds_hash[match]['odds'] = {"betclic": odds}
-                        match_odds_hash[match]['date'] = date_time
-                        match = None
-                except ValueError:
-                    pass
+        match_odds_hash = parse_betclic_html(inner_html)
         if match_odds_hash:
             return match_odds_hash
     return match_odds_hash
 
 
+BETCLIC_SELECTOR = selector(classes=["betBox_matchName", "betBox_odds"], tags=["app-date"])
+BETCLIC_ODDS_SELECTOR = descendant_selector("span", "oddValue")
+
+
+def parse_betclic_html(inner_html):
+    """
+    Retourne les cotes d'une page betclic
+    """
+    if "Désolé, cette compétition n'est plus disponible." in inner_html:
+        raise sportsbetting.UnavailableCompetitionException
+    match_odds_hash = {}
+    match = None
+    date_time = None
+    today = datetime.datetime.today().strftime("%d/%m/%Y")
+    tomorrow = (datetime.datetime.today() +
+                datetime.timedelta(days=1)).strftime("%d/%m/%Y")
+    for line in BETCLIC_SELECTOR(parse_html(inner_html)):
+        if has_class(line, "betBox_matchName"):
+            match = " - ".join(strings(line))
+        if line.tag == "app-date":
+            string = " ".join(text(line).replace(
+                "Aujourd'hui", today).replace("Demain", tomorrow).split())
+            date_time = datetime.datetime.strptime(
+                string, "%d/%m/%Y %H:%M")
+        if has_class(line, "betBox_odds"):
+            try:
+                odds = list(map(lambda x: float(text(x).replace(",", ".")),
+                                BETCLIC_ODDS_SELECTOR(line)))
+                if match:
+                    match_odds_hash[match] = {}
+                    match_odds_hash[match]['odds'] = {"betclic": odds}
+                    match_odds_hash[match]['date'] = date_time
+                    match = None
+            except ValueError:
+                pass
+    return match_odds_hash
+
+
+BETSTARS_SELECTOR = selector(classes=["afEvt__link", "market-AB", "market-BASKETBALL-FTOT-ML",
+                                       "match-time", "prices"],
+                              conditions=["contains(@id, 'participants')"])
+
+
 def parse_betstars(url=""):
     """
     Retourne les cotes disponibles sur betstars
@@ -112,36 +136,35 @@ def parse_betstars(url=""):
             raise sportsbetting.AbortException
         inner_html = (selenium_init.DRIVER["betstars"]
                       .execute_script("return document.body.innerHTML"))
-        soup = BeautifulSoup(inner_html, features="lxml")
-        for line in soup.findAll():
-            if "id" in line.attrs and "participants" in line["id"] and not is_12:
+        for line in BETSTARS_SELECTOR(parse_html(inner_html)):
+            if "participants" in line.get("id", "") and not is_12:
                 match = " - ".join(list(map(lambda x: x.replace(" - ", "-"),
-                                            line.stripped_strings)))
-            if "class" in line.attrs and "afEvt__link" in line["class"]:
+                                            strings(line))))
+            if has_class(line, "afEvt__link"):
                 is_12 = True
-                match = list(line.stripped_strings)[0]
+                match = strings(line)[0]
                 if "@" in match:
                     teams = match.split(" @ ")
                     match = teams[1] + " - " + teams[0]
                 odds = []
-            if "class" in line.attrs and ("market-AB" in line["class"]
-                                          #                                           or "market-BAML" in line["class"]
-                                          or "market-BASKETBALL-FTOT-ML" in line["class"]):
+            if (has_class(line, "market-AB")
+                    # or has_class(line, "market-BAML")
+                    or has_class(line, "market-BASKETBALL-FTOT-ML")):
                 try:
                     odds.append(
-                        float(list(line.stripped_strings)[0].replace(",", ".")))
+                        float(strings(line)[0].replace(",", ".")))
                 except ValueError:  # cote non disponible (OTB, Non publiée)
                     odds.append(1)
-            if "class" in line.attrs and "match-time" in line["class"]:
-                strings = list(line.stripped_strings)
-                date = strings[0] + " " + year
-                hour = strings[1]
+            if has_class(line, "match-time"):
+                line_strings = strings(line)
+                date = line_strings[0] + " " + year
+                hour = line_strings[1]
                 try:
                     date_time = datetime.datetime.strptime(
                         date + " " + hour, "%d %b, %Y %H:%M")
                 except ValueError:
                     date = datetime.datetime.today().strftime("%d %b %Y")
-                    hour = strings[0]
+                    hour = line_strings[0]
                     date_time = datetime.datetime.strptime(
                         date + " " + hour, "%d %b %Y %H:%M")
                 if date_time < today:
@@ -152,10 +175,10 @@ def parse_betstars(url=""):
                     match_odds_hash[match]['odds'] = {"betstars": odds}
                     match_odds_hash[match]['date'] = date_time
                     odds = []
-            if "class" in line.attrs and "prices" in line["class"]:
+            if has_class(line, "prices"):
                 try:
                     odds = list(map(lambda x: float(x.replace(",", ".")),
-                                    list(line.stripped_strings)))
+                                    strings(line)))
                 except ValueError:
                     odds = []
         if match_odds_hash:
@@ -172,6 +195,9 @@ def parse_betstars(url=""):
     return match_odds_hash
 
 
+BETSTARS_COMPETITIONS_SELECTOR = lxml.etree.XPath("//a[@href and @data-leagueid]")
+
+
 def parse_sport_betstars(sport):
     """
     Retourne les cotes disponibles sur betstars pour un sport donné
@@ -192,14 +218,12 @@ def parse_sport_betstars(sport):
             "Nous devons procéder à la correction ou à la mise à jour d’un élément"
             in inner_html):
         raise sportsbetting.UnavailableSiteException
-    soup = BeautifulSoup(inner_html, features="lxml")
-    for line in soup.findAll(["a"]):
-        if ("href" in line.attrs and sport + "/competitions/" in line["href"]
-                and "data-leagueid" in line.attrs):
-            url = "https://www.pokerstarssports.fr/" + line["href"]
+    for line in BETSTARS_COMPETITIONS_SELECTOR(parse_html(inner_html)):
+        if sport + "/competitions/" in line.get("href"):
+            url = "https://www.pokerstarssports.fr/" + line.get("href")
             if url not in urls:
                 urls.append(url)
-                competitions.append(line.text.strip())
+                competitions.append(text(line).strip())
     list_odds = []
     for url, competition in zip(urls, competitions):
         print("\t" + competition)
@@ -211,8 +235,14 @@ def parse_sport_betstars(sport):
     return merge_dicts(list_odds)
 
 
+BWIN_SELECTOR = selector(classes=["grid-group", "participants-pair-game", "starting-time",
+                                   "grid-group-container"])
+BWIN_ODDS_SELECTOR = descendant_selector("*", "grid-option-group")
+
+
 def parse_bwin(url):
     selenium_init.DRIVER["bwin"].maximize_window()
+    start_capture(selenium_init.DRIVER["bwin"])
     selenium_init.DRIVER["bwin"].get(url)
     match_odds_hash = {}
     match = None
@@ -229,28 +259,30 @@ def parse_bwin(url):
     if is_sport_page:
         scroll(selenium_init.DRIVER["bwin"], "bwin",
                "grid-event-detail", 3, 'getElementById("main-view")')
+    match_odds_hash = parse_api("bwin", selenium_init.DRIVER["bwin"], url)
+    if match_odds_hash:
+        return match_odds_hash
     for _ in range(10):
         inner_html = selenium_init.DRIVER["bwin"].execute_script(
             "return document.body.innerHTML")
-        soup = BeautifulSoup(inner_html, features="lxml")
-        for line in soup.findAll():
-            if "class" in line.attrs and "grid-group" in line["class"]:
-                strings = list(line.stripped_strings)
-                if "Pari sur le vainqueur" in strings:
-                    index_column_result_odds = strings.index(
+        for line in BWIN_SELECTOR(parse_html(inner_html)):
+            if has_class(line, "grid-group"):
+                line_strings = strings(line)
+                if "Pari sur le vainqueur" in line_strings:
+                    index_column_result_odds = line_strings.index(
                         "Pari sur le vainqueur")
-            if "class" in line.attrs and "participants-pair-game" in line["class"]:
-                match = " - ".join(list(line.stripped_strings))
+            if has_class(line, "participants-pair-game"):
+                match = " - ".join(strings(line))
                 reversed_odds = "@" in match
                 match = format_bwin_names(match)
-            if "class" in line.attrs and "starting-time" in line["class"]:
-                date_time = format_bwin_time(line.text)
-            if "class" in line.attrs and "grid-group-container" in line["class"]:
-                if line.findChildren(attrs={"class": "grid-option-group"}) and "Pariez maintenant !" not in list(line.stripped_strings):
-                    odds_line = line.findChildren(
-                        attrs={"class": "grid-option-group"})[index_column_result_odds]
+            if has_class(line, "starting-time"):
+                date_time = format_bwin_time(text(line))
+            if has_class(line, "grid-group-container"):
+                odds_lines = BWIN_ODDS_SELECTOR(line)
+                if odds_lines and "Pariez maintenant !" not in strings(line):
+                    odds_line = odds_lines[index_column_result_odds]
                     odds = []
-                    for odd in list(odds_line.stripped_strings):
+                    for odd in strings(odds_line):
                         try:
                             odds.append(float(odd))
                         except ValueError:
@@ -268,13 +300,16 @@ def parse_bwin(url):
     return match_odds_hash
 
 
+FRANCE_PARI_SELECTOR = selector(classes=["date", "odd-event-block"])
+
+
 def parse_france_pari(url=""):
     """
     Retourne les cotes disponibles sur france-pari
     """
     if not url:
         url = "https://www.france-pari.fr/competition/96-parier-sur-ligue-1-conforama"
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    root = parse_html(fetch(url).data)
     match_odds_hash = {}
     today = datetime.datetime.today()
     today = datetime.datetime(today.year, today.month, today.day)
@@ -282,21 +317,21 @@ def parse_france_pari(url=""):
     date = ""
     match = ""
     date_time = None
-    for line in soup.find_all():
-        if "class" in line.attrs and "date" in line["class"]:
-            date = line.text + year
-        elif "class" in line.attrs and "odd-event-block" in line["class"]:
-            strings = list(line.stripped_strings)
-            if "snc-odds-date-lib" in line["class"]:
-                hour = strings[0]
+    for line in FRANCE_PARI_SELECTOR(root):
+        if has_class(line, "date"):
+            date = text(line) + year
+        elif has_class(line, "odd-event-block"):
+            line_strings = strings(line)
+            if has_class(line, "snc-odds-date-lib"):
+                hour = line_strings[0]
                 try:
-                    i = strings.index("/")
+                    i = line_strings.index("/")
                     date_time = datetime.datetime.strptime(
                         date + " " + hour, "%A %d %B %Y %H:%M")
                     if date_time < today:
                         date_time = date_time.replace(year=date_time.year + 1)
-                    match = " ".join(strings[1:i]) + \
-                        " - " + " ".join(strings[i + 1:])
+                    match = " ".join(line_strings[1:i]) + \
+                        " - " + " ".join(line_strings[i + 1:])
                     reg_exp = (r'\[[0-7]\/[0-7]\s?([0-7]\/[0-7]\s?)*\]'
                                r'|\[[0-7]\-[0-7]\s?([0-7]\-[0-7]\s?)*\]')
                     if list(re.finditer(reg_exp, match)):  # match tennis live
@@ -305,7 +340,7 @@ def parse_france_pari(url=""):
                     pass
             else:
                 odds = []
-                for i, val in enumerate(strings):
+                for i, val in enumerate(line_strings):
                     if i % 2:
                         odds.append(float(val.replace(",", ".")))
                 try:
@@ -320,21 +355,23 @@ def parse_france_pari(url=""):
     return match_odds_hash
 
 
+JOA_SELECTOR = selector(classes=["bet-event-name", "bet-event-date-info", "bet-outcome-list"])
+
+
 def parse_joa_html(inner_html):
     match_odds_hash = {}
     match = None
     date_time = None
-    soup = BeautifulSoup(inner_html, features="lxml")
-    for line in soup.findAll():
-        if "class" in line.attrs and "bet-event-name" in line["class"]:
+    for line in JOA_SELECTOR(parse_html(inner_html)):
+        if has_class(line, "bet-event-name"):
             match = " - ".join(map(lambda x: x.replace(" - ",
-                                                       "-"), list(line.stripped_strings)))
-        if "class" in line.attrs and "bet-event-date-info" in line["class"]:
-            date_time = format_joa_time(line.text)
-        if "class" in line.attrs and "bet-outcome-list" in line["class"]:
+                                                       "-"), strings(line)))
+        if has_class(line, "bet-event-date-info"):
+            date_time = format_joa_time(text(line))
+        if has_class(line, "bet-outcome-list"):
             if match:
                 try:
-                    odds = list(map(float, list(line.stripped_strings)))
+                    odds = list(map(float, strings(line)))
                     match_odds_hash[match] = {}
                     match_odds_hash[match]['odds'] = {"joa": odds}
                     match_odds_hash[match]['date'] = date_time
@@ -420,6 +457,11 @@ def parse_joa_sport(url):
     return merge_dicts(list_odds)
 
 
+NETBET_NONE_SELECTOR = selector(classes=["none"])
+NETBET_SELECTOR = selector(classes=["nb-link-event", "nb-event_datestart", "nb-event_timestart",
+                                    "nb-event_actors", "nb-event_odds_wrapper"])
+
+
 def parse_netbet(url=""):
     """
     Retourne les cotes disponibles sur netbet
@@ -430,28 +472,14 @@ def parse_netbet(url=""):
         url = "https://www.netbet.fr/top-paris"
     if not url:
         url = "https://www.netbet.fr/football/france/96-ligue-1-conforama"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.97 Safari/537.36"}
-    for _ in range(3):
-        try:
-            request = urllib.request.Request(url, None, headers)
-            response = urllib.request.urlopen(request, timeout=5)
-            soup = BeautifulSoup(response, features="lxml")
-            break
-        except http.client.IncompleteRead:
-            headers = {"User-Agent": fake_useragent.UserAgent().random}
-            print("User agent change")
-        except urllib.error.HTTPError:
-            headers = {"User-Agent": fake_useragent.UserAgent().random}
-            print("User agent change (403)")
-        except urllib.error.URLError:
-            headers = {"User-Agent": fake_useragent.UserAgent().random}
-            print("User agent change (Timeout)")
-    else:
+    try:
+        response = fetch(url, timeout=5)
+    except urllib.error.URLError:
         raise sportsbetting.UnavailableSiteException
-    if soup.find(attrs={"class": "none"}):
+    root = parse_html(response.data)
+    if NETBET_NONE_SELECTOR(root):
         raise sportsbetting.UnavailableCompetitionException
-    if response.geturl() == "https://www.netbet.fr/":
+    if urllib.parse.urljoin(url, response.geturl()) == "https://www.netbet.fr/":
         raise sportsbetting.UnavailableCompetitionException
     match_odds_hash = {}
     today = datetime.datetime.today()
@@ -461,15 +489,15 @@ def parse_netbet(url=""):
     match = ""
     date_time = None
     valid_match = True
-    for line in soup.find_all():
-        if sport and "class" in line.attrs and "nb-link-event" in line["class"] and "href" in line.attrs:
-            valid_match = sport+"/" in line["href"]
-        if "class" in line.attrs and "nb-event_datestart" in line["class"]:
-            date = list(line.stripped_strings)[0] + year
+    for line in NETBET_SELECTOR(root):
+        if sport and has_class(line, "nb-link-event") and line.get("href") is not None:
+            valid_match = sport+"/" in line.get("href")
+        if has_class(line, "nb-event_datestart"):
+            date = strings(line)[0] + year
             if "Auj." in date:
                 date = datetime.datetime.today().strftime("%d/%m %Y")
-        elif "class" in line.attrs and "nb-event_timestart" in line["class"]:
-            hour = line.text
+        elif has_class(line, "nb-event_timestart"):
+            hour = text(line)
             try:
                 date_time = datetime.datetime.strptime(
                     date + " " + hour, "%d/%m %Y %H:%M")
@@ -477,16 +505,16 @@ def parse_netbet(url=""):
                     date_time = date_time.replace(year=date_time.year + 1)
             except ValueError:
                 date_time = "undefined"
-        elif "class" in line.attrs and "nb-event_actors" in line["class"]:
+        elif has_class(line, "nb-event_actors"):
             match = " - ".join(list(map(lambda x: x.replace(" - ",
-                                                            "-"), line.stripped_strings)))
+                                                            "-"), strings(line))))
             reg_exp = r'\[[0-7]\/[0-7]\s?([0-7]\/[0-7]\s?)*\]|\[[0-7]\-[0-7]\s?([0-7]\-[0-7]\s?)*\]'
             if list(re.finditer(reg_exp, match)):  # match tennis live
                 match = match.split("[")[0].strip()
-        elif "class" in line.attrs and "nb-event_odds_wrapper" in line["class"]:
+        elif has_class(line, "nb-event_odds_wrapper"):
             try:
                 odds = list(map(lambda x: float(x.replace(",", ".")),
-                                list(line.stripped_strings)[1::2]))
+                                strings(line)[1::2]))
                 if valid_match and match and match not in match_odds_hash:
                     match_odds_hash[match] = {}
                     match_odds_hash[match]['odds'] = {"netbet": odds}
@@ -498,6 +526,12 @@ def parse_netbet(url=""):
     return match_odds_hash
 
 
+PARIONSSPORT_SELECTOR = selector(
+    classes=["wpsel-titleRubric", "wpsel-timerLabel", "wpsel-desc", "buttonLine"],
+    conditions=["text() = 'Nous vous prions de bien vouloir nous en excuser'"])
+PARIONSSPORT_BASKET_SELECTOR = selector(conditions=["@href"])
+
+
 def parse_parionssport(url=""):
     """
     Retourne les cotes disponibles sur ParionsSport
@@ -506,6 +540,7 @@ def parse_parionssport(url=""):
         url = "https://www.enligne.parionssport.fdj.fr/paris-football/france/ligue-1-conforama"
     is_sport_page = "paris-" in url.split("/")[-1] and "?" not in url
     is_basket = False  # "basket" in url
+    start_capture(selenium_init.DRIVER["parionssport"])
     selenium_init.DRIVER["parionssport"].get(url)
     if "maintenance technique" in selenium_init.DRIVER["parionssport"].execute_script(
             "return document.body.innerHTML"):
@@ -518,6 +553,10 @@ def parse_parionssport(url=""):
     if is_sport_page:
         scroll(selenium_init.DRIVER["parionssport"],
                "parionssport", "wpsel-desc", 5)
+    if not is_basket:
+        match_odds_hash = parse_api("parionssport", selenium_init.DRIVER["parionssport"], url)
+        if match_odds_hash:
+            return match_odds_hash
     match_odds_hash = {}
     urls_basket = []
     today = datetime.datetime.today()
@@ -529,36 +568,35 @@ def parse_parionssport(url=""):
     for _ in range(10):
         inner_html = selenium_init.DRIVER["parionssport"].execute_script(
             "return document.body.innerHTML")
-        soup = BeautifulSoup(inner_html, features="lxml")
-        for line in soup.findAll():
+        root = parse_html(inner_html)
+        for line in (PARIONSSPORT_BASKET_SELECTOR if is_basket else PARIONSSPORT_SELECTOR)(root):
             if is_basket:
-                if ("href" in line.attrs and list(line.stripped_strings)
-                        and "+" in list(line.stripped_strings)[0]):
+                if strings(line) and "+" in strings(line)[0]:
                     urls_basket.append(
-                        "https://www.enligne.parionssport.fdj.fr" + line["href"])
+                        "https://www.enligne.parionssport.fdj.fr" + line.get("href"))
             else:
-                if "Nous vous prions de bien vouloir nous en excuser" in line:
+                if "Nous vous prions de bien vouloir nous en excuser" in line.xpath("text()"):
                     raise sportsbetting.UnavailableCompetitionException
-                if "class" in line.attrs and "wpsel-titleRubric" in line["class"]:
-                    if line.text.strip() == "Aujourd'hui":
+                if has_class(line, "wpsel-titleRubric"):
+                    if text(line).strip() == "Aujourd'hui":
                         date = datetime.date.today().strftime("%A %d %B %Y")
                     else:
-                        date = line.text.strip().lower() + year
-                if "class" in line.attrs and "wpsel-timerLabel" in line["class"]:
+                        date = text(line).strip().lower() + year
+                if has_class(line, "wpsel-timerLabel"):
                     try:
-                        date_time = datetime.datetime.strptime(date + " " + line.text,
+                        date_time = datetime.datetime.strptime(date + " " + text(line),
                                                                "%A %d %B %Y À %Hh%M")
                         if date_time < today:
                             date_time = date_time.replace(
                                 year=date_time.year + 1)
                     except ValueError:
                         date_time = "undefined"
-                if "class" in line.attrs and "wpsel-desc" in line["class"]:
-                    match = line.text.split(" À")[0].strip().replace("  ", " ")
-                if "class" in line.attrs and "buttonLine" in line["class"]:
+                if has_class(line, "wpsel-desc"):
+                    match = text(line).split(" À")[0].strip().replace("  ", " ")
+                if has_class(line, "buttonLine"):
                     try:
                         odds = list(map(lambda x: float(x.replace(",", ".")),
-                                        list(line.stripped_strings)))
+                                        strings(line)))
                         match_odds_hash[match] = {}
                         match_odds_hash[match]['odds'] = {"parionssport": odds}
                         match_odds_hash[match]['date'] = date_time
@@ -576,6 +614,10 @@ def parse_parionssport(url=""):
     return match_odds_hash
 
 
+PARIONSSPORT_MATCH_SELECTOR = selector(classes=["header-banner-event-date-section",
+                                                "headband-eventLabel", "wpsel-market-detail"])
+
+
 def parse_match_nba_parionssport(url):
     """
     Recupere les cotes d'un match de NBA
@@ -590,31 +632,34 @@ def parse_match_nba_parionssport(url):
     for _ in range(10):
         inner_html = selenium_init.DRIVER["parionssport"].execute_script(
             "return document.body.innerHTML")
-        soup = BeautifulSoup(inner_html, features="lxml")
-        for line in soup.findAll():
-            if "class" in line.attrs and "header-banner-event-date-section" in line["class"]:
-                date_time = datetime.datetime.strptime(list(line.stripped_strings)[0] + year,
+        for line in PARIONSSPORT_MATCH_SELECTOR(parse_html(inner_html)):
+            if has_class(line, "header-banner-event-date-section"):
+                date_time = datetime.datetime.strptime(strings(line)[0] + year,
                                                        "Le %d %B à %H:%M %Y")
                 if date_time < today:
                     date_time = date_time.replace(year=date_time.year + 1)
-            elif "class" in line.attrs and "headband-eventLabel" in line["class"]:
-                match = list(line.stripped_strings)[0]
+            elif has_class(line, "headband-eventLabel"):
+                match = strings(line)[0]
                 print("\t" + match)
-            elif "class" in line.attrs and "wpsel-market-detail" in line["class"] and match:
-                strings = list(line.stripped_strings)
+            elif has_class(line, "wpsel-market-detail") and match:
                 odds = list(map(lambda x: float(x.replace(",", ".")),
-                                strings[2::2]))
+                                strings(line)[2::2]))
                 match_odds[match] = {"date": date_time,
                                      "odds": {"parionssport": odds}}
                 return match_odds
     return match_odds
 
 
+PASINOBET_SELECTOR = selector(classes=["category-date", "event-title", "time", "event-list"])
+PASINOBET_TEAMS_SELECTOR = descendant_selector("div", "teams-container")
+
+
 def parse_pasinobet(url):
     """
     Retourne les cotes disponibles sur pasinobet
     """
     selenium_init.DRIVER["pasinobet"].get("about:blank")
+    start_capture(selenium_init.DRIVER["pasinobet"])
     selenium_init.DRIVER["pasinobet"].get(url)
     match_odds_hash = {}
     match = None
@@ -625,29 +670,31 @@ def parse_pasinobet(url):
     )
     if sportsbetting.ABORT:
         raise sportsbetting.AbortException
+    match_odds_hash = parse_api("pasinobet", selenium_init.DRIVER["pasinobet"], url)
+    if match_odds_hash:
+        return match_odds_hash
     inner_html = selenium_init.DRIVER["pasinobet"].execute_script(
         "return document.body.innerHTML")
-    soup = BeautifulSoup(inner_html, features="lxml")
     date = ""
-    for line in soup.findAll():
+    for line in PASINOBET_SELECTOR(parse_html(inner_html)):
         if sportsbetting.ABORT:
             raise sportsbetting.AbortException
-        if "class" in line.attrs and "category-date" in line["class"]:
-            date = line.text.lower()
+        if has_class(line, "category-date"):
+            date = text(line).lower()
             date = date.replace("nov", "novembre")
             date = date.replace("déc", "décembre")
-        if "class" in line.attrs and "event-title" in line["class"]:
-            match = " - ".join(map(lambda x: list(x.stripped_strings)[0],
-                                   line.findChildren("div", {"class": "teams-container"})))
-        if "class" in line.attrs and "time" in line["class"]:
+        if has_class(line, "event-title"):
+            match = " - ".join(map(lambda x: strings(x)[0],
+                                   PASINOBET_TEAMS_SELECTOR(line)))
+        if has_class(line, "time"):
             try:
                 date_time = datetime.datetime.strptime(
-                    date+line.text.strip(), "%A, %d %B %Y%H:%M")
+                    date+text(line).strip(), "%A, %d %B %Y%H:%M")
             except ValueError:
                 date_time = "undefined"
-        if "class" in line.attrs and "event-list" in line["class"]:
-            if "---" not in list(line.stripped_strings):
-                odds = list(map(float, line.stripped_strings))
+        if has_class(line, "event-list"):
+            if "---" not in strings(line):
+                odds = list(map(float, strings(line)))
                 match_odds_hash[match] = {}
                 match_odds_hash[match]["date"] = date_time
                 match_odds_hash[match]["odds"] = {"pasinobet": odds}
@@ -679,50 +726,55 @@ def parse_pmu(url=""):
     """
     if "http" not in url:
         return parse_sport_pmu(url)
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
-    return parse_pmu_html(soup)
+    return parse_pmu_html(fetch(url).data)
+
 
+PMU_SELECTOR = selector(classes=["trow--live--remaining-time", "trow--event--name",
+                                 "event-list-odds-list"],
+                        conditions=["@data-date and {}".format(class_predicate("shadow"))])
 
-def parse_pmu_html(soup):
+
+def parse_pmu_html(html):
     match_odds_hash = {}
     match = ""
     date_time = "undefined"
     live = False
     handicap = False
     date = ""
-    for line in soup.find_all():
-        if "n'est pas accessible pour le moment !" in line.text:
-            raise sportsbetting.UnavailableSiteException
-        if "data-date" in line.attrs and "shadow" in line["class"]:
-            date = line["data-date"]
-        elif "class" in line.attrs and "trow--live--remaining-time" in line["class"]:
-            hour = line.text
+    root = parse_html(html)
+    if "n'est pas accessible pour le moment !" in text(root):
+        raise sportsbetting.UnavailableSiteException
+    for line in PMU_SELECTOR(root):
+        if line.get("data-date") is not None and has_class(line, "shadow"):
+            date = line.get("data-date")
+        elif has_class(line, "trow--live--remaining-time"):
+            hour = text(line)
             try:
                 date_time = datetime.datetime.strptime(
                     date + " " + hour, "%Y-%m-%d %Hh%M")
             except ValueError:
                 date_time = "undefined"
-        elif "class" in line.attrs and "trow--event--name" in line["class"]:
-            string = "".join(list(line.stripped_strings))
+        elif has_class(line, "trow--event--name"):
+            string = "".join(strings(line))
             if "//" in string:
-                live = line.find_parent(
-                    "a")["data-name"] == "sportif.clic.paris_live.details"
-                is_rugby_13 = line.find_parent(
-                    "a")["data-sport_id"] == "rugby_a_xiii"
+                live = find_parent(
+                    line, "a").get("data-name") == "sportif.clic.paris_live.details"
+                is_rugby_13 = find_parent(
+                    line, "a").get("data-sport_id") == "rugby_a_xiii"
                 if not (live or is_rugby_13):
                     handicap = False
                     if "+" in string or "Egalité" in string:
                         handicap = True
                         match, odds = parse_page_match_pmu("https://paris-sportifs.pmu.fr"
-                                                           + line.parent["href"])
+                                                           + line.getparent().get("href"))
                     else:
                         match = string.replace(" - ", "-")
                         match = match.replace("//", "-")
-        elif "class" in line.attrs and "event-list-odds-list" in line["class"]:
+        elif has_class(line, "event-list-odds-list"):
             if not live:
                 if not handicap:
                     odds = list(
-                        map(lambda x: float(x.replace(",", ".")), list(line.stripped_strings)))
+                        map(lambda x: float(x.replace(",", ".")), strings(line)))
                 match_odds_hash[match] = {}
                 match_odds_hash[match]['odds'] = {"pmu": odds}
                 match_odds_hash[match]['date'] = date_time
@@ -731,23 +783,40 @@ def parse_pmu_html(soup):
     return match_odds_hash
 
 
+PMU_MATCH_SELECTOR = selector(tags=["option", "a"])
+
+
 def parse_page_match_pmu(url):
     """
     Retourne les cotes d'une page de match sur pmu
     """
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    root = parse_html(fetch(url).data)
     _id = "-1"
     odds = []
-    name = soup.find("title").text.split(" - ")[0].replace("//", "-")
+    name = text(root.find(".//title")).split(" - ")[0].replace("//", "-")
     print("\t" + name)
-    for line in soup.find_all(["option", "a"]):
-        if line.text in ["Vainqueur du match", "1N2 à la 60e minute"]:
-            _id = line["data-market-id"]
-        if "data-ev_mkt_id" in line.attrs and line["data-ev_mkt_id"] == _id:
-            odds.append(float(line.text.replace(",", ".")))
+    for line in PMU_MATCH_SELECTOR(root):
+        if text(line) in ["Vainqueur du match", "1N2 à la 60e minute"]:
+            _id = line.attrib["data-market-id"]
+        if line.get("data-ev_mkt_id") == _id:
+            odds.append(float(text(line).replace(",", ".")))
     return name, odds
 
 
+# Nombre de pages de matches pmu téléchargées simultanément
+PMU_PAGES_BATCH = 4
+
+
+def fetch_pmu_page(page_url):
+    """
+    Données d'une page de matches pmu, ou erreur levée si la page est inaccessible
+    """
+    try:
+        return json.loads(fetch(page_url).data)
+    except urllib.error.URLError as error:
+        return error
+
+
 def parse_sport_pmu(sport):
     """
     Retourne les cotes disponibles sur pmu pour un sport donné
@@ -757,23 +826,33 @@ def parse_sport_pmu(sport):
                 "hockey-sur-glace": 44, "basketball": 5}
     i = 0
     _id = id_sport[sport]
-    while True:
-        url = "https://paris-sportifs.pmu.fr/pservices/more_events/{0}/{1}/pmu-event-list-load-more-{0}".format(_id, i)
-        response = urllib.request.urlopen(url)
-        data = json.loads(response.read())
-        soup = BeautifulSoup(data[1]["html"], features="lxml")
-        try:
-            list_odds.append(parse_pmu_html(soup))
-            i += 1
-        except sportsbetting.UnavailableCompetitionException:
-            break
-    return merge_dicts(list_odds)
+    url = "https://paris-sportifs.pmu.fr/pservices/more_events/{0}/{1}/pmu-event-list-load-more-{0}"
+    with ThreadPool(PMU_PAGES_BATCH) as pool:
+        while True:  # Les pages d'un lot sont téléchargées en parallèle puis analysées dans l'ordre
+            urls = [url.format(_id, page) for page in range(i, i + PMU_PAGES_BATCH)]
+            for page, data in enumerate(pool.map(fetch_pmu_page, urls), i):
+                # Une page vide ou inaccessible (hormis la première) marque la fin des pages :
+                # aucun lot n'est lancé après elle
+                if isinstance(data, urllib.error.URLError):
+                    if page == 0:
+                        raise data
+                    return merge_dicts(list_odds)
+                try:
+                    list_odds.append(parse_pmu_html(data[1]["html"]))
+                except sportsbetting.UnavailableCompetitionException:
+                    return merge_dicts(list_odds)
+            i += PMU_PAGES_BATCH
+
+
+UNIBET_SELECTOR = selector(classes=["cell-event", "datetime", "oddsbox"])
+UNIBET_ODDS_SELECTOR = descendant_selector("span", "price")
 
 
 def parse_unibet(url):
     """
     Retourne les cotes disponibles sur unibet
     """
+    start_capture(selenium_init.DRIVER["unibet"])
     selenium_init.DRIVER["unibet"].get(url)
     match_odds_hash = {}
     is_sport_page = len([x for x in url.split("/") if x]) == 4
@@ -789,31 +868,17 @@ def parse_unibet(url):
         raise sportsbetting.AbortException
     if is_sport_page:
         scroll(selenium_init.DRIVER["unibet"], "unibet", "calendar-event", 1)
+    match_odds_hash = parse_api("unibet", selenium_init.DRIVER["unibet"], url)
+    if match_odds_hash:
+        return match_odds_hash
     for _ in range(10):
         inner_html = selenium_init.DRIVER["unibet"].execute_script(
             "return document.body.innerHTML")
-        soup = BeautifulSoup(inner_html, features="lxml")
-        if any(x in str(soup) for x in ["La page à laquelle vous souhaitez accéder n'existe plus.", "Aucun marché trouvé."]):
+        if any(x in inner_html for x in ["La page à laquelle vous souhaitez accéder n'existe plus.", "Aucun marché trouvé."]):
             raise sportsbetting.UnavailableCompetitionException
-        for line in soup.findAll():
-            if "class" in line.attrs and "cell-event" in line["class"]:
-                match = line.text.strip().replace("Bordeaux - Bègles", "Bordeaux-Bègles")
-                match = match.replace(
-                    "Flensburg - Handewitt", "Flensburg-Handewitt")
-                match = match.replace(
-                    "TSV Hannovre - Burgdorf", "TSV Hannovre-Burgdorf")
-                match = match.replace(
-                    "Tremblay - en - France", "Tremblay-en-France")
-                match = match.replace("FC Vion Zlate Moravce - Vrable",
-                                      "FC Vion Zlate Moravce-Vrable")
-                match = match.replace(
-                    "Toulon St - Cyr Var (F)", "Toulon St-Cyr Var (F)")
-                match = match.replace("Châlons - Reims", "Châlons-Reims")
-                match = match.replace("Colo - Colo", "Colo-Colo")
-                match = match.replace("Bourg - en - Bresse", "Bourg-en-Bresse")
-                match = match.replace("Grande - Bretagne", "Grande-Bretagne")
-                match = match.replace("Rostov - Don (F)", "Rostov-Don (F)")
-                match = match.replace("CS Hammam - Lif", "CS Hammam-Lif")
+        for line in UNIBET_SELECTOR(parse_html(inner_html)):
+            if has_class(line, "cell-event"):
+                match = format_unibet_names(text(line).strip())
                 if match.count(" - ") > 1:
                     print(match)
                     match = input("Réentrez le nom du match :")
@@ -824,14 +889,14 @@ def parse_unibet(url):
                     match = match.split("(")[0].strip()
                     if " - " not in match:
                         match = match.replace("-", " - ")
-            if "class" in line.attrs and "datetime" in line["class"]:
+            if has_class(line, "datetime"):
                 date_time = datetime.datetime.strptime(
-                    line.text, "%d/%m/%Y %H:%M")
+                    text(line), "%d/%m/%Y %H:%M")
                 if date_time < today:
                     date_time = date_time.replace(year=date_time.year + 1)
-            if "class" in line.attrs and "oddsbox" in line["class"]:
-                odds = list(map(lambda x: float(x.text),
-                                list(line.findChildren("span", {"class": "price"}))))
+            if has_class(line, "oddsbox"):
+                odds = list(map(lambda x: float(text(x)),
+                                UNIBET_ODDS_SELECTOR(line)))
                 if match:
                     match_odds_hash[match] = {}
                     match_odds_hash[match]['odds'] = {"unibet": odds}
@@ -855,16 +920,14 @@ def parse_winamax(url=""):
         tournament_id = -1
     sport_id = int(ids.split("/")[0])
     try:
-        req = urllib.request.Request(
-            url, headers={'User-Agent': sportsbetting.USER_AGENT})
-        webpage = urllib.request.urlopen(req, timeout=10).read()
-        soup = BeautifulSoup(webpage, features="lxml")
+        webpage = fetch(url, headers={'User-Agent': sportsbetting.get_user_agent()}).data
+        root = parse_html(webpage)
     except urllib.error.HTTPError:
         raise sportsbetting.UnavailableSiteException
     match_odds_hash = {}
-    for line in soup.find_all(['script']):
-        if "PRELOADED_STATE" in str(line.string):
-            json_text = (line.string.split("var PRELOADED_STATE = ")[1]
+    for line in root.iter("script"):
+        if "PRELOADED_STATE" in str(line.text):
+            json_text = (line.text.split("var PRELOADED_STATE = ")[1]
                          .split(";var BETTING_CONFIGURATION")[0])
             if json_text[-1] == ";":
                 json_text = json_text[:-1]
@@ -896,6 +959,9 @@ def parse_winamax(url=""):
     raise sportsbetting.UnavailableSiteException
 
 
+ZEBET_SELECTOR = selector(classes=["bet-time", "competition"])
+
+
 def parse_zebet(url=""):
     """
     Retourne les cotes disponibles sur zebet
@@ -905,30 +971,30 @@ def parse_zebet(url=""):
     if "/sport/" in url:
         return parse_sport_zebet(url)
     try:
-        soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+        root = parse_html(fetch(url).data)
     except urllib.error.URLError:
         raise sportsbetting.UnavailableCompetitionException
+    if "Zebet rencontre actuellement des difficultés techniques." in text(root):
+        raise sportsbetting.UnavailableSiteException
     match_odds_hash = {}
     today = datetime.datetime.today()
     today = datetime.datetime(today.year, today.month, today.day)
     year = str(today.year) + "/"
     date_time = None
-    for line in soup.find_all():
-        if "Zebet rencontre actuellement des difficultés techniques." in line.text:
-            raise sportsbetting.UnavailableSiteException
-        if "class" in line.attrs and "bet-time" in line["class"]:
+    for line in ZEBET_SELECTOR(root):
+        if has_class(line, "bet-time"):
             try:
-                date_time = datetime.datetime.strptime(year + " ".join(line.text.strip().split()),
+                date_time = datetime.datetime.strptime(year + " ".join(text(line).strip().split()),
                                                        "%Y/%d/%m %H:%M")
                 if date_time < today:
                     date_time = date_time.replace(year=date_time.year + 1)
             except ValueError:
                 date_time = "undefined"
-        elif "class" in line.attrs and "competition" in line["class"]:
-            strings = list(line.stripped_strings)
-            match = (strings[1] + " - " + strings[-3])
+        elif has_class(line, "competition"):
+            line_strings = strings(line)
+            match = (line_strings[1] + " - " + line_strings[-3])
             odds = []
-            for i, val in enumerate(strings):
+            for i, val in enumerate(line_strings):
                 if not i % 4:
                     odds.append(float(val.replace(",", ".")))
             match_odds_hash[match] = {}
@@ -937,29 +1003,32 @@ def parse_zebet(url=""):
     return match_odds_hash
 
 
+SPORT_ZEBET_SELECTOR = selector(classes=["bet-event", "bet-time", "pari-1"])
+
+
 def parse_sport_zebet(url):
-    soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
+    root = parse_html(fetch(url).data)
+    if "Zebet rencontre actuellement des difficultés techniques." in text(root):
+        raise sportsbetting.UnavailableSiteException
     match_odds_hash = {}
     today = datetime.datetime.today()
     today = datetime.datetime(today.year, today.month, today.day)
     year = str(today.year) + "/"
     date_time = None
-    for line in soup.find_all():
-        if "Zebet rencontre actuellement des difficultés techniques." in line.text:
-            raise sportsbetting.UnavailableSiteException
-        if "class" in line.attrs and "bet-event" in line["class"]:
-            match = format_zebet_names(line.text.strip())
-        if "class" in line.attrs and "bet-time" in line["class"]:
+    for line in SPORT_ZEBET_SELECTOR(root):
+        if has_class(line, "bet-event"):
+            match = format_zebet_names(text(line).strip())
+        if has_class(line, "bet-time"):
             try:
-                date_time = datetime.datetime.strptime(year + " ".join(line.text.strip().split()),
+                date_time = datetime.datetime.strptime(year + " ".join(text(line).strip().split()),
                                                        "%Y/%d/%m %H:%M")
                 if date_time < today:
                     date_time = date_time.replace(year=date_time.year + 1)
             except ValueError:
                 date_time = "undefined"
-        if "class" in line.attrs and "pari-1" in line["class"]:
+        if has_class(line, "pari-1"):
             odds = list(map(lambda x: float(x.replace(",", ".")),
-                            list(line.stripped_strings)[1::2]))
+                            strings(line)[1::2]))
             match_odds_hash[match] = {}
             match_odds_hash[match]['odds'] = {"zebet": odds}
             match_odds_hash[match]['date'] = date_time
@@ -0,0 +1,251 @@
+"""
+Sauvegarde incrémentale des cotes récupérées (sportsbetting.ODDS) dans une base SQLite, lue sport
+par sport à la première utilisation
+"""
+
+import collections.abc
+import datetime
+import json
+import os
+import pickle
+import sqlite3
+import threading
+
+import sportsbetting
+from sportsbetting.odds_store import OddsStore
+
+PATH_ODDS_DB = os.path.dirname(sportsbetting.__file__) + "/resources/odds.db"
+# Ancienne sauvegarde complète des cotes, importée dans la base si celle-ci est vide
+PATH_DATA = os.path.dirname(sportsbetting.__file__) + "/resources/data.pickle"
+CONNECTIONS = threading.local()
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    sport TEXT NOT NULL,
+    match TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (sport, match)
+);
+CREATE TABLE IF NOT EXISTS odds (
+    sport TEXT NOT NULL,
+    match TEXT NOT NULL,
+    site TEXT NOT NULL,
+    odds TEXT NOT NULL,
+    PRIMARY KEY (sport, match, site)
+);
+"""
+
+
+def get_odds_connection(path=PATH_ODDS_DB, schema=SCHEMA):
+    """
+    Retourne la connexion à la base des cotes propre au thread courant, ouverte (et créée avec
+    le schéma schema si besoin) à la première utilisation, en mode WAL
+    """
+    if not hasattr(CONNECTIONS, "connections"):
+        CONNECTIONS.connections = {}
+    if path not in CONNECTIONS.connections:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+        CONNECTIONS.connections[path] = conn
+    return CONNECTIONS.connections[path]
+
+
+def format_date(date):
+    """
+    Date d'un match au format de la base
+    """
+    return date.strftime(DATE_FORMAT) if isinstance(date, datetime.datetime) else None
+
+
+def snapshot(odds):
+    """
+    Contenu des cotes d'un sport tel qu'enregistré dans la base :
+    {match: (date, {site: [cotes]})}
+    """
+    return {match: (format_date(odds_match["date"]),
+                    {site: [float(odd) for odd in odds_site]
+                     for site, odds_site in odds_match["odds"].items()})
+            for match, odds_match in odds.items()}
+
+
+def write_delta(conn, sport, old, new):
+    """
+    Écrit dans la base les différences entre deux états des cotes d'un sport (au format de
+    snapshot) et retourne le nombre de lignes modifiées
+    """
+    changes = 0
+    for match in old:
+        if match not in new:
+            conn.execute("DELETE FROM matches WHERE sport = ? AND match = ?", (sport, match))
+            conn.execute("DELETE FROM odds WHERE sport = ? AND match = ?", (sport, match))
+            changes += 1
+    for match, (date, odds_match) in new.items():
+        old_date, old_odds_match = old.get(match, (None, {}))
+        if match not in old or date != old_date:
+            # Mise à jour plutôt que remplacement, pour conserver l'ordre des matches (rowid)
+            if not conn.execute("UPDATE matches SET date = ? WHERE sport = ? AND match = ?",
+                                (date, sport, match)).rowcount:
+                conn.execute("INSERT INTO matches (sport, match, date) VALUES (?, ?, ?)",
+                             (sport, match, date))
+            changes += 1
+        for site, odds_site in odds_match.items():
+            if old_odds_match.get(site) != odds_site:
+                conn.execute("INSERT OR REPLACE INTO odds (sport, match, site, odds) "
+                             "VALUES (?, ?, ?, ?)", (sport, match, site, json.dumps(odds_site)))
+                changes += 1
+        for site in old_odds_match:
+            if site not in odds_match:
+                conn.execute("DELETE FROM odds WHERE sport = ? AND match = ? AND site = ?",
+                             (sport, match, site))
+                changes += 1
+    return changes
+
+
+def read_sport(conn, sport):
+    """
+    Lit les cotes d'un sport dans la base, au format de sportsbetting.ODDS[sport]
+    """
+    odds = {}
+    for match, date in conn.execute("SELECT match, date FROM matches WHERE sport = ? "
+                                    "ORDER BY rowid", (sport,)):
+        odds[match] = {"date": datetime.datetime.strptime(date, DATE_FORMAT) if date else None,
+                       "odds": {}}
+    for match, site, odds_site in conn.execute("SELECT match, site, odds FROM odds "
+                                               "WHERE sport = ? ORDER BY rowid", (sport,)):
+        if match in odds:
+            odds[match]["odds"][site] = json.loads(odds_site)
+    return odds
+
+
+class PersistentOdds(collections.abc.MutableMapping):
+    """
+    Cotes par sport, à utiliser à la place du dictionnaire sportsbetting.ODDS, adossées à la base
+    path. Les cotes d'un sport ne sont lues dans la base qu'à leur première utilisation (ou en
+    arrière-plan avec preload). save n'écrit que les matches et les sites modifiés depuis la
+    dernière sauvegarde, en une seule transaction : une interruption laisse la base dans son état
+    précédent
+    """
+
+    def __init__(self, path=PATH_ODDS_DB):
+        self.path = path
+        self.lock = threading.RLock()
+        self.loaded = {}
+        # Sports enregistrés dans la base et pas encore lus
+        self.unloaded = {sport for sport, in get_odds_connection(path)
+                         .execute("SELECT DISTINCT sport FROM matches")}
+        self.deleted = set()
+        # Contenu de la base par sport lu ou sauvegardé, et cotes correspondantes
+        self.saved = {}
+        self.saved_odds = {}
+
+    def load(self, sport):
+        """
+        Lit les cotes d'un sport dans la base si elles n'ont pas déjà été lues
+        """
+        with self.lock:
+            if sport in self.unloaded:
+                odds = OddsStore.from_dict(read_sport(get_odds_connection(self.path), sport))
+                self.loaded[sport] = odds
+                self.saved[sport] = snapshot(odds)
+                self.saved_odds[sport] = (odds, len(odds))
+                self.unloaded.discard(sport)
+            return self.loaded[sport]
+
+    def preload(self):
+        """
+        Lit en arrière-plan les cotes de tous les sports enregistrés
+        """
+        def preload_sports():
+            for sport in list(self.unloaded):
+                self.load(sport)
+
+        thread = threading.Thread(target=preload_sports, daemon=True)
+        thread.start()
+        return thread
+
+    def __getitem__(self, sport):
+        with self.lock:
+            if sport in self.unloaded:
+                return self.load(sport)
+            return self.loaded[sport]
+
+    def __setitem__(self, sport, odds):
+        with self.lock:
+            # Sport pas encore lu : son contenu dans la base sera entièrement remplacé
+            self.unloaded.discard(sport)
+            self.loaded[sport] = odds
+
+    def __delitem__(self, sport):
+        with self.lock:
+            if sport not in self:
+                raise KeyError(sport)
+            self.loaded.pop(sport, None)
+            self.unloaded.discard(sport)
+            self.deleted.add(sport)
+
+    def __contains__(self, sport):
+        with self.lock:
+            return sport in self.loaded or sport in self.unloaded
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.loaded) + sorted(self.unloaded))
+
+    def __len__(self):
+        with self.lock:
+            return len(self.loaded) + len(self.unloaded)
+
+    def is_saved(self, sport, odds):
+        """
+        Vérifie que les cotes d'un sport n'ont pas changé depuis la dernière sauvegarde sans les
+        parcourir (un OddsStore n'est modifié que par suppression de matches)
+        """
+        saved_odds, length = self.saved_odds.get(sport, (None, 0))
+        return isinstance(odds, OddsStore) and saved_odds is odds and length == len(odds)
+
+    def save(self):
+        """
+        Enregistre les modifications depuis la dernière sauvegarde et retourne le nombre de
+        lignes modifiées dans la base
+        """
+        changes = 0
+        with self.lock:
+            conn = get_odds_connection(self.path)
+            snapshots = {}
+            with conn:
+                deleted = self.deleted - set(self.loaded)
+                for sport in deleted:
+                    conn.execute("DELETE FROM matches WHERE sport = ?", (sport,))
+                    conn.execute("DELETE FROM odds WHERE sport = ?", (sport,))
+                    changes += 1
+                for sport, odds in self.loaded.items():
+                    if self.is_saved(sport, odds):
+                        continue
+                    snapshots[sport] = snapshot(odds)
+                    if sport not in self.saved:
+                        conn.execute("DELETE FROM matches WHERE sport = ?", (sport,))
+                        conn.execute("DELETE FROM odds WHERE sport = ?", (sport,))
+                        changes += 1
+                    changes += write_delta(conn, sport, self.saved.get(sport, {}),
+                                           snapshots[sport])
+            self.deleted.clear()
+            for sport in deleted:
+                self.saved.pop(sport, None)
+                self.saved_odds.pop(sport, None)
+            for sport, sport_snapshot in snapshots.items():
+                self.saved[sport] = sport_snapshot
+                self.saved_odds[sport] = (self.loaded[sport], len(self.loaded[sport]))
+        return changes
+
+
+def import_pickle(odds, path=PATH_DATA):
+    """
+    Importe dans odds (PersistentOdds) l'ancienne sauvegarde complète des cotes si odds est vide
+    """
+    if len(odds) or not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        for sport, odds_sport in pickle.load(file).items():
+            odds[sport] = OddsStore.from_dict(odds_sport)
+    odds.save()
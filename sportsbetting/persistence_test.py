@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests de la sauvegarde incrémentale des cotes
+"""
+
+from sportsbetting.odds_store import OddsStore
+from sportsbetting.persistence_functions import PersistentOdds
+from sportsbetting.vectorized_test import random_odds
+
+
+def test_persistent_odds(tmp_path):
+    """
+    :return: Les cotes sauvegardées sont relues à l'identique, sport par sport, et une
+    sauvegarde n'écrit que les matches et les sites modifiés
+    """
+    path = str(tmp_path / "odds.db")
+    odds = PersistentOdds(path)
+    odds["football"] = OddsStore.from_dict(random_odds(50, 3))
+    odds["tennis"] = random_odds(20, 2, 1)
+    assert odds.save() > 70
+    assert odds.save() == 0
+    odds = PersistentOdds(path)
+    assert sorted(odds) == ["football", "tennis"] and not odds.loaded
+    assert dict(odds["tennis"]) == random_odds(20, 2, 1) and "football" not in odds.loaded
+    football = dict(odds["football"])
+    assert football == dict(OddsStore.from_dict(random_odds(50, 3)))
+    tennis = dict(odds["tennis"])
+    site = next(iter(tennis["A0 - B0"]["odds"]))
+    tennis["A0 - B0"] = {"date": tennis["A0 - B0"]["date"],
+                         "odds": dict(tennis["A0 - B0"]["odds"], **{site: [1.5, 2.5]})}
+    del tennis["A1 - B1"]
+    odds["tennis"] = tennis
+    del odds["football"]["A0 - B0"]
+    assert odds.save() == 3
+    odds = PersistentOdds(path)
+    odds["football"] = {}
+    assert odds.save() > 0
+    odds = PersistentOdds(path)
+    assert list(odds) == ["tennis"] and dict(odds["tennis"]) == tennis
+    odds.preload().join()
+    assert not odds.unloaded
@@ -0,0 +1,283 @@
+"""
+Enregistrement des pages utilisées par les parsers (réponses HTTP, pages et journaux réseau des
+drivers selenium) et rejeu hors ligne de ces enregistrements, pour mesurer les performances des
+parsers de manière reproductible
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import urllib.error
+
+import selenium
+import selenium.common
+
+import sportsbetting
+from sportsbetting import http_functions, selenium_init
+from sportsbetting.parser_functions import parse
+from sportsbetting.scraping_functions import HTTP_SITES
+
+PATH_FIXTURES = os.path.dirname(sportsbetting.__file__) + "/resources/fixtures"
+
+
+def fixture_path(directory, url):
+    """
+    Chemin de l'enregistrement d'une page
+    """
+    return os.path.join(directory, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+
+def load_fixture(directory, url):
+    """
+    Retourne l'enregistrement d'une page, None s'il n'existe pas
+    """
+    try:
+        with open(fixture_path(directory, url), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_fixture(directory, url, fixture):
+    """
+    Enregistre une page
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(fixture_path(directory, url), "w", encoding="utf-8") as file:
+        json.dump({"url": url, **fixture}, file)
+
+
+def save_http_fixture(directory, url, content=b"", status=200, final_url=None):
+    """
+    Enregistre une réponse HTTP
+    """
+    save_fixture(directory, url, {"content": base64.b64encode(content).decode(),
+                                  "status": status, "final_url": final_url or url})
+
+
+def save_selenium_fixture(directory, url, html, current_url=None, log=(), bodies=None):
+    """
+    Enregistre une page affichée par un driver selenium, avec les messages du journal réseau et
+    les contenus des réponses reçues
+    """
+    save_fixture(directory, url, {"html": html, "current_url": current_url or url,
+                                  "log": list(log), "bodies": bodies or {}})
+
+
+class ReplayResponse:
+    """
+    Réponse HTTP enregistrée, avec les attributs utilisés des réponses du client partagé
+    """
+
+    def __init__(self, fixture):
+        self.data = base64.b64decode(fixture["content"])
+        self.status = fixture["status"]
+        self.headers = {}
+        self.url = fixture["final_url"]
+
+    def geturl(self):
+        return self.url
+
+
+class RecordingTransport:
+    """
+    Télécharge les pages sur le réseau et les enregistre
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, url, headers=None, timeout=http_functions.HTTP_TIMEOUT):
+        try:
+            response = http_functions.network_fetch(url, headers, timeout)
+        except urllib.error.HTTPError as error:
+            save_http_fixture(self.directory, url, status=error.code)
+            raise
+        save_http_fixture(self.directory, url, response.data, response.status, response.geturl())
+        return response
+
+
+class ReplayTransport:
+    """
+    Renvoie les pages enregistrées au lieu de les télécharger
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, url, headers=None, timeout=http_functions.HTTP_TIMEOUT):
+        fixture = load_fixture(self.directory, url)
+        if fixture is None:
+            raise urllib.error.URLError("Page non enregistrée : {}".format(url))
+        response = ReplayResponse(fixture)
+        if response.status >= 300:
+            raise urllib.error.HTTPError(url, response.status, "", response.headers, None)
+        return response
+
+
+class RecordingDriver:
+    """
+    Driver selenium enregistrant le contenu des pages lu par les parsers ainsi que le journal
+    réseau et les réponses lues dans ce journal
+    """
+
+    def __init__(self, driver, directory):
+        self.driver = driver
+        self.directory = directory
+        self.url = None
+        self.fixture = None
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def save(self):
+        if self.url is not None:
+            save_selenium_fixture(self.directory, self.url, **self.fixture)
+
+    def get(self, url):
+        self.driver.get(url)
+        self.url = url
+        self.fixture = {"html": "", "current_url": self.driver.current_url, "log": [],
+                        "bodies": {}}
+        self.save()
+
+    def execute_script(self, script, *args):
+        result = self.driver.execute_script(script, *args)
+        if script == "return document.body.innerHTML" and self.url is not None:
+            self.fixture["html"] = result
+            self.save()
+        return result
+
+    def get_log(self, log_type):
+        log = self.driver.get_log(log_type)
+        if log_type == "performance" and self.url is not None:
+            self.fixture["log"] += log
+            self.save()
+        return log
+
+    def execute_cdp_cmd(self, command, params):
+        result = self.driver.execute_cdp_cmd(command, params)
+        if command == "Network.getResponseBody" and self.url is not None:
+            self.fixture["bodies"][params["requestId"]] = result
+            self.save()
+        return result
+
+
+class ReplayDriver:
+    """
+    Driver factice affichant les pages enregistrées. Les éléments attendus par les parsers sont
+    considérés comme présents, et les éléments dont ils attendent la disparition comme absents
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.fixture = {"html": "", "log": [], "bodies": {}}
+        self.current_url = "about:blank"
+        self.log = []
+
+    def get(self, url):
+        self.fixture = (load_fixture(self.directory, url)
+                        or {"html": "", "current_url": url, "log": [], "bodies": {}})
+        self.current_url = self.fixture["current_url"]
+        self.log = list(self.fixture["log"])
+
+    def execute_script(self, script, *args):
+        if script == "return 1":
+            return 1
+        if script == "return document.body.innerHTML":
+            return self.fixture["html"]
+        return 0
+
+    def get_log(self, log_type):
+        log, self.log = self.log, []
+        return log
+
+    def execute_cdp_cmd(self, command, params):
+        try:
+            return self.fixture["bodies"][params["requestId"]]
+        except KeyError:
+            raise selenium.common.exceptions.WebDriverException("Réponse non enregistrée")
+
+    def find_element(self, *args, **kwargs):
+        raise selenium.common.exceptions.NoSuchElementException()
+
+    def find_elements(self, *args, **kwargs):
+        return [self]
+
+    def maximize_window(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+@contextlib.contextmanager
+def transport(http_transport, driver_factory):
+    """
+    Remplace le client HTTP partagé et le lancement de Chrome, avec un pool de drivers dédié
+    """
+    pool = selenium_init.DRIVER
+    selenium_init.DRIVER = selenium_init.DriverPool()
+    http_functions.TRANSPORT = http_transport
+    selenium_init.DRIVER_FACTORY = driver_factory
+    try:
+        yield
+    finally:
+        selenium_init.DRIVER.close()
+        selenium_init.DRIVER = pool
+        http_functions.TRANSPORT = None
+        selenium_init.DRIVER_FACTORY = None
+
+
+def recording(directory=PATH_FIXTURES):
+    """
+    Enregistre dans directory les pages utilisées par les parsers
+    """
+    return transport(RecordingTransport(directory),
+                     lambda headless: RecordingDriver(selenium_init.launch_chrome(headless),
+                                                      directory))
+
+
+def replaying(directory=PATH_FIXTURES):
+    """
+    Fait utiliser aux parsers les pages enregistrées dans directory
+    """
+    return transport(ReplayTransport(directory), lambda headless: ReplayDriver(directory))
+
+
+def recorded_parsings(directory=PATH_FIXTURES):
+    """
+    Liste des couples (site, url) dont les pages ont été enregistrées avec record_parsing
+    """
+    try:
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+            return [tuple(parsing) for parsing in json.load(file)]
+    except (OSError, ValueError):
+        return []
+
+
+def record_parsing(site, url, directory=PATH_FIXTURES):
+    """
+    Parse url sur site en enregistrant les pages utilisées, et retourne les cotes obtenues
+    """
+    with recording(directory):
+        if site not in HTTP_SITES:
+            selenium_init.DRIVER.warm(site)
+        odds = parse(site, url)
+    parsings = recorded_parsings(directory)
+    if (site, url) not in parsings:
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as file:
+            json.dump(parsings + [(site, url)], file)
+    return odds
+
+
+def replay_parsing(site, url, directory=PATH_FIXTURES):
+    """
+    Parse url sur site à partir des pages enregistrées
+    """
+    with replaying(directory):
+        if site not in HTTP_SITES:
+            selenium_init.DRIVER.warm(site)
+        return parse(site, url)
@@ -0,0 +1,114 @@
+"""
+Parsing simultané des compétitions de plusieurs sites
+"""
+
+import asyncio
+import concurrent.futures
+import time
+
+import sportsbetting
+from sportsbetting import selenium_init
+from sportsbetting.auxiliary_functions import merge_dict_odds
+
+# Sites dont les cotes sont récupérées par de simples requêtes HTTP
+HTTP_SITES = ["france_pari", "netbet", "pmu", "winamax", "zebet"]
+# Nombre maximal de compétitions parsées simultanément par site accessible sans selenium (pour
+# les autres sites, il s'agit du nombre de drivers selenium par site)
+SITE_CONCURRENCY = {"winamax": 2}
+DEFAULT_SITE_CONCURRENCY = 4
+# Intervalle minimal (en secondes) entre deux débuts de parsing d'un même site
+SITE_MIN_INTERVAL = {"winamax": 1}
+DEFAULT_SITE_MIN_INTERVAL = 0.2
+# Nombre de threads chargés des requêtes et de l'analyse des pages
+PARSING_WORKERS = 32
+
+
+class RateLimiter:
+    """
+    Espace d'au moins interval secondes les débuts de parsing d'un site
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_start = 0
+
+    async def wait(self):
+        """
+        Attend le prochain créneau disponible
+        """
+        now = time.monotonic()
+        start = max(now, self.next_start)
+        self.next_start = start + self.interval
+        await asyncio.sleep(start - now)
+
+
+async def parse_competition_site_async(competition, sport, site, parse_function, semaphore,
+                                       limiter, executor, nb_competitions):
+    """
+    Parse une compétition d'un site dans le pool de threads, dans la limite des requêtes
+    simultanées et du débit autorisés pour le site
+    """
+    async with semaphore:
+        await limiter.wait()
+        odds = await asyncio.get_event_loop().run_in_executor(executor, parse_function,
+                                                              competition, sport, site)
+    sportsbetting.PROGRESS += 100 / (nb_competitions * sportsbetting.SUB_PROGRESS_LIMIT)
+    sportsbetting.SITE_PROGRESS[site] += 100 / nb_competitions
+    return odds
+
+
+async def parse_site_async(competitions, sport, site, parse_function, executor):
+    """
+    Parse simultanément les compétitions d'un site et fusionne leurs cotes dans l'ordre des
+    compétitions
+    """
+    if len(competitions) > 40 and site == "winamax":  # to avoid being blocked by winamax
+        competitions = competitions[:40]
+    sportsbetting.SITE_PROGRESS[site] = 0
+    if site in HTTP_SITES:
+        semaphore = asyncio.Semaphore(SITE_CONCURRENCY.get(site, DEFAULT_SITE_CONCURRENCY))
+    else:
+        semaphore = asyncio.Semaphore(selenium_init.MAX_DRIVERS_PER_SITE)
+    limiter = RateLimiter(SITE_MIN_INTERVAL.get(site, DEFAULT_SITE_MIN_INTERVAL))
+    tasks = [asyncio.ensure_future(parse_competition_site_async(competition, sport, site,
+                                                                parse_function, semaphore,
+                                                                limiter, executor,
+                                                                len(competitions)))
+             for competition in competitions]
+    try:
+        for task in asyncio.as_completed(tasks):
+            await task
+    except sportsbetting.UnavailableSiteException:
+        print("{} non accessible".format(site))
+        sportsbetting.SITE_PROGRESS[site] = 100
+    except sportsbetting.AbortException:
+        print("Interruption", site)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return merge_dict_odds([task.result() for task in tasks
+                            if task.done() and not task.cancelled() and not task.exception()
+                            and task.result()])
+
+
+async def parse_sites_async(competitions, sport, sites, parse_function):
+    """
+    Parse simultanément les compétitions de tous les sites
+    """
+    with concurrent.futures.ThreadPoolExecutor(PARSING_WORKERS) as executor:
+        return await asyncio.gather(*[parse_site_async(competitions, sport, site, parse_function,
+                                                       executor)
+                                      for site in sites])
+
+
+def parse_sites(competitions, sport, sites, parse_function):
+    """
+    Retourne la liste des cotes de chaque site de sites pour les compétitions données,
+    parse_function(compétition, sport, site) retournant les cotes d'une compétition
+    """
+    loop = asyncio.new_event_loop()  # Propre à l'appel, qui peut se faire hors du thread principal
+    try:
+        return loop.run_until_complete(parse_sites_async(competitions, sport, sites,
+                                                         parse_function))
+    finally:
+        loop.close()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests du parsing simultané de plusieurs sites
+"""
+
+import threading
+import time
+
+import sportsbetting
+from sportsbetting import scraping_functions
+from sportsbetting.scraping_functions import parse_sites
+
+
+def test_parse_sites(monkeypatch):
+    """
+    :return: Les compétitions sont parsées simultanément dans la limite de chaque site, et un site
+    inaccessible n'interrompt pas les autres
+    """
+    monkeypatch.setattr(scraping_functions, "DEFAULT_SITE_MIN_INTERVAL", 0)
+    running = {"netbet": 0, "zebet": 0}
+    max_running = dict(running)
+    lock = threading.Lock()
+
+    def parse_function(competition, sport, site):
+        if site == "pmu":
+            raise sportsbetting.UnavailableSiteException
+        with lock:
+            running[site] += 1
+            max_running[site] = max(max_running[site], running[site])
+        time.sleep(0.05)
+        with lock:
+            running[site] -= 1
+        return {competition + " - " + site: {"odds": {site: [2, 2]}, "date": None}}
+
+    competitions = ["C{}".format(i) for i in range(12)]
+    start = time.time()
+    odds = parse_sites(competitions, "football", ["netbet", "pmu", "zebet"], parse_function)
+    assert time.time() - start < 12 * 0.05
+    assert max_running["netbet"] == scraping_functions.DEFAULT_SITE_CONCURRENCY
+    assert odds[1] == {}
+    assert set(odds[0]) == {competition + " - netbet" for competition in competitions}
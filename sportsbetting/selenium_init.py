@@ -2,6 +2,11 @@
 Initialisation de selenium
 """
 
+import atexit
+import collections
+import contextlib
+import threading
+
 import colorama
 import selenium
 import selenium.webdriver
@@ -11,13 +16,22 @@ import termcolor
 
 import sportsbetting
 
-DRIVER = {}
+# Nombre maximal de drivers par site
+MAX_DRIVERS_PER_SITE = 2
+# Nombre de compétitions parsées par un driver avant son remplacement
+MAX_PAGES_PER_DRIVER = 50
+# Mémoire JavaScript (en octets) d'un driver au-delà de laquelle il est remplacé
+MAX_DRIVER_MEMORY = 500 * 2 ** 20
 
 
-@stopit.threading_timeoutable(timeout_param='timeout')
-def start_selenium(site, headless=True):
+# Fonction remplaçant le lancement de Chrome (enregistrement ou rejeu des pages, cf.
+# replay_functions), None pour lancer Chrome normalement
+DRIVER_FACTORY = None
+
+
+def launch_chrome(headless=True):
     """
-    Lancement d'un driver selenium
+    Lancement d'un navigateur Chrome piloté par selenium
     """
     options = selenium.webdriver.ChromeOptions()
     prefs = {'profile.managed_default_content_settings.images': 2,
@@ -25,23 +39,262 @@ def start_selenium(site, headless=True):
     options.add_argument('log-level=3')
     options.add_experimental_option("prefs", prefs)
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    # Journal des échanges réseau, pour lire les réponses des API (cf. api_functions)
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True,
+                                                         'enablePage': False})
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     if headless:
         options.add_argument("--headless")
     options.add_argument("--disable-extensions")
+    return selenium.webdriver.Chrome(sportsbetting.get_path_driver(), options=options)
+
+
+@stopit.threading_timeoutable(timeout_param='timeout')
+def create_driver(headless=True):
+    """
+    Lancement d'un driver selenium, retourne None en cas d'échec
+    """
     try:
-        DRIVER[site] = selenium.webdriver.Chrome(
-            sportsbetting.PATH_DRIVER, options=options)
-        colorama.init()
+        if DRIVER_FACTORY is not None:
+            return DRIVER_FACTORY(headless)
+        return launch_chrome(headless)
+    except (stopit.utils.TimeoutException,
+            selenium.common.exceptions.SessionNotCreatedException):
+        return None
+
+
+def print_driver_status(site, started):
+    """
+    Affiche le résultat du lancement d'un driver
+    """
+    colorama.init()
+    if started:
         print(termcolor.colored('Driver started for {}{}'
                                 .format(site, colorama.Style.RESET_ALL),
                                 'green'))
-        colorama.deinit()
-        return True
-    except (stopit.utils.TimeoutException,
-            selenium.common.exceptions.SessionNotCreatedException):
-        colorama.init()
+    else:
         print(termcolor.colored('Driver not started for {}{}'
                                 .format(site, colorama.Style.RESET_ALL),
                                 'red'))
-        colorama.deinit()
+    colorama.deinit()
+
+
+def is_healthy(driver):
+    """
+    Vérifie qu'un driver répond encore
+    """
+    try:
+        return driver.execute_script("return 1") == 1
+    except selenium.common.exceptions.WebDriverException:
         return False
+
+
+def memory_usage(driver):
+    """
+    Mémoire JavaScript utilisée par la page courante d'un driver
+    """
+    try:
+        return driver.execute_script("return window.performance.memory ? "
+                                     "window.performance.memory.usedJSHeapSize : 0") or 0
+    except selenium.common.exceptions.WebDriverException:
+        return 0
+
+
+def quit_driver(driver):
+    """
+    Fermeture d'un driver, même s'il ne répond plus
+    """
+    try:
+        driver.quit()
+    except selenium.common.exceptions.WebDriverException:
+        pass
+
+
+class DriverPool:
+    """
+    Drivers selenium conservés entre les parsings, jusqu'à MAX_DRIVERS_PER_SITE par site.
+    Un driver est emprunté par un thread le temps du parsing d'une compétition avec lease(site) ;
+    pendant l'emprunt, DRIVER[site] désigne ce driver dans ce thread, ce qui permet aux parsers
+    de rester inchangés. Les drivers qui ne répondent plus sont écartés, et ceux qui ont parsé
+    MAX_PAGES_PER_DRIVER compétitions ou dont la mémoire dépasse MAX_DRIVER_MEMORY sont remplacés
+    """
+
+    def __init__(self):
+        self.idle = collections.defaultdict(list)
+        self.count = collections.defaultdict(int)
+        self.condition = threading.Condition()
+        self.local = threading.local()
+
+    def leased(self):
+        """
+        Drivers empruntés par le thread courant
+        """
+        if not hasattr(self.local, "leased"):
+            self.local.leased = {}
+        return self.local.leased
+
+    def entry(self, site):
+        """
+        Driver emprunté par le thread courant pour site, ou à défaut dernier driver disponible
+        """
+        if site in self.leased():
+            return self.leased()[site]
+        with self.condition:
+            if self.idle[site]:
+                return self.idle[site][-1]
+        raise KeyError(site)
+
+    def __getitem__(self, site):
+        return self.entry(site)["driver"]
+
+    def __contains__(self, site):
+        return site in self.leased() or bool(self.idle[site])
+
+    def add(self, site, driver, headless=True):
+        """
+        Ajoute un driver disponible pour site
+        """
+        with self.condition:
+            self.idle[site].append({"driver": driver, "headless": headless, "pages": 0})
+            self.count[site] += 1
+            self.condition.notify_all()
+
+    def discard(self, site, entry):
+        """
+        Ferme un driver et libère sa place
+        """
+        quit_driver(entry["driver"])
+        with self.condition:
+            self.count[site] -= 1
+            self.condition.notify_all()
+
+    def is_warm(self, site, headless=True):
+        """
+        Vérifie qu'un driver est disponible pour site
+        """
+        with self.condition:
+            return any(entry["headless"] == headless for entry in self.idle[site])
+
+    def warm(self, site, headless=True):
+        """
+        S'assure qu'un driver en état de marche est disponible pour site, en le lançant si besoin.
+        Retourne False si le driver n'a pas pu être lancé
+        """
+        with self.condition:
+            entries = [entry for entry in self.idle[site] if entry["headless"] == headless]
+            for entry in entries:
+                self.idle[site].remove(entry)
+        healthy = False
+        for entry in entries:
+            if not healthy and is_healthy(entry["driver"]):
+                healthy = True
+                with self.condition:
+                    self.idle[site].append(entry)
+                    self.condition.notify_all()
+            else:
+                self.discard(site, entry)
+        return healthy or self.start(site, headless, timeout=20)
+
+    def start(self, site, headless=True, timeout=None):
+        """
+        Lance un nouveau driver disponible pour site, retourne False en cas d'échec
+        """
+        driver = create_driver(headless, timeout=timeout)
+        print_driver_status(site, driver is not None)
+        if driver:
+            self.add(site, driver, headless)
+        return driver is not None
+
+    def acquire(self, site, headless=True):
+        """
+        Retourne un driver en état de marche pour site, en lançant un nouveau driver si aucun
+        n'est disponible et que la limite n'est pas atteinte, ou en attendant qu'un driver soit
+        libéré. Après un échec du lancement, un driver libéré est attendu plutôt que de relancer
+        Chrome
+        """
+        failed = False
+        while True:
+            with self.condition:
+                while not self.idle[site] and (self.count[site] >= MAX_DRIVERS_PER_SITE
+                                               or (failed and self.count[site])):
+                    self.condition.wait()
+                if self.idle[site]:
+                    entry = self.idle[site].pop()
+                else:
+                    entry = None
+                    self.count[site] += 1
+            if entry is None:
+                driver = create_driver(headless, timeout=20)
+                print_driver_status(site, driver is not None)
+                if driver:
+                    return {"driver": driver, "headless": headless, "pages": 0}
+                with self.condition:
+                    self.count[site] -= 1
+                    self.condition.notify_all()
+                    if not self.count[site]:
+                        raise sportsbetting.UnavailableSiteException
+                failed = True
+            elif entry["headless"] == headless and is_healthy(entry["driver"]):
+                return entry
+            else:
+                self.discard(site, entry)
+
+    def release(self, site, entry):
+        """
+        Rend un driver après le parsing d'une compétition, ou le ferme s'il doit être remplacé
+        """
+        entry["pages"] += 1
+        if (entry["pages"] >= MAX_PAGES_PER_DRIVER or not is_healthy(entry["driver"])
+                or memory_usage(entry["driver"]) > MAX_DRIVER_MEMORY):
+            self.discard(site, entry)
+        else:
+            with self.condition:
+                self.idle[site].append(entry)
+                self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def lease(self, site, headless=True):
+        """
+        Emprunt d'un driver pour site par le thread courant
+        """
+        entry = self.acquire(site, headless)
+        self.leased()[site] = entry
+        try:
+            yield entry["driver"]
+        finally:
+            del self.leased()[site]
+            self.release(site, entry)
+
+    def restart(self, site):
+        """
+        Remplace le driver utilisé pour site par le thread courant
+        """
+        entry = self.entry(site)
+        quit_driver(entry["driver"])
+        driver = create_driver(entry["headless"], timeout=20)
+        print_driver_status(site, driver is not None)
+        if not driver:
+            raise sportsbetting.UnavailableSiteException
+        entry["driver"] = driver
+        entry["pages"] = 0
+
+    def close(self):
+        """
+        Fermeture de tous les drivers disponibles
+        """
+        with self.condition:
+            entries = [(site, entry) for site in self.idle for entry in self.idle[site]]
+            self.idle.clear()
+        for site, entry in entries:
+            self.discard(site, entry)
+
+
+DRIVER = DriverPool()
+atexit.register(DRIVER.close)
+
+
+def start_selenium(site, headless=True, timeout=None):
+    """
+    Lancement d'un driver selenium
+    """
+    return DRIVER.start(site, headless, timeout)
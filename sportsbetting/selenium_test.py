@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests du pool de drivers selenium
+"""
+
+import threading
+
+from sportsbetting import selenium_init
+
+
+class FakeDriver:
+    """
+    Driver factice, qui ne répond plus une fois fermé
+    """
+
+    def __init__(self):
+        self.closed = False
+
+    def execute_script(self, script):
+        if self.closed:
+            raise selenium_init.selenium.common.exceptions.WebDriverException
+        return 1 if script == "return 1" else 0
+
+    def quit(self):
+        self.closed = True
+
+
+def test_driver_pool(monkeypatch):
+    """
+    :return: Les drivers sont réutilisés entre les parsings, limités par site et remplacés s'ils
+    ne répondent plus ou ont parsé trop de pages
+    """
+    monkeypatch.setattr(selenium_init, "create_driver", lambda headless, timeout=None: FakeDriver())
+    monkeypatch.setattr(selenium_init, "MAX_PAGES_PER_DRIVER", 3)
+    pool = selenium_init.DriverPool()
+    assert pool.warm("betclic")
+    driver = pool["betclic"]
+    assert pool.warm("betclic") and pool["betclic"] is driver
+    drivers = []
+    barrier = threading.Barrier(2)
+
+    def parse():
+        with pool.lease("betclic") as leased:
+            assert pool["betclic"] is leased
+            drivers.append(leased)
+            barrier.wait()
+
+    threads = [threading.Thread(target=parse) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert driver in drivers and len(set(drivers)) == 2 == pool.count["betclic"]
+    driver.quit()
+    with pool.lease("betclic") as leased:
+        assert leased is not driver
+    with pool.lease("betclic"):
+        pass
+    assert pool.count["betclic"] == 0  # Remplacé après MAX_PAGES_PER_DRIVER compétitions
+    assert pool.warm("betclic") and pool.count["betclic"] == 1
+    pool.close()
+    assert pool.count["betclic"] == 0
+
+
+def test_driver_pool_failed_start(monkeypatch):
+    """
+    :return: Si Chrome ne démarre pas alors qu'un driver du site est emprunté, le driver est
+    attendu sans relancer Chrome
+    """
+    pool = selenium_init.DriverPool()
+    driver = FakeDriver()
+    pool.add("betclic", driver)
+    starts = []
+    monkeypatch.setattr(selenium_init, "create_driver",
+                        lambda headless, timeout=None: starts.append(headless))
+    leased = threading.Event()
+    release = threading.Event()
+
+    def parse():
+        with pool.lease("betclic"):
+            leased.set()
+            release.wait()
+
+    thread = threading.Thread(target=parse)
+    thread.start()
+    leased.wait()
+    threading.Timer(0.2, release.set).start()
+    with pool.lease("betclic") as second:
+        assert second is driver and len(starts) == 1
+    thread.join()
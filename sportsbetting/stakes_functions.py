@@ -0,0 +1,189 @@
+"""
+Répartition de mises imposées sur les issues d'un match
+"""
+
+import functools
+
+import numpy as np
+
+
+def best_stakes_assignment(odds_main, odds_second, stakes):
+    """
+    Détermine les issues sur lesquelles placer des mises imposées (stakes au format
+    [[mise, site, cote minimale], ...]) pour maximiser la plus-value de defined_bets, en
+    complétant avec les cotes odds_main sur les autres issues.
+    Pour des issues distinctes r_j, defined_bets répartit les mises par paliers de gain croissant,
+    et la plus-value vaut max_j(m_j * c_j) * (1 - somme(1 / odds_main)) - somme(m_j)
+    + somme(m_j * c_j / odds_main[r_j]), où c_j est la cote du site de la mise j sur r_j.
+    Chaque couple (mise, issue) de gain maximal est essayé, les autres mises étant affectées par
+    une recherche mémoïsée restreinte, pour chaque mise, à ses len(stakes) meilleures issues.
+    Retourne None si aucune répartition n'est possible, sinon la plus-value et les issues
+    choisies pour chaque mise
+    """
+    n = len(odds_main)
+    nb_stakes = len(stakes)
+    coefficient = 1 - sum(1 / odd for odd in odds_main)
+    total = sum(stake[0] for stake in stakes)
+    returns = []
+    weights = []
+    for stake, site, minimum_odd in stakes:
+        odds = odds_second.get(site)
+        returns.append([stake * odds[r] if odds and odds[r] >= minimum_odd else None
+                        for r in range(n)])
+        weights.append([stake * odds[r] / odds_main[r] if odds and odds[r] >= minimum_odd
+                        else None for r in range(n)])
+    max_weights = [max((weight for weight in weights_j if weight is not None), default=None)
+                   for weights_j in weights]
+    if None in max_weights:
+        return None
+    pairs = sorted(((j, r) for j in range(nb_stakes) for r in range(n)
+                    if returns[j][r] is not None),
+                   key=lambda pair: -(coefficient * returns[pair[0]][pair[1]]
+                                      + weights[pair[0]][pair[1]]))
+    best = None
+    for j_max, r_max in pairs:
+        gain_max = returns[j_max][r_max]
+        fixed = coefficient * gain_max - total + weights[j_max][r_max]
+        bound = fixed + sum(max_weights) - max_weights[j_max]
+        if best and bound <= best[0]:
+            continue
+        others = [j for j in range(nb_stakes) if j != j_max]
+        candidates = []
+        for j in others:
+            ranks = [r for r in range(n) if r != r_max and returns[j][r] is not None
+                     and returns[j][r] <= gain_max]
+            candidates.append(sorted(ranks, key=lambda r: -weights[j][r])[:nb_stakes - 1])
+
+        @functools.lru_cache(maxsize=None)
+        def best_rest(i, used):
+            """
+            Meilleure affectation des mises others[i:] sur des issues non utilisées
+            """
+            if i == len(others):
+                return 0, ()
+            best_i = None
+            for r in candidates[i]:
+                if r not in used:
+                    rest = best_rest(i + 1, used | frozenset([r]))
+                    if rest:
+                        value = weights[others[i]][r] + rest[0]
+                        if not best_i or value > best_i[0]:
+                            best_i = (value, (r,) + rest[1])
+            return best_i
+
+        rest = best_rest(0, frozenset())
+        if rest and (not best or fixed + rest[0] > best[0]):
+            ranks = list(rest[1])
+            ranks.insert(j_max, r_max)
+            best = (fixed + rest[0], ranks)
+    return best
+
+
+class StakeDistributor:
+    """
+    Moteur de répartition de mises imposées, réutilisable pour évaluer un grand nombre
+    d'affectations. Les mises sont chargées avec set_stakes et les cotes d'un match avec
+    set_odds, puis evaluate calcule une affectation dans des tableaux préalloués, sans allocation
+    ni modification des arguments, et distribution renvoie le détail de la dernière affectation
+    évaluée au format de defined_bets
+    """
+
+    def __init__(self, n, second_sites, nb_stakes):
+        self.second_sites = list(second_sites)
+        self.index_second = {site: i for i, site in enumerate(self.second_sites)}
+        self.main_sites = []
+        self.odds_main = np.empty(n)
+        self.odds_second = np.empty((len(self.second_sites), n))
+        self.odds = np.empty(n)
+        self.nb_stakes = 0
+        self.amounts = np.empty(nb_stakes)
+        self.remaining = np.empty(nb_stakes)
+        self.active = np.empty(nb_stakes, dtype=bool)
+        self.returns = np.empty(nb_stakes)
+        self.gains = np.empty(nb_stakes)
+        self.ranks = np.empty(nb_stakes, dtype=int)
+        self.stake_sites = np.empty(nb_stakes, dtype=int)
+        self.bets = np.empty((nb_stakes, n))
+        self.sites = np.empty((nb_stakes, n), dtype=int)
+        self.gain = 0
+        self.nb_levels = 0
+
+    def set_odds(self, odds_main, odds_second, main_sites):
+        """
+        Charge les meilleures cotes odds_main (obtenues sur main_sites) et les cotes
+        odds_second ({site: [cotes]}) des sites des mises imposées
+        """
+        self.odds_main[:] = odds_main
+        self.main_sites = main_sites
+        for site, i in self.index_second.items():
+            self.odds_second[i] = odds_second.get(site, np.nan)
+
+    def set_stakes(self, stakes):
+        """
+        Charge les mises imposées au format [[mise, site, ...], ...]
+        """
+        self.nb_stakes = len(stakes)
+        for j, stake in enumerate(stakes):
+            self.amounts[j] = stake[0]
+            self.stake_sites[j] = self.index_second[stake[1]]
+
+    def evaluate(self, ranks):
+        """
+        Répartit les mises imposées sur les issues ranks (une par mise) comme defined_bets : à
+        chaque palier, la première mise dont le gain peut être couvert par les autres mises
+        restantes est jouée et les cotes des autres issues sont complétées par les cotes
+        principales. Retourne le gain de référence et la somme des mises
+        """
+        nb_stakes = self.nb_stakes
+        active, remaining, returns = self.active, self.remaining, self.returns
+        self.ranks[:nb_stakes] = ranks
+        remaining[:nb_stakes] = self.amounts[:nb_stakes]
+        active[:nb_stakes] = True
+        self.nb_levels = 0
+        nb_active = nb_stakes
+        while nb_active:
+            level = self.nb_levels
+            self.odds[:] = self.odds_main
+            self.sites[level] = -1
+            for j in range(nb_stakes):
+                if active[j]:
+                    rank = self.ranks[j]
+                    self.odds[rank] = self.odds_second[self.stake_sites[j], rank]
+                    self.sites[level, rank] = self.stake_sites[j]
+            for j in range(nb_stakes):
+                if active[j]:
+                    returns[j] = remaining[j] * self.odds[self.ranks[j]]
+            chosen = -1
+            for j in range(nb_stakes):
+                if active[j]:
+                    chosen = j
+                    valid = True
+                    for k in range(nb_stakes):
+                        if (active[k] and returns[j] / self.odds[self.ranks[k]] - remaining[k]
+                                > 1e-6):  # Si on mise plus que ce qui est disponible
+                            valid = False
+                            break
+                    if valid:
+                        break
+            self.gains[level] = returns[chosen]
+            np.divide(returns[chosen], self.odds, out=self.bets[level])
+            for j in range(nb_stakes):
+                if active[j]:
+                    remaining[j] -= self.bets[level, self.ranks[j]]
+                    active[j] = remaining[j] >= 1e-6
+                    nb_active -= not active[j]
+            self.nb_levels += 1
+        self.gain = 0
+        for level in reversed(range(self.nb_levels)):
+            self.gain = float(self.gains[level]) + self.gain
+        return self.gain, float(np.sum(self.bets[:self.nb_levels]))
+
+    def distribution(self):
+        """
+        Retourne le détail de la dernière affectation évaluée : [gain de référence, [mises de
+        chaque palier], [sites de chaque palier]]
+        """
+        sites = [[self.main_sites[i] if site == -1 else self.second_sites[site]
+                  for i, site in enumerate(self.sites[level])]
+                 for level in range(self.nb_levels)]
+        return [self.gain, [self.bets[level].tolist() for level in range(self.nb_levels)], sites]
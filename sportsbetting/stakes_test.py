@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests de la répartition des mises imposées
+"""
+
+import copy
+import random
+from itertools import permutations
+
+import numpy as np
+
+from sportsbetting.auxiliary_functions import defined_bets
+from sportsbetting.basic_functions import mises2
+from sportsbetting.stakes_functions import StakeDistributor, best_stakes_assignment
+
+
+def recursive_defined_bets(odds_main, odds_second, main_sites, second_sites):
+    """
+    Version récursive d'origine de defined_bets, qui sert de référence
+    second_sites type : [[rank, bet, site],...]
+    """
+    gain = 0
+    bets = []
+    if second_sites:
+        sites = copy.deepcopy(main_sites)
+        odds_adapted = copy.deepcopy(odds_main)
+        for bet in second_sites:
+            odds_adapted[bet[0]] = odds_second[bet[2]][bet[0]]
+            sites[bet[0]] = bet[2]
+        for bet in second_sites:
+            valid = True
+            bets = mises2(odds_adapted, bet[1], bet[0])
+            gain = bet[1] * odds_adapted[bet[0]]
+            for bet2 in second_sites:
+                if bets[bet2[0]] - bet2[1] > 1e-6:  # Si on mise plus que ce qui est disponible
+                    valid = False
+                    break
+            if valid:
+                break
+        index_to_del = []
+        for i, elem in enumerate(second_sites):
+            second_sites[i][1] -= bets[elem[0]]
+            if elem[1] < 1e-6:
+                index_to_del.append(i)
+        for i in index_to_del[::-1]:
+            del second_sites[i]
+        res = recursive_defined_bets(odds_main, odds_second, main_sites, second_sites)
+        return [gain + res[0], [bets] + res[1], [sites] + res[2]]
+    return [0, [], []]
+
+
+def assert_same_bets(bets, expected):
+    """
+    Vérifie que deux répartitions de defined_bets sont égales (aux erreurs d'arrondi près)
+    """
+    assert abs(bets[0] - expected[0]) < 1e-6 and bets[2] == expected[2]
+    assert len(bets[1]) == len(expected[1])
+    for level, expected_level in zip(bets[1], expected[1]):
+        assert np.allclose(level, expected_level, rtol=0, atol=1e-6)
+
+
+def test_best_stakes_assignment():
+    """
+    :return: L'affectation trouvée a la même plus-value que la meilleure des permutations,
+    évaluées avec la version récursive d'origine de defined_bets
+    """
+    rnd = random.Random(0)
+    for _ in range(50):
+        odds_main = [round(rnd.uniform(1.05, 20), 2) for _ in range(9)]
+        odds_second = {site: [round(max(1.01, odd * rnd.uniform(0.8, 1.2)), 2)
+                              for odd in odds_main] for site in ["betclic", "winamax"]}
+        stakes = [[rnd.choice([5, 10, 20]), rnd.choice(["betclic", "winamax"]),
+                   rnd.choice([1.01, 2])] for _ in range(3)]
+        best_profit = -float("inf")
+        for perm in permutations(range(9), 3):
+            if all(odds_second[stake[1]][perm[j]] >= stake[2] for j, stake in enumerate(stakes)):
+                bets = recursive_defined_bets(odds_main, odds_second, ["unibet"] * 9,
+                                              [[perm[j], stake[0], stake[1]]
+                                               for j, stake in enumerate(stakes)])
+                best_profit = max(best_profit, bets[0] - np.sum(bets[1]))
+        profit, ranks = best_stakes_assignment(odds_main, odds_second, stakes)
+        bets = recursive_defined_bets(odds_main, odds_second, ["unibet"] * 9,
+                                      [[ranks[j], stake[0], stake[1]]
+                                       for j, stake in enumerate(stakes)])
+        assert abs(profit - best_profit) < 1e-6
+        assert abs(bets[0] - np.sum(bets[1]) - best_profit) < 1e-6
+
+
+def test_stake_distributor():
+    """
+    :return: Le moteur réutilisé et defined_bets donnent la même répartition que la version
+    récursive d'origine de defined_bets, sans modifier les mises imposées
+    """
+    rnd = random.Random(1)
+    stakes = [[10, "betclic"], [5, "winamax"]]
+    distributor = StakeDistributor(9, ["betclic", "winamax"], 2)
+    distributor.set_stakes(stakes)
+    for _ in range(20):
+        odds_main = [round(rnd.uniform(1.05, 20), 2) for _ in range(9)]
+        odds_second = {site: [round(rnd.uniform(1.05, 20), 2) for _ in range(9)]
+                       for site in ["betclic", "winamax"]}
+        distributor.set_odds(odds_main, odds_second, ["unibet"] * 9)
+        for perm in permutations(range(9), 2):
+            gain, sum_bets = distributor.evaluate(perm)
+            second_sites = [[perm[j], stake[0], stake[1]] for j, stake in enumerate(stakes)]
+            expected = recursive_defined_bets(odds_main, odds_second, ["unibet"] * 9,
+                                              copy.deepcopy(second_sites))
+            assert_same_bets(distributor.distribution(), expected)
+            assert_same_bets(defined_bets(odds_main, odds_second, ["unibet"] * 9, second_sites),
+                             expected)
+            assert abs(gain - expected[0]) < 1e-6 and abs(sum_bets - np.sum(expected[1])) < 1e-6
+    assert stakes == [[10, "betclic"], [5, "winamax"]]
@@ -17,7 +17,6 @@ import urllib
 import urllib.error
 import urllib.request
 from itertools import combinations, permutations
-from pprint import pprint
 
 import numpy as np
 import selenium
@@ -25,18 +24,22 @@ import selenium.common
 import unidecode
 import urllib3
 from bs4 import BeautifulSoup
-from multiprocessing.pool import ThreadPool
 from itertools import product
 import sportsbetting
 from sportsbetting import selenium_init
 from sportsbetting.database_functions import (get_id_formatted_competition_name,
                                               get_competition_by_id, get_competition_url,
                                               import_teams_by_sport, import_teams_by_url,
-                                              import_teams_by_competition_id_thesportsdb)
+                                              import_teams_by_competition_id_thesportsdb,
+                                              db_execute, db_fetchall)
 from sportsbetting.parser_functions import parse
+from sportsbetting.odds_store import OddsStore
+from sportsbetting.stakes_functions import StakeDistributor, best_stakes_assignment
+from sportsbetting.combine_functions import best_combines
+from sportsbetting.scraping_functions import HTTP_SITES, parse_sites
 from sportsbetting.auxiliary_functions import (valid_odds, format_team_names, merge_dict_odds,
-                                               merge_dicts, afficher_mises_combine,
-                                               cotes_combine_all_sites, defined_bets, binomial,
+                                               merge_dicts, repartition_mises_combine,
+                                               cotes_combine_all_sites,
                                                best_match_base, generate_sites, filter_dict_dates,
                                                combine_reduit, get_nb_issues, best_combine_reduit,
                                                filter_dict_minimum_odd)
@@ -45,7 +48,16 @@ from sportsbetting.basic_functions import (gain2, mises2, gain, mises, mises_fre
                                            mises_freebet2, mises_pari_rembourse_si_perdant,
                                            gain_promo_gain_cote,
                                            mises_promo_gain_cote, gain_gains_nets_boostes,
-                                           mises_gains_nets_boostes)
+                                           mises_gains_nets_boostes, indicateurs_mises,
+                                           indicateurs_mises2, indicateurs_mises_freebet,
+                                           indicateurs_mises_freebet2, repartition_freebet2,
+                                           indicateurs_mises_pari_rembourse_si_perdant,
+                                           indicateurs_mises_promo_gain_cote,
+                                           indicateurs_mises_gains_nets_boostes)
+from sportsbetting.bet_result import BetResult
+from sportsbetting.vectorized_functions import (replace_column, gain_vect, gain2_vect,
+                                                gain_pari_rembourse_si_perdant_vect,
+                                                gain_promo_gain_cote_vect)
 
 def parse_competition(competition, sport="football", *sites):
     """
@@ -74,12 +86,8 @@ def parse_competition(competition, sport="football", *sites):
                 try:
                     res_parsing[site] = parse(site, url)
                 except urllib3.exceptions.MaxRetryError:
-                    selenium_init.DRIVER[site].quit()
                     print("Redémarrage de selenium")
-                    selenium_init.start_selenium(site, timeout=20)
-                    res_parsing[site] = parse(site, url)
-                except sqlite3.OperationalError:
-                    print("Erreur dans la base de données, redémarrage en cours")
+                    selenium_init.DRIVER.restart(site)
                     res_parsing[site] = parse(site, url)
         except urllib.error.URLError:
             print("{} non accessible sur {} (délai écoulé)".format(competition, site))
@@ -101,33 +109,16 @@ def parse_competition(competition, sport="football", *sites):
         return out
 
 
-def parse_competitions_site(competitions, sport, site):
-    list_odds = []
-    if len(competitions) > 40 and site == "winamax":  # to avoid being blocked by winamax
-        competitions = competitions[:40]
-    sportsbetting.SITE_PROGRESS[site] = 0
-    try:
-        for competition in competitions:
-            list_odds.append(parse_competition(competition, sport, site))
-            sportsbetting.PROGRESS += 100 / (len(competitions) * sportsbetting.SUB_PROGRESS_LIMIT)
-            sportsbetting.SITE_PROGRESS[site] += 100 / len(competitions)
-    except sportsbetting.UnavailableSiteException:
-        print("{} non accessible".format(site))
-        sportsbetting.SITE_PROGRESS[site] = 100
-    except sportsbetting.AbortException:
-        print("Interruption", site)
-    except sqlite3.OperationalError:
-        print("Database is locked", site)
-    return merge_dict_odds(list_odds)
-
-
 def parse_competitions(competitions, sport="football", *sites):
     sites_order = ['bwin', 'parionssport', 'betstars', 'pasinobet', 'joa', 'unibet', 'betclic',
                    'pmu', 'france_pari', 'netbet', 'winamax', 'zebet']
     if not sites:
         sites = sites_order
-    sportsbetting.EXPECTED_TIME = 28 + len(competitions) * 12.5
     selenium_sites = {"betclic", "betstars", "bwin", "joa", "parionssport", "pasinobet", "unibet"}
+    headless = lambda site: sport != "handball" or site != "bwin"
+    selenium_warm = all(selenium_init.DRIVER.is_warm(site, headless(site))
+                        for site in selenium_sites.intersection(sites or sites_order))
+    sportsbetting.EXPECTED_TIME = 28 * (not selenium_warm) + len(competitions) * 12.5
     selenium_required = ((inspect.currentframe().f_back.f_code.co_name
                           in ["<module>", "parse_thread"]
                           or 'test' in inspect.currentframe().f_back.f_code.co_name)
@@ -138,8 +129,7 @@ def parse_competitions(competitions, sport="football", *sites):
     if selenium_required:
         for site in selenium_sites.intersection(sites):
             while True:
-                headless = sport != "handball" or site != "bwin"
-                if sportsbetting.ABORT or selenium_init.start_selenium(site, headless, timeout=20):
+                if sportsbetting.ABORT or selenium_init.DRIVER.warm(site, headless(site)):
                     break
                 colorama.init()
                 print(termcolor.colored('Restarting', 'yellow'))
@@ -161,18 +151,20 @@ def parse_competitions(competitions, sport="football", *sites):
     list_odds = []
     try:
         sportsbetting.IS_PARSING = True
-        list_odds = ThreadPool(7).map(lambda x: parse_competitions_site(competitions, sport, x), sites)
-        sportsbetting.ODDS[sport] = merge_dict_odds(list_odds)
+
+        def parse_competition_site(competition, sport, site):
+            if site in HTTP_SITES:
+                return parse_competition(competition, sport, site)
+            with selenium_init.DRIVER.lease(site, headless(site)):
+                return parse_competition(competition, sport, site)
+
+        list_odds = parse_sites(competitions, sport, sites, parse_competition_site)
+        sportsbetting.ODDS[sport] = OddsStore.from_dict(merge_dict_odds(list_odds))
+        if sportsbetting.HISTORY is not None:
+            sportsbetting.HISTORY.record(sport, sportsbetting.ODDS[sport])
     except Exception:
         print(traceback.format_exc(), file=sys.stderr)
     sportsbetting.IS_PARSING = False
-    if selenium_required:
-        ThreadPool(7).map(lambda x: selenium_init.DRIVER[x].quit(),
-                          selenium_sites.intersection(sites))
-        colorama.init()
-        print(termcolor.colored('Drivers closed', 'green'))
-        colorama.Style.RESET_ALL
-        colorama.deinit()
     sportsbetting.ABORT = False
 
 
@@ -195,7 +187,8 @@ def odds_match(match, sport="football"):
                 break
         else:
             return None, None
-    print(match_name)
+    if isinstance(all_odds, OddsStore):  # Les cotes sont reconstruites à chaque lecture
+        return match_name, all_odds[match_name]
     return match_name, copy.deepcopy(all_odds[match_name])
 
 
@@ -206,9 +199,7 @@ def best_stakes_match(match, site, bet, minimum_odd, sport="football"):
     """
     best_match, all_odds = odds_match(match, sport)
     if not all_odds:
-        print("No match found")
-        return
-    pprint(all_odds)
+        return BetResult()
     odds_site = all_odds['odds'][site]
     best_odds = copy.deepcopy(odds_site)
     best_profit = -float("inf")
@@ -233,11 +224,12 @@ def best_stakes_match(match, site, bet, minimum_odd, sport="football"):
                 sites = best_sites[:i] + [site] + best_sites[i + 1:]
                 bets = mises2(odds_to_check, bet, i)
                 best_i = i
-    if best_overall_odds:
-        mises2(best_overall_odds, bet, best_i, True)
-        afficher_mises_combine(best_match.split(" / "), [sites], [bets], all_odds["odds"], sport)
-    else:
-        print("No match found")
+    if not best_overall_odds:
+        return BetResult()
+    return BetResult(best_match, all_odds["date"], all_odds["odds"],
+                     indicateurs_mises2(best_overall_odds, bet, best_i),
+                     repartition_mises_combine(best_match.split(" / "), [sites], [bets],
+                                               all_odds["odds"], sport))
 
 
 def best_match_under_conditions(site, minimum_odd, bet, sport="football", date_max=None,
@@ -263,17 +255,24 @@ def best_match_under_conditions(site, minimum_odd, bet, sport="football", date_m
     criteria = lambda odds_to_check, i: ((not one_site and odds_to_check[i] >= minimum_odd)
                                          or (one_site and all(odd >= minimum_odd
                                                               for odd in odds_to_check)))
-    display_function = lambda best_overall_odds, best_rank: (mises2(best_overall_odds, bet,
-                                                                    best_rank, True) if not one_site
-                                                             else mises(best_overall_odds, bet,
-                                                                        True))
+    indicators_function = lambda best_overall_odds, best_rank: (
+        indicateurs_mises2(best_overall_odds, bet, best_rank) if not one_site
+        else indicateurs_mises(best_overall_odds, bet))
     result_function = lambda best_overall_odds, best_rank: (mises2(best_overall_odds, bet,
                                                                    best_rank, False) if not one_site
                                                             else mises(best_overall_odds, bet,
                                                                        False))
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min, one_site=one_site)
+    odds_function_vect = lambda best_odds, odds_site, i: replace_column(
+        odds_site if one_site else best_odds, odds_site[:, i] * (0.9 if live else 1), i)
+    profit_function_vect = lambda odds_to_check, i: (gain_vect(odds_to_check, bet) - bet
+                                                     if one_site
+                                                     else gain2_vect(odds_to_check, i, bet))
+    criteria_vect = lambda odds_to_check, i: ((odds_to_check >= minimum_odd).all(axis=1)
+                                              if one_site else odds_to_check[:, i] >= minimum_odd)
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min, one_site=one_site,
+                           vectorized=(odds_function_vect, profit_function_vect, criteria_vect))
 
 
 def best_match_pari_gagnant(site, minimum_odd, bet, sport="football",
@@ -287,7 +286,7 @@ def best_match_pari_gagnant(site, minimum_odd, bet, sport="football",
     n = 2 + (sport not in ["tennis", "volleyball", "basketball", "nba"])
     for _ in range(n**nb_matches_combine):
         stakes.append([bet, site, minimum_odd])
-    best_match_stakes_to_bet(stakes, nb_matches_combine, sport, date_max, time_max, True)
+    return best_match_stakes_to_bet(stakes, nb_matches_combine, sport, date_max, time_max, True)
 
 
 def best_match_freebet(site, freebet, sport="football", live=False, date_max=None, time_max=None,
@@ -301,11 +300,17 @@ def best_match_freebet(site, freebet, sport="football", live=False, date_max=Non
                                                      + best_odds[i + 1:])
     profit_function = lambda odds_to_check, i: gain2(odds_to_check, i) + 1
     criteria = lambda odds_to_check, i: True
-    display_function = lambda x, i: mises_freebet(x[:i] + [x[i] + 1] + x[i + 1:], freebet, i, True)
+    indicators_function = lambda x, i: indicateurs_mises_freebet(x[:i] + [x[i] + 1] + x[i + 1:],
+                                                                 freebet, i)
     result_function = lambda x, i: mises_freebet(x[:i] + [x[i] + 1] + x[i + 1:], freebet, i, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min, freebet=True)
+    odds_function_vect = lambda best_odds, odds_site, i: replace_column(
+        best_odds, odds_site[:, i] * fact_live - 1, i)
+    profit_function_vect = lambda odds_to_check, i: gain2_vect(odds_to_check, i) + 1
+    criteria_vect = lambda odds_to_check, i: True
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min, freebet=True,
+                           vectorized=(odds_function_vect, profit_function_vect, criteria_vect))
 
 
 def best_match_freebet2(site, freebet, sport="football", live=False, date_max=None, time_max=None,
@@ -319,11 +324,14 @@ def best_match_freebet2(site, freebet, sport="football", live=False, date_max=No
                                                      + best_odds[i + 1:])
     profit_function = lambda x, i: gain_freebet2(x[:i] + [x[i] + 1] + x[i + 1:], freebet, i)
     criteria = lambda odds_to_check, i: True
-    display_function = lambda x, i: mises_freebet2(x[:i] + [x[i] + 1] + x[i + 1:], freebet, i, True)
+    indicators_function = lambda x, i: indicateurs_mises_freebet2(x[:i] + [x[i] + 1] + x[i + 1:],
+                                                                  freebet, i)
     result_function = lambda x, i: mises_freebet2(x[:i] + [x[i] + 1] + x[i + 1:], freebet, i, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min, freebet=True)
+    second_rank_function = lambda x, i: repartition_freebet2(x[:i] + [x[i] + 1] + x[i + 1:],
+                                                             freebet, i)[3]
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min, freebet=True, second_rank_function=second_rank_function)
 
 
 def best_match_cashback(site, minimum_odd, bet, sport="football", freebet=True,
@@ -344,39 +352,34 @@ def best_match_cashback(site, minimum_odd, bet, sport="football", freebet=True,
                                                                               rate_cashback)
     criteria = lambda odds_to_check, i: (odds_to_check[i] + combi_max) / (
             1 + combi_max) >= minimum_odd
-    display_function = lambda x, i: mises_pari_rembourse_si_perdant(x, bet, i, freebet,
-                                                                    rate_cashback, True)
+    indicators_function = lambda x, i: indicateurs_mises_pari_rembourse_si_perdant(
+        x, bet, i, freebet, rate_cashback)
     result_function = lambda x, i: mises_pari_rembourse_si_perdant(x, bet, i, freebet,
                                                                    rate_cashback, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min)
+    odds_function_vect = lambda best_odds, odds_site, i: replace_column(
+        best_odds, combi_odd * odds_site[:, i] * (1 + combi_max) - combi_max, i)
+    profit_function_vect = lambda odds_to_check, i: gain_pari_rembourse_si_perdant_vect(
+        odds_to_check, bet, i, freebet, rate_cashback)
+    criteria_vect = lambda odds_to_check, i: (odds_to_check[:, i] + combi_max) / (
+            1 + combi_max) >= minimum_odd
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min,
+                           vectorized=(odds_function_vect, profit_function_vect, criteria_vect))
 
 
 def best_matches_combine(site, minimum_odd, bet, sport="football", nb_matches=2, one_site=False,
                          date_max=None, time_max=None, date_min=None, time_min=None,
-                         minimum_odd_selection=1.01):
+                         minimum_odd_selection=1.01, processes=1):
     """
     Retourne les meilleurs matches sur lesquels miser lorsqu'on doit miser une somme
-    donnée à une cote donnée sur un combiné
+    donnée à une cote donnée sur un combiné. La recherche peut être répartie sur processes
+    processus (None pour autant que de coeurs) lorsqu'elle est lancée hors de l'interface.
+    Depuis l'interface, qui utilise plusieurs threads, la recherche reste séquentielle quelle
+    que soit la valeur de processes (cf. best_combines)
     """
     all_odds = filter_dict_dates(sportsbetting.ODDS[sport], date_max, time_max, date_min, time_min)
     all_odds = filter_dict_minimum_odd(all_odds, minimum_odd_selection, site)
-    sportsbetting.ALL_ODDS_COMBINE = {}
-    nb_combine = binomial(len(all_odds), nb_matches)
-    sportsbetting.PROGRESS = 0
-
-    def compute_all_odds_combine(nb_combine, combine):
-        sportsbetting.PROGRESS += 100/nb_combine
-        try:
-            sportsbetting.ALL_ODDS_COMBINE[" / ".join([match[0] for match in combine])] = cotes_combine_all_sites(*[match[1]
-                                                                                        for match
-                                                                                        in combine])
-        except KeyError:
-            pass
-    
-    ThreadPool(4).map(lambda x: compute_all_odds_combine(nb_combine, x),
-                      combinations(all_odds.items(), nb_matches))
     sportsbetting.PROGRESS = 0
     odds_function = lambda best_odds, odds_site, i: ((best_odds[:i] + [odds_site[i]]
                                                       + best_odds[i + 1:]) if not one_site
@@ -386,17 +389,24 @@ def best_matches_combine(site, minimum_odd, bet, sport="football", nb_matches=2,
     criteria = lambda odds_to_check, i: ((not one_site and odds_to_check[i] >= minimum_odd)
                                          or (one_site and all(odd >= minimum_odd for
                                                               odd in odds_to_check)))
-    display_function = lambda best_overall_odds, best_rank: (mises2(best_overall_odds, bet,
-                                                                    best_rank, True) if not one_site
-                                                             else mises(best_overall_odds, bet,
-                                                                        True))
+    indicators_function = lambda best_overall_odds, best_rank: (
+        indicateurs_mises2(best_overall_odds, bet, best_rank) if not one_site
+        else indicateurs_mises(best_overall_odds, bet))
     result_function = lambda best_overall_odds, best_rank: (mises2(best_overall_odds, bet,
                                                                    best_rank, False) if not one_site
                                                             else mises(best_overall_odds, bet,
                                                                        False))
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min, True, nb_matches, one_site=one_site, combine_opt=True)
+    bound_function = lambda odd, overround: (bet / overround - bet if one_site
+                                             else bet * max(odd * (overround < 1), minimum_odd)
+                                             * (1 - overround))
+    sportsbetting.ALL_ODDS_COMBINE = {name: combine for _, name, combine
+                                      in best_combines(all_odds, site, nb_matches, odds_function,
+                                                       profit_function, criteria, bound_function,
+                                                       one_site, processes=processes)}
+    sportsbetting.PROGRESS = 0
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min, True, nb_matches, one_site=one_site, combine_opt=True)
 
 
 def best_matches_combine_cashback_une_selection_perdante(site, cote_minimale_selection, combi_max=0,
@@ -429,11 +439,11 @@ def best_matches_combine_cashback_une_selection_perdante(site, cote_minimale_sel
             odds_site))
     profit_function = lambda odds_to_check, i: gain(odds_to_check, bet) - bet
     criteria = lambda odds_to_check, i: (odds_to_check[i] + combi_max) / (1 + combi_max) >= 1.1
-    display_function = lambda x, i: mises(x, bet, True)
+    indicators_function = lambda x, i: indicateurs_mises(x, bet)
     return_function = lambda x, i: mises(x, bet, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    return_function, site, sport, date_max, time_max, date_min,
-                    time_min, True, nb_matches, one_site=True, recalcul=True)
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           return_function, site, sport, date_max, time_max, date_min,
+                           time_min, True, nb_matches, one_site=True, recalcul=True)
 
 
 def best_matches_combine_cashback(site, minimum_odd, bet, sport="football",
@@ -461,13 +471,13 @@ def best_matches_combine_cashback(site, minimum_odd, bet, sport="football",
                                                                               rate_cashback)
     criteria = lambda odds_to_check, i: (odds_to_check[i] + combi_max) / (
             1 + combi_max) >= minimum_odd
-    display_function = lambda x, i: mises_pari_rembourse_si_perdant(x, bet, i, freebet,
-                                                                    rate_cashback, True)
+    indicators_function = lambda x, i: indicateurs_mises_pari_rembourse_si_perdant(
+        x, bet, i, freebet, rate_cashback)
     return_function = lambda x, i: mises_pari_rembourse_si_perdant(x, bet, i, freebet,
                                                                    rate_cashback, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    return_function, site, sport, date_max, time_max, date_min,
-                    time_min, True, nb_matches)
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           return_function, site, sport, date_max, time_max, date_min,
+                           time_min, True, nb_matches)
 
 
 def best_match_stakes_to_bet(stakes, nb_matches=1, sport="football", date_max=None, time_max=None, identical_stakes=False):
@@ -485,6 +495,8 @@ def best_match_stakes_to_bet(stakes, nb_matches=1, sport="football", date_max=No
     best_bets = None
     main_site_odds = []
     main_sites_distribution = []
+    distributor = StakeDistributor(n, second_sites, nb_stakes)
+    distributor.set_stakes(stakes)
     sportsbetting.PROGRESS = 0
     for i, combine in enumerate(combis):
         sportsbetting.PROGRESS += 100 / nb_combis
@@ -510,29 +522,23 @@ def best_match_stakes_to_bet(stakes, nb_matches=1, sport="football", date_max=No
                        for second_site in second_sites if second_site in all_odds_combine[match_combine]["odds"]}
         if not second_odds:
             continue
-        dict_combine_odds = copy.deepcopy(second_odds)
-        for perm in permutations(range(n), nb_stakes):
-            valid_perm = True
-            defined_second_sites = [[perm[j], stake[0], stake[1]]
-                                    for j, stake in enumerate(stakes)]
-            for j, stake in enumerate(stakes):
-                if dict_combine_odds[defined_second_sites[j][2]][defined_second_sites[j][0]] < stake[2]:
-                    valid_perm = False
-                    break
-            if not valid_perm:
-                if identical_stakes:
-                    break
+        if identical_stakes:
+            perm = tuple(range(nb_stakes))
+            if any(stake[1] not in second_odds
+                   or second_odds[stake[1]][perm[j]] < stake[2]
+                   for j, stake in enumerate(stakes)):
                 continue
-            defined_bets_temp = defined_bets(main_site_odds, dict_combine_odds,
-                                             main_sites_distribution,
-                                             defined_second_sites)
-            profit = defined_bets_temp[0] - np.sum(defined_bets_temp[1])
-            if profit > best_profit:
-                best_profit = profit
-                best_combine = combine
-                best_bets = defined_bets_temp
-            if identical_stakes:
-                break
+        else:
+            best_assignment = best_stakes_assignment(main_site_odds, second_odds, stakes)
+            if not best_assignment or best_assignment[0] <= best_profit - 1e-9:
+                continue
+            perm = best_assignment[1]
+        distributor.set_odds(main_site_odds, second_odds, main_sites_distribution)
+        gain_perm, sum_bets = distributor.evaluate(perm)
+        if gain_perm - sum_bets > best_profit:
+            best_profit = gain_perm - sum_bets
+            best_combine = combine
+            best_bets = distributor.distribution()
     if best_combine:
         best_match_combine = " / ".join([match[0] for match in best_combine])
         odds_best_match = copy.deepcopy(all_odds_combine[best_match_combine])
@@ -540,15 +546,15 @@ def best_match_stakes_to_bet(stakes, nb_matches=1, sport="football", date_max=No
         for site in all_odds_combine[best_match_combine]["odds"]:
             if site not in all_sites:
                 del odds_best_match["odds"][site]
-        print(best_match_combine)
-        pprint(odds_best_match, compact=1)
-        print("Plus-value =", round(best_profit, 2))
-        print("Gain référence =", round(best_bets[0], 2))
-        print("Somme des mises =", round(np.sum(best_bets[1]), 2))
-        afficher_mises_combine([x[0] for x in best_combine], best_bets[2], best_bets[1],
-                               all_odds_combine[best_match_combine]["odds"], sport)
-    else:
-        print("No match found")
+        return BetResult(best_match_combine, odds_best_match["date"], odds_best_match["odds"],
+                         {"Plus-value": round(best_profit, 2),
+                          "Gain référence": round(best_bets[0], 2),
+                          "Somme des mises": round(np.sum(best_bets[1]), 2)},
+                         repartition_mises_combine([x[0] for x in best_combine], best_bets[2],
+                                                   best_bets[1],
+                                                   all_odds_combine[best_match_combine]["odds"],
+                                                   sport))
+    return BetResult()
 
 
 def best_matches_freebet(main_sites, freebets, sport="football", *matches):
@@ -561,7 +567,7 @@ def best_matches_freebet(main_sites, freebets, sport="football", *matches):
     second_sites = {freebet[1] for freebet in freebets}
     if not second_sites:
         print("Veuillez sélectionner des freebets secondaires")
-        return
+        return BetResult()
     if matches:
         new_odds = {}
         for match in matches:
@@ -576,9 +582,12 @@ def best_matches_freebet(main_sites, freebets, sport="football", *matches):
             if new_odds[match]["odds"]:
                 all_odds[match] = new_odds[match]
     best_rate = 0
+    best_combine = None
     nb_matches = 2
     n = 3 ** nb_matches
     nb_freebets = len(freebets)
+    distributor = StakeDistributor(n, second_sites, nb_freebets)
+    distributor.set_stakes(freebets)
     all_odds_combine = {}
     combis = list(combinations(all_odds.items(), nb_matches))
     nb_combis = len(combis)
@@ -603,32 +612,29 @@ def best_matches_freebet(main_sites, freebets, sport="football", *matches):
                     main_sites_distribution[j] = main
         second_odds = {second_site: all_odds_combine[match_combine]["odds"][second_site]
                        for second_site in second_sites}
-        dict_combine_odds = copy.deepcopy(second_odds)
+        distributor.set_odds(main_site_odds, second_odds, main_sites_distribution)
         for perm in permutations(range(n), nb_freebets):
-            defined_second_sites = [[perm[i], freebet[0], freebet[1]]
-                                    for i, freebet in enumerate(freebets)]
-            defined_bets_temp = defined_bets(main_site_odds, dict_combine_odds,
-                                             main_sites_distribution,
-                                             defined_second_sites)
-            if defined_bets_temp[0] / np.sum(defined_bets_temp[1]) > best_rate:
-                best_rate = defined_bets_temp[0] / np.sum(defined_bets_temp[1])
+            gain_perm, sum_bets = distributor.evaluate(perm)
+            if gain_perm / sum_bets > best_rate:
+                best_rate = gain_perm / sum_bets
                 best_combine = combine
-                best_bets = defined_bets_temp
+                best_bets = distributor.distribution()
     #     print("Temps d'exécution =", time.time()-start)
+    if not best_combine:
+        return BetResult()
     best_match_combine = " / ".join([match[0] for match in best_combine])
     odds_best_match = copy.deepcopy(all_odds_combine[best_match_combine])
     all_sites = main_sites + list(second_sites)
     for site in all_odds_combine[best_match_combine]["odds"]:
         if site not in all_sites:
             del odds_best_match["odds"][site]
-    print(best_match_combine)
-    pprint(odds_best_match, compact=1)
-    print("Taux =", best_rate)
-    print("Gain référence =", best_bets[0])
-    print("Somme des mises =", np.sum(best_bets[1]))
-    afficher_mises_combine([x[0] for x in best_combine], best_bets[2], best_bets[1],
-                           all_odds_combine[best_match_combine]["odds"], "football",
-                           uniquement_freebet=True)
+    return BetResult(best_match_combine, odds_best_match["date"], odds_best_match["odds"],
+                     {"Taux": best_rate, "Gain référence": best_bets[0],
+                      "Somme des mises": np.sum(best_bets[1])},
+                     repartition_mises_combine([x[0] for x in best_combine], best_bets[2],
+                                               best_bets[1],
+                                               all_odds_combine[best_match_combine]["odds"],
+                                               "football", uniquement_freebet=True))
 
 
 def best_matches_freebet_one_site(site, freebet, sport="football", nb_matches=2,
@@ -648,11 +654,12 @@ def best_matches_freebet_one_site(site, freebet, sport="football", nb_matches=2,
     odds_function = lambda best_odds, odds_site, i: cotes_freebet(odds_site)
     profit_function = lambda odds_to_check, i: gain(odds_to_check, freebet) - freebet
     criteria = lambda odds_to_check, i: all(odd >= minimum_odd for odd in odds_to_check)
-    display_function = lambda best_overall_odds, best_rank: mises(best_overall_odds, freebet, True)
+    indicators_function = lambda best_overall_odds, best_rank: indicateurs_mises(best_overall_odds,
+                                                                                 freebet)
     result_function = lambda best_overall_odds, best_rank: mises(best_overall_odds, freebet, False)
-    best_match_base(odds_function, profit_function, criteria, display_function,
-                    result_function, site, sport, date_max, time_max, date_min,
-                    time_min, True, nb_matches, True, one_site=True)
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min,
+                           time_min, True, nb_matches, True, one_site=True)
 
 
 def best_match_gain_cote(site, bet, sport="football", date_max=None, time_max=None, date_min=None,
@@ -664,14 +671,19 @@ def best_match_gain_cote(site, bet, sport="football", date_max=None, time_max=No
                                                                                      i + 1:]
     profit_function = lambda odds_to_check, i: gain_promo_gain_cote(odds_to_check, bet, i)
     criteria = lambda odds_to_check, i: True
-    display_function = lambda best_overall_odds, best_rank: mises_promo_gain_cote(best_overall_odds,
-                                                                                  bet, best_rank,
-                                                                                  True)
+    indicators_function = lambda best_overall_odds, best_rank: indicateurs_mises_promo_gain_cote(
+        best_overall_odds, bet, best_rank)
     result_function = lambda best_overall_odds, best_rank: mises_promo_gain_cote(best_overall_odds,
                                                                                  bet, best_rank,
                                                                                  False)
-    best_match_base(odds_function, profit_function, criteria, display_function, result_function,
-                    site, sport, date_max, time_max, date_min, time_min)
+    odds_function_vect = lambda best_odds, odds_site, i: replace_column(best_odds,
+                                                                        odds_site[:, i], i)
+    profit_function_vect = lambda odds_to_check, i: gain_promo_gain_cote_vect(odds_to_check,
+                                                                              bet, i)
+    criteria_vect = lambda odds_to_check, i: True
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min, time_min,
+                           vectorized=(odds_function_vect, profit_function_vect, criteria_vect))
 
 
 def best_match_cotes_boostees(site, gain_max, sport="football", date_max=None, time_max=None,
@@ -680,15 +692,16 @@ def best_match_cotes_boostees(site, gain_max, sport="football", date_max=None, t
     profit_function = lambda odds_to_check, i: gain_gains_nets_boostes(odds_to_check, gain_max,
                                                                        False)
     criteria = lambda odds_to_check, i: odds_to_check[i] >= 1.5
-    display_function = lambda odds_to_check, i: mises_gains_nets_boostes(odds_to_check, gain_max,
-                                                                         False, True)
+    indicators_function = lambda odds_to_check, i: indicateurs_mises_gains_nets_boostes(
+        odds_to_check, gain_max, False)
     result_function = lambda odds_to_check, i: mises_gains_nets_boostes(odds_to_check, gain_max,
                                                                         False, False)
-    best_match_base(odds_function, profit_function, criteria, display_function, result_function,
-                    site, sport, date_max, time_max, date_min, time_min)
+    return best_match_base(odds_function, profit_function, criteria, indicators_function,
+                           result_function, site, sport, date_max, time_max, date_min, time_min)
 
 def best_combine_booste(matches, combinaison_boostee, site_combinaison, mise, sport, cote_boostee):
-    best_combine_reduit(matches, combinaison_boostee, site_combinaison, mise, sport, cote_boostee)
+    return best_combine_reduit(matches, combinaison_boostee, site_combinaison, mise, sport,
+                               cote_boostee)
 
 
 
@@ -697,55 +710,34 @@ def add_competition_to_db(sport):
     Ajout des competitions d'un sport donné disponibles sur comparateur-de-cotes
     """
     url = "http://www.comparateur-de-cotes.fr/comparateur/" + sport
-    conn = sqlite3.connect("sportsbetting/resources/teams.db")
-    c = conn.cursor()
     soup = BeautifulSoup(urllib.request.urlopen(url), features="lxml")
     sport = soup.find("title").string.split()[-1].lower()
     for line in soup.find_all(["a"]):
         if "href" in line.attrs and "-ed" in line["href"] and line.text and sport in line["href"]:
             try:
-                c.execute("""
-                INSERT INTO competitions (id, competition, sport)
-                VALUES ({}, "{}", "{}")
-                """.format(line["href"].split("-ed")[-1], line.text.strip(), sport))
+                db_execute("INSERT INTO competitions (id, competition, sport) VALUES (?, ?, ?)",
+                           (int(line["href"].split("-ed")[-1]), line.text.strip(), sport))
                 print(line.text.strip())
             except sqlite3.IntegrityError:
                 pass
-    conn.commit()
-    c.close()
 
 
 def add_urls_to_db():
     """
     Complète les url France-pari et ZEbet manquants à partir des url NetBet existants
     """
-    conn = sqlite3.connect("sportsbetting/resources/teams.db")
-    c = conn.cursor()
-    c.execute("""
+    for line in db_fetchall("""
     SELECT url_netbet
-    FROM competitions 
+    FROM competitions
     WHERE ((url_zebet ISNULL OR url_france_pari ISNULL) AND url_netbet IS NOT NULL)
-    """)
-    for line in c.fetchall():
+    """):
         try:
             url_netbet = line[0]
             url_france_pari, url_zebet = generate_sites(url_netbet)
-            c_2 = conn.cursor()
-            c_2.execute("""
-            UPDATE competitions
-            SET url_france_pari = "{0}" WHERE url_netbet = "{1}"
-            """.format(url_france_pari, url_netbet))
-            c_3 = conn.cursor()
-            c_3.execute("""
-            UPDATE competitions
-            SET url_zebet = "{0}" WHERE url_netbet = "{1}"
-            """.format(url_zebet, url_netbet))
-            c_2.close()
-            c_3.close()
+            db_execute("UPDATE competitions SET url_france_pari = ?, url_zebet = ? "
+                       "WHERE url_netbet = ?", (url_france_pari, url_zebet, url_netbet))
         except TypeError:
             pass
-    conn.commit()
-    c.close()
 
 
 def get_promotions(site):
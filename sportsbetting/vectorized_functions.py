@@ -0,0 +1,167 @@
+"""
+Fonctions vectorisées (numpy) de recherche du meilleur match sur lequel parier
+"""
+
+import numpy as np
+
+from sportsbetting import SITES
+from sportsbetting.odds_store import OddsStore, OddsView
+
+
+def odds_matrix(all_odds, n):
+    """
+    Construit le tableau des cotes (matches × sites × issues) d'un dictionnaire de cotes. Les
+    cotes indisponibles (site absent ou nombre d'issues insuffisant) valent NaN
+    """
+    if isinstance(all_odds, OddsView):
+        all_odds = all_odds.evaluate()
+    if isinstance(all_odds, OddsStore):
+        return all_odds.matrix(n)
+    matches = list(all_odds)
+    sites = list(SITES)
+    index_sites = {site: i for i, site in enumerate(sites)}
+    rows = [all_odds[match]["odds"] for match in matches]
+    for odds in rows:
+        for site in odds:
+            if site not in index_sites:
+                index_sites[site] = len(sites)
+                sites.append(site)
+    matrix = np.full((len(matches), len(sites), n), np.nan)
+    for i, odds in enumerate(rows):
+        for site, odds_site in odds.items():
+            if len(odds_site) >= n:
+                matrix[i, index_sites[site]] = odds_site[:n]
+    return matches, sites, matrix
+
+
+def replace_column(odds, column, i):
+    """
+    Retourne une copie du tableau de cotes (matches × issues) dont la colonne i est remplacée
+    """
+    new_odds = np.array(odds, dtype=float)
+    new_odds[:, i] = column
+    return new_odds
+
+
+def gain_vect(cotes, mise=1):
+    """
+    Version vectorisée de basic_functions.gain (une ligne de cotes par match)
+    """
+    return mise / np.sum(1 / cotes, axis=1)
+
+
+def gain2_vect(cotes, i, mise=1):
+    """
+    Version vectorisée de basic_functions.gain2 (une ligne de cotes par match)
+    """
+    return cotes[:, i] * mise * (1 - np.sum(1 / cotes, axis=1))
+
+
+def gain_pari_rembourse_si_perdant_vect(cotes, mise_max, rang, remb_freebet=False,
+                                        taux_remboursement=1):
+    """
+    Version vectorisée de basic_functions.gain_pari_rembourse_si_perdant
+    """
+    taux = ((not remb_freebet) + 0.77 * remb_freebet) * taux_remboursement
+    gains = mise_max * cotes[:, rang]
+    mis = (gains - mise_max * taux)[:, np.newaxis] / cotes
+    mis[:, rang] = mise_max
+    return gains - np.sum(mis, axis=1)
+
+
+def gain_promo_gain_cote_vect(cotes, mise_minimale, rang):
+    """
+    Version vectorisée de basic_functions.gain_promo_gain_cote
+    """
+    gains = cotes[:, rang] * 0.77 + mise_minimale * cotes[:, rang]
+    mis = gains[:, np.newaxis] / cotes
+    mis[:, rang] = mise_minimale
+    return gains - np.sum(mis, axis=1)
+
+
+def cotes_combine_vect(cotes):
+    """
+    Version vectorisée de basic_functions.cotes_combine : cotes est une liste de tableaux
+    (... × sites × issues), un par match, et le résultat est le tableau (... × sites × produit des
+    nombres d'issues) des cotes combinées, dans l'ordre de itertools.product. Les dimensions de
+    tête permettent de calculer plusieurs combinaisons en un seul appel
+    """
+    combined = np.asarray(cotes[0], dtype=float)
+    for cotes_match in cotes[1:]:
+        cotes_match = np.asarray(cotes_match, dtype=float)
+        combined = combined[..., :, np.newaxis] * cotes_match[..., np.newaxis, :]
+        combined = combined.reshape(combined.shape[:-2] + (-1,))
+    return np.round(combined, 4)
+
+
+def cotes_freebet_vect(cotes):
+    """
+    Version vectorisée de basic_functions.cotes_freebet
+    """
+    return np.where(cotes > 1, cotes - 1, 0.01)
+
+
+def best_sites_match(odds, site, n, one_site=False):
+    """
+    Retourne les meilleures cotes d'un match ainsi que les sites associés, en privilégiant le site
+    de référence en cas d'égalité
+    """
+    best_odds = list(odds[site][:n])
+    best_sites = [site for _ in range(n)]
+    if not one_site:
+        for site_i, odds_i in odds.items():
+            if len(odds_i) < n:
+                continue
+            for i in range(n):
+                if odds_i[i] > best_odds[i] and (odds_i[i] >= 1.1 or site_i == "pmu"):
+                    best_odds[i] = odds_i[i]
+                    best_sites[i] = site_i
+    return best_odds, best_sites
+
+
+def best_match_vectorized(all_odds, site, n, odds_function, profit_function, criteria,
+                          one_site=False):
+    """
+    Détermine en une passe vectorisée le meilleur couple (match, issue) pour un site donné.
+    odds_function, profit_function et criteria sont les équivalents vectorisés des fonctions
+    utilisées par best_match_base : ils prennent des tableaux (matches × issues) et renvoient
+    respectivement un tableau (matches × issues), un vecteur de gains et un vecteur de booléens.
+    Retourne None si aucun match ne convient, sinon le nom du match, le rang de l'issue, les
+    cotes retenues et les sites associés
+    """
+    matches, sites, matrix = odds_matrix(all_odds, n)
+    if not matches or site not in sites:
+        return None
+    i_site = sites.index(site)
+    odds_site = matrix[:, i_site]
+    available = ~np.isnan(odds_site).any(axis=1)
+    if one_site:
+        best_odds = odds_site
+    else:
+        eligible = matrix >= 1.1
+        if "pmu" in sites:
+            eligible[:, sites.index("pmu")] = ~np.isnan(matrix[:, sites.index("pmu")])
+        best_odds = np.fmax(odds_site, np.where(eligible, matrix, -np.inf).max(axis=1))
+    too_low = best_odds < 1.1
+    if site == "pmu":
+        too_low[:] = False
+    elif not one_site and "pmu" in sites:
+        too_low &= ~(matrix[:, sites.index("pmu")] > odds_site)
+    valid = available & ~too_low.any(axis=1)
+    profits = np.full((len(matches), n), -np.inf)
+    candidates = []
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for i in range(n):
+            odds_to_check = odds_function(best_odds, odds_site, i)
+            profit = profit_function(odds_to_check, i)
+            mask = valid & criteria(odds_to_check, i) & np.isfinite(profit)
+            profits[:, i] = np.where(mask, profit, -np.inf)
+            candidates.append(odds_to_check)
+    if not np.isfinite(profits).any():
+        return None
+    best_match_index, best_rank = divmod(int(np.argmax(profits)), n)
+    best_match = matches[best_match_index]
+    best_overall_odds = candidates[best_rank][best_match_index].tolist()
+    best_sites = best_sites_match(all_odds[best_match]["odds"], site, n, one_site)[1]
+    sites = best_sites[:best_rank] + [site] + best_sites[best_rank + 1:]
+    return best_match, best_rank, best_overall_odds, sites
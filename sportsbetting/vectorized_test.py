@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests des fonctions vectorisées
+"""
+
+import datetime
+import random
+
+from sportsbetting.auxiliary_functions import best_match_loop
+from sportsbetting.basic_functions import cotes_combine, gain2, gain_pari_rembourse_si_perdant
+from sportsbetting.vectorized_functions import (SITES, best_match_vectorized, replace_column,
+                                                cotes_combine_vect, gain2_vect,
+                                                gain_pari_rembourse_si_perdant_vect)
+
+
+def random_odds(nb_matches, n, seed=0):
+    """
+    :return: Cotes aléatoires au format de sportsbetting.ODDS[sport]
+    """
+    rnd = random.Random(seed)
+    all_odds = {}
+    for i in range(nb_matches):
+        probas = [rnd.random() + 0.2 for _ in range(n)]
+        odds = {}
+        for site in SITES:
+            if rnd.random() < 0.7:
+                marge = rnd.uniform(0.88, 0.97)
+                odds[site] = [round(max(1.01, sum(probas) / p * marge), 2) for p in probas]
+        all_odds["A{0} - B{0}".format(i)] = {"date": datetime.datetime(2030, 1, 1), "odds": odds}
+    return all_odds
+
+
+def test_best_match_vectorized():
+    """
+    :return: Le parcours vectorisé donne le même résultat que le parcours match par match
+    """
+    for n in [2, 3]:
+        all_odds = random_odds(100, n, n)
+        for site in ["pmu", "betclic"]:
+            res_loop = best_match_loop(
+                all_odds, site, n,
+                lambda best_odds, odds_site, i: best_odds[:i] + [odds_site[i]] + best_odds[i + 1:],
+                lambda odds, i: gain2(odds, i, 10), lambda odds, i: odds[i] >= 1.5)
+            res_vect = best_match_vectorized(
+                all_odds, site, n,
+                lambda best_odds, odds_site, i: replace_column(best_odds, odds_site[:, i], i),
+                lambda odds, i: gain2_vect(odds, i, 10), lambda odds, i: odds[:, i] >= 1.5)
+            assert res_loop[0] == res_vect[0] and res_loop[1] == res_vect[1]
+            assert res_loop[2] == res_vect[2] and res_loop[3] == res_vect[3]
+
+
+def test_gains_vectorized():
+    """
+    :return: Les gains vectorisés correspondent aux gains calculés cote par cote
+    """
+    all_odds = random_odds(20, 3)
+    for match in all_odds.values():
+        for odds in match["odds"].values():
+            for i in range(3):
+                assert abs(gain2(odds, i, 10) - gain2_vect(replace_column([odds], odds[i], i),
+                                                           i, 10)[0]) < 1e-9
+                assert abs(gain_pari_rembourse_si_perdant(odds, 10, i, True, 0.5)
+                           - gain_pari_rembourse_si_perdant_vect(replace_column([odds], odds[i],
+                                                                                i),
+                                                                 10, i, True, 0.5)[0]) < 1e-9
+
+
+def test_cotes_combine_vect():
+    """
+    :return: Les cotes combinées en lot correspondent aux cotes combinées match par match
+    """
+    sites = ["betclic", "pmu"]
+    odds = [match["odds"] for match in random_odds(50, 3).values()
+            if all(site in match["odds"] for site in sites)][:5]
+    batch = cotes_combine_vect([[[odds[i + j][site] for site in sites] for i in range(3)]
+                                for j in range(3)])
+    for i in range(3):
+        for k, site in enumerate(sites):
+            assert batch[i, k].tolist() == cotes_combine([odds[i + j][site] for j in range(3)])